@@ -0,0 +1 @@
+"""Throughput benchmarks for GridShare (run with ``python -m benchmarks.run``)."""
@@ -0,0 +1,113 @@
+"""Per-transaction cost of building and encoding ledger payloads.
+
+Compares the generic path (``dataclasses.asdict`` + ``json.dumps``) with
+``TransactionLogger``'s payload encoder and ``encode_entry`` (orjson when
+installed), reporting time, bytes retained per payload, and the transient
+peak of one call as measured by :mod:`tracemalloc`. orjson's bytes keep
+their initial 1 KiB buffer, so ``encode_entry`` shows a higher retained
+figure; the ledger writes each record straight away and does not keep it.
+
+    python -m benchmarks.allocations --count 20000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.registration import Participant
+from src.backend.transactions import EnergyTransaction, TransactionLogger
+from src.ledger.adapter import LedgerAdapter
+from src.ledger.file_adapter import encode_entry
+
+_START = datetime(2025, 6, 1, 10)
+_ROUTE = ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+
+
+def _transactions(count: int) -> List[EnergyTransaction]:
+    return [
+        EnergyTransaction(f"tx-{index}", "solar-1", "ev-1", 12.5, 3.1, _START + timedelta(minutes=index))
+        for index in range(count)
+    ]
+
+
+def asdict_payload(transaction: EnergyTransaction) -> Dict:
+    """The payload construction ``TransactionLogger`` used before payload_encoder."""
+
+    payload = asdict(transaction)
+    payload["timestamp"] = transaction.timestamp.isoformat()
+    payload["interconnect"] = OHIO_INTERCONNECT.name
+    payload["network"] = "Virtual Clean Power Network"
+    payload["route"] = _ROUTE
+    return payload
+
+
+def json_dumps_entry(entry: Dict) -> bytes:
+    """The ledger encoding used before the shared encoder."""
+
+    return json.dumps(entry, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def measure(build: Callable[[Any], object], inputs: List) -> Dict:
+    build(inputs[0])  # warm caches outside the measurement
+    started = time.perf_counter()
+    for item in inputs:
+        build(item)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        kept = [build(item) for item in inputs]
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        floor, _ = tracemalloc.get_traced_memory()
+        build(inputs[0])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {
+        "us_per_tx": round(seconds / len(inputs) * 1e6, 3),
+        "retained_bytes_per_tx": round((retained - before) / len(inputs), 1),
+        "transient_bytes_per_call": peak - floor,
+    }
+
+
+def run(count: int = 20_000) -> Dict[str, Dict]:
+    transactions = _transactions(count)
+    producer = Participant("solar-1", "producer", 5000, {"node": "AEP-Columbus"})
+    consumer = Participant("ev-1", "consumer", 350, {"node": "EVHub-Cleveland"})
+    logger = TransactionLogger(OHIO_INTERCONNECT, LedgerAdapter())
+
+    def build_payload(transaction: EnergyTransaction) -> Dict:
+        return logger._build_payload(transaction, producer, consumer, _ROUTE, None)
+
+    payloads = [build_payload(transaction) for transaction in transactions]
+    return {
+        "payload_asdict": measure(asdict_payload, transactions),
+        "payload_encoder": measure(build_payload, transactions),
+        "encode_json_dumps": measure(json_dumps_entry, payloads),
+        "encode_entry": measure(encode_entry, payloads),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Payload build/encode allocation benchmark")
+    parser.add_argument("--count", type=int, default=20_000, help="Transactions per measurement")
+    args = parser.parse_args(argv)
+    print(f"{'path':<20} {'us/tx':>8} {'retained B/tx':>14} {'transient B':>12}")
+    for name, result in run(args.count).items():
+        print(
+            f"{name:<20} {result['us_per_tx']:>8.3f} {result['retained_bytes_per_tx']:>14.1f}"
+            f" {result['transient_bytes_per_call']:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
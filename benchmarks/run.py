@@ -0,0 +1,251 @@
+"""Run the GridShare benchmark suite.
+
+Each benchmark builds its inputs from :mod:`benchmarks.synthetic` outside the
+timed region, then measures operations per second for one stage (or the
+whole ``request_ev_energy`` path) at every requested grid size. Results are
+written as JSON; ``--compare`` loads a saved run and flags any benchmark
+whose throughput dropped by more than ``--tolerance``.
+
+    python -m benchmarks.run --sizes 100,1000,10000 --output baseline.json
+    python -m benchmarks.run --sizes 100,1000,10000 --compare baseline.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.backend.config import InterconnectConfig
+from src.backend.matching import MatchingEngine
+from src.backend.registration import Registry
+from src.backend.routing import Router
+from src.backend.transactions import TransactionLogger
+from src.ledger.adapter import LedgerAdapter
+from src.mobile.app import P2PConnectApp
+
+from . import synthetic
+
+DEFAULT_SIZES = (100, 1000, 10_000)
+Benchmark = Callable[[InterconnectConfig, int], Tuple[int, float]]
+
+
+def _scaled(count: int, size: int) -> int:
+    """Shrink per-query workloads on large grids so every size finishes quickly."""
+
+    return max(50, count * 1000 // max(size, 1000))
+
+
+def _pairs(config: InterconnectConfig, count: int, seed: int = 1) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    nodes = list(config.grid_nodes)
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(count)]
+
+
+def _workload(config: InterconnectConfig, size: int):
+    participant_count = min(max(size, 200), 20_000)
+    producers, consumers = synthetic.participants(config, participant_count)
+    return producers, consumers
+
+
+def bench_register(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    producers, consumers = _workload(config, size)
+    everyone = producers + consumers
+    registry = Registry(config)
+    started = time.perf_counter()
+    for participant in everyone:
+        registry.register(participant)
+    return len(everyone), time.perf_counter() - started
+
+
+def _route_bench(mode: str, queries: int, cache_size: int = 0) -> Benchmark:
+    def bench(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+        router = Router(config, mode=mode, cache_size=cache_size)
+        pairs = _pairs(config, _scaled(queries, size))
+        router.route_between(*pairs[0])  # build tables outside the timed loop
+        started = time.perf_counter()
+        for start, goal in pairs:
+            router.route_between(start, goal)
+        return len(pairs), time.perf_counter() - started
+
+    return bench
+
+
+def bench_route_cached(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    router = Router(config, mode="weighted")
+    pairs = _pairs(config, _scaled(200, size)) * 10
+    started = time.perf_counter()
+    for start, goal in pairs:
+        router.route_between(start, goal)
+    return len(pairs), time.perf_counter() - started
+
+
+def bench_log_transaction(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    producers, consumers = _workload(config, size)
+    orders = synthetic.charge_orders(producers, consumers, 5000)
+    registry = Registry(config)
+    registry.register_many(producers + consumers)
+    logger = TransactionLogger(config, LedgerAdapter())
+    records = []
+    for order in orders:
+        producer, consumer = registry.get(order.producer_id), registry.get(order.consumer_id)
+        transaction, metadata = P2PConnectApp._charge_transaction(
+            order.tx_id, order.request, producer, consumer, order.energy_source
+        )
+        records.append((transaction, producer, consumer, [producer.metadata["node"]], metadata))
+    started = time.perf_counter()
+    for transaction, producer, consumer, route, metadata in records:
+        logger.log_transaction(transaction, producer, consumer, route, metadata)
+    return len(records), time.perf_counter() - started
+
+
+def _app(config: InterconnectConfig, size: int, mode: str = "table"):
+    producers, consumers = _workload(config, size)
+    app = P2PConnectApp(interconnect=config)
+    app.router = Router(config, mode=mode)
+    app.registry.register_many(producers + consumers)
+    return app, synthetic.charge_orders(producers, consumers, _scaled(2000, size))
+
+
+def bench_request_ev_energy(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    app, orders = _app(config, size)
+    started = time.perf_counter()
+    for order in orders:
+        app.request_ev_energy(order.tx_id, order.request, order.producer_id, order.consumer_id, order.energy_source)
+    return len(orders), time.perf_counter() - started
+
+
+def bench_request_ev_energy_batch(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    app, orders = _app(config, size)
+    started = time.perf_counter()
+    for offset in range(0, len(orders), 500):
+        app.request_ev_energy_batch(orders[offset : offset + 500])
+    return len(orders), time.perf_counter() - started
+
+
+def bench_matching(config: InterconnectConfig, size: int) -> Tuple[int, float]:
+    producers, consumers = _workload(config, size)
+    registry = Registry(config)
+    registry.register_many(producers + consumers)
+    router = Router(config, mode="table")
+    rng = random.Random(2)
+    count = _scaled(5000, size)
+    orders = synthetic.charge_orders(producers, consumers, count)
+    asks = [(f"ask-{index}", rng.choice(producers).participant_id, rng.uniform(0.05, 0.25)) for index in range(count)]
+    # Build route tables outside the timed loop by replaying on a throwaway
+    # engine; the timed run then measures matching, not route search.
+    for engine in (MatchingEngine(registry, router), MatchingEngine(registry, router)):
+        started = time.perf_counter()
+        for (ask_id, producer_id, price), order in zip(asks, orders):
+            engine.submit_ask(ask_id, producer_id, price, 40.0)
+            engine.submit_bid(order.tx_id, order.consumer_id, order.request)
+    return len(asks) + len(orders), time.perf_counter() - started
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "register": bench_register,
+    "route_bfs": _route_bench("bfs", queries=200),
+    "route_table": _route_bench("table", queries=2000),
+    "route_weighted": _route_bench("weighted", queries=500),
+    "route_cached": bench_route_cached,
+    "log_transaction": bench_log_transaction,
+    "request_ev_energy": bench_request_ev_energy,
+    "request_ev_energy_batch": bench_request_ev_energy_batch,
+    "matching": bench_matching,
+}
+
+
+def run(names: List[str], sizes: List[int], repeat: int = 3, progress=None) -> Dict:
+    """Run the selected benchmarks and return the JSON-ready results."""
+
+    results = []
+    for size in sizes:
+        config = synthetic.grid_interconnect(size)
+        for name in names:
+            best = None
+            for _ in range(repeat):
+                ops, seconds = BENCHMARKS[name](config, size)
+                if best is None or seconds < best[1]:
+                    best = (ops, seconds)
+            ops, seconds = best
+            result = {
+                "name": name,
+                "size": size,
+                "ops": ops,
+                "seconds": round(seconds, 6),
+                "ops_per_sec": round(ops / seconds, 1) if seconds else float("inf"),
+            }
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2) -> Tuple[List[str], List[Tuple[str, int]]]:
+    """Return ``(report_lines, regressions)`` comparing throughput with ``baseline``."""
+
+    previous = {(result["name"], result["size"]): result for result in baseline["results"]}
+    lines, regressions = [], []
+    for result in current["results"]:
+        key = (result["name"], result["size"])
+        before = previous.get(key)
+        label = f"{result['name']:<24} {result['size']:>7}"
+        if before is None:
+            lines.append(f"{label} {result['ops_per_sec']:>12,.0f} ops/s      (new)")
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1 if before["ops_per_sec"] else 0.0
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        lines.append(f"{label} {result['ops_per_sec']:>12,.0f} ops/s {change:+8.1%}{flag}")
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GridShare benchmark suite")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated grid sizes")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is kept")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop before flagging")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    def progress(result: Dict) -> None:
+        if not args.compare:
+            print(f"{result['name']:<24} {result['size']:>7} {result['ops_per_sec']:>12,.0f} ops/s", flush=True)
+
+    results = run(names, sizes, repeat=args.repeat, progress=progress)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
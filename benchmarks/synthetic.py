@@ -0,0 +1,109 @@
+"""Synthetic interconnects, participants, and charge requests for benchmarks.
+
+Everything is generated from a seed so runs are comparable across commits.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from src.backend.config import GridLine, InterconnectConfig
+from src.backend.registration import Participant
+from src.mobile.app import EVChargeOrder, EVChargeRequest
+
+OWNERS = ("AEP", "Duke", "FirstEnergy", "EVHub")
+
+
+def node_name(index: int) -> str:
+    return f"{OWNERS[index % len(OWNERS)]}-{index}"
+
+
+def grid_interconnect(nodes: int, seed: int = 0, chords_per_node: float = 0.1) -> InterconnectConfig:
+    """A roughly square lattice with lines in both directions plus random long chords.
+
+    Lines get random capacity, losses, and wheeling charges so weighted routing
+    has real choices to make.
+    """
+
+    rng = random.Random(seed)
+    width = max(1, math.isqrt(nodes))
+    graph = {node_name(index): [] for index in range(nodes)}
+    lines = {}
+
+    def connect(source: int, target: int) -> None:
+        source_name, target_name = node_name(source), node_name(target)
+        graph[source_name].append(target_name)
+        lines.setdefault(source_name, {})[target_name] = GridLine(
+            capacity_mw=rng.choice((50.0, 200.0, 1000.0)),
+            loss_factor=rng.uniform(0.0, 0.05),
+            wheeling_cost_usd_per_mwh=rng.uniform(0.5, 3.0),
+        )
+
+    for index in range(nodes):
+        right, below = index + 1, index + width
+        if right % width and right < nodes:
+            connect(index, right)
+            connect(right, index)
+        if below < nodes:
+            connect(index, below)
+            connect(below, index)
+    for _ in range(int(nodes * chords_per_node)):
+        source, target = rng.randrange(nodes), rng.randrange(nodes)
+        if source != target and node_name(target) not in graph[node_name(source)]:
+            connect(source, target)
+
+    return InterconnectConfig(
+        name=f"Synthetic grid ({nodes} nodes)",
+        transmission_operator="Synthetic",
+        compliance_rules=[],
+        utility_partners=[],
+        ev_charging_partners=[],
+        grid_nodes=graph,
+        regional_constraints={"utility_routing_preference": "Prioritize AEP-owned assets when available"},
+        lines=lines,
+    )
+
+
+def participants(
+    interconnect: InterconnectConfig,
+    count: int,
+    producer_share: float = 0.3,
+    seed: int = 0,
+) -> Tuple[List[Participant], List[Participant]]:
+    """Return ``(producers, consumers)`` spread uniformly over the grid nodes."""
+
+    rng = random.Random(seed)
+    nodes = list(interconnect.grid_nodes)
+    producers, consumers = [], []
+    for index in range(count):
+        node = rng.choice(nodes)
+        if rng.random() < producer_share:
+            producers.append(Participant(f"producer-{index}", "producer", rng.uniform(100, 5000), {"node": node}))
+        else:
+            consumers.append(Participant(f"consumer-{index}", "consumer", rng.uniform(7, 350), {"node": node}))
+    return producers, consumers
+
+
+def charge_orders(
+    producers: List[Participant],
+    consumers: List[Participant],
+    count: int,
+    seed: int = 0,
+    start: datetime = datetime(2025, 6, 1),
+) -> List[EVChargeOrder]:
+    """Charge requests between random producer/consumer pairs over one day."""
+
+    rng = random.Random(seed)
+    orders = []
+    for index in range(count):
+        consumer = rng.choice(consumers)
+        kilowatt_hours = round(rng.uniform(5, 80), 2)
+        request = EVChargeRequest(
+            station_id=consumer.metadata["node"],
+            kilowatt_hours=kilowatt_hours,
+            price_usd=round(kilowatt_hours * rng.uniform(0.08, 0.3), 2),
+            desired_start=start + timedelta(minutes=15 * rng.randrange(96)),
+            priority="fast-track" if rng.random() < 0.1 else "standard",
+        )
+        orders.append(EVChargeOrder(f"tx-{index}", request, rng.choice(producers).participant_id, consumer.participant_id))
+    return orders
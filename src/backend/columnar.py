@@ -0,0 +1,207 @@
+"""Columnar storage for logged energy transactions.
+
+:class:`TransactionColumns` keeps one typed :mod:`array` per numeric field and
+interns repeated strings (producer, consumer, energy source, EV session) into
+integer codes, so a trade costs a few dozen bytes instead of a dataclass plus
+its attribute dict. Rows are exposed through :class:`TransactionRow` views and
+aggregates run directly over the arrays without materializing objects.
+
+Timestamps are stored as seconds since 1970-01-01. Timezone-aware values are
+normalized to UTC and come back as UTC-aware datetimes; naive values round
+trip unchanged.
+"""
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+if TYPE_CHECKING:  # transactions.py imports this module
+    from .transactions import EnergyTransaction
+
+_EPOCH = datetime(1970, 1, 1)
+_NONE_CODE = -1
+
+
+class StringPool:
+    """Bidirectional string <-> integer code table."""
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class TransactionRow:
+    """Read-only view of one row in a :class:`TransactionColumns` store."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "TransactionColumns", index: int) -> None:
+        self._store = store
+        self._index = index
+
+    @property
+    def tx_id(self) -> str:
+        return self._store.tx_ids[self._index]
+
+    @property
+    def producer_id(self) -> str:
+        return self._store.participants.values[self._store.producer_codes[self._index]]
+
+    @property
+    def consumer_id(self) -> str:
+        return self._store.participants.values[self._store.consumer_codes[self._index]]
+
+    @property
+    def kilowatt_hours(self) -> float:
+        return self._store.kilowatt_hours[self._index]
+
+    @property
+    def price_usd(self) -> float:
+        return self._store.price_usd[self._index]
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._store.timestamp_at(self._index)
+
+    @property
+    def energy_source(self) -> str:
+        return self._store.sources.values[self._store.source_codes[self._index]]
+
+    @property
+    def ev_session_id(self) -> str | None:
+        code = self._store.session_codes[self._index]
+        return None if code == _NONE_CODE else self._store.sessions.values[code]
+
+    def to_transaction(self) -> "EnergyTransaction":
+        from .transactions import EnergyTransaction
+
+        return EnergyTransaction(
+            tx_id=self.tx_id,
+            producer_id=self.producer_id,
+            consumer_id=self.consumer_id,
+            kilowatt_hours=self.kilowatt_hours,
+            price_usd=self.price_usd,
+            timestamp=self.timestamp,
+            energy_source=self.energy_source,
+            ev_session_id=self.ev_session_id,
+        )
+
+
+class TransactionColumns:
+    """Array-backed table of energy transactions; rows are appended, or truncated on rollback."""
+
+    def __init__(self) -> None:
+        self.tx_ids: List[str] = []
+        self.participants = StringPool()
+        self.sources = StringPool()
+        self.sessions = StringPool()
+        self.producer_codes = array("I")
+        self.consumer_codes = array("I")
+        self.source_codes = array("I")
+        self.session_codes = array("i")
+        self.kilowatt_hours = array("d")
+        self.price_usd = array("d")
+        self.timestamps = array("d")
+        self.utc_flags = array("b")
+
+    def __len__(self) -> int:
+        return len(self.tx_ids)
+
+    def __getitem__(self, index: int) -> TransactionRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return TransactionRow(self, index)
+
+    def __iter__(self) -> Iterator[TransactionRow]:
+        for index in range(len(self)):
+            yield TransactionRow(self, index)
+
+    def append(self, transaction: "EnergyTransaction") -> None:
+        timestamp = transaction.timestamp
+        is_utc = timestamp.tzinfo is not None
+        if is_utc:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        self.tx_ids.append(transaction.tx_id)
+        self.producer_codes.append(self.participants.code(transaction.producer_id))
+        self.consumer_codes.append(self.participants.code(transaction.consumer_id))
+        self.source_codes.append(self.sources.code(transaction.energy_source))
+        session = transaction.ev_session_id
+        self.session_codes.append(_NONE_CODE if session is None else self.sessions.code(session))
+        self.kilowatt_hours.append(transaction.kilowatt_hours)
+        self.price_usd.append(transaction.price_usd)
+        self.timestamps.append((timestamp - _EPOCH).total_seconds())
+        self.utc_flags.append(is_utc)
+
+    def extend(self, transactions: Iterable["EnergyTransaction"]) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+
+    def truncate(self, length: int) -> None:
+        """Drop every row from ``length`` on, e.g. to undo a write the ledger rejected."""
+
+        for column in (
+            self.tx_ids,
+            self.producer_codes,
+            self.consumer_codes,
+            self.source_codes,
+            self.session_codes,
+            self.kilowatt_hours,
+            self.price_usd,
+            self.timestamps,
+            self.utc_flags,
+        ):
+            del column[length:]
+
+    def timestamp_at(self, index: int) -> datetime:
+        value = _EPOCH + timedelta(seconds=self.timestamps[index])
+        return value.replace(tzinfo=timezone.utc) if self.utc_flags[index] else value
+
+    def transactions(self) -> List["EnergyTransaction"]:
+        """Materialize every row as an :class:`EnergyTransaction`."""
+
+        return [row.to_transaction() for row in self]
+
+    # Aggregates ----------------------------------------------------------
+
+    def total_kwh_by_producer(self) -> Dict[str, float]:
+        totals = [0.0] * len(self.participants)
+        for code, kilowatt_hours in zip(self.producer_codes, self.kilowatt_hours):
+            totals[code] += kilowatt_hours
+        produced = set(self.producer_codes)
+        return {self.participants.values[code]: totals[code] for code in sorted(produced)}
+
+    def vwap_by_hour(self) -> Dict[datetime, float]:
+        """Volume-weighted average price (USD per kWh) for each clock hour.
+
+        ``price_usd`` is the total price of a trade, so the hourly VWAP is the
+        summed price over the summed energy. Hours are keyed by their naive
+        start time (UTC for timezone-aware trades).
+        """
+
+        notional: Dict[int, float] = defaultdict(float)
+        volume: Dict[int, float] = defaultdict(float)
+        for seconds, kilowatt_hours, price in zip(self.timestamps, self.kilowatt_hours, self.price_usd):
+            hour = int(seconds // 3600)
+            notional[hour] += price
+            volume[hour] += kilowatt_hours
+        return {
+            _EPOCH + timedelta(hours=hour): notional[hour] / volume[hour]
+            for hour in sorted(volume)
+            if volume[hour]
+        }
@@ -1,6 +1,167 @@
 """Configuration for grid interconnects and compliance."""
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+_JOURNAL_LENGTH = 1024
+
+
+class TopologyChange(NamedTuple):
+    """One journaled edit: ``version`` moved from ``before`` to ``after``."""
+
+    before: int
+    after: int
+    kind: str  # "add", "remove", or "line"
+    source: str
+    target: str
+
+
+class _Adjacency(list):
+    """Neighbor list that reports in-place edits to its owning graph."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "GridGraph", neighbors: Iterable[str] = ()):
+        super().__init__(neighbors)
+        self._graph = graph
+
+    def _changed(self) -> None:
+        self._graph.version += 1
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._changed()
+        return result
+
+    def append(self, value):
+        super().append(value)
+        self._changed()
+
+    def extend(self, values):
+        super().extend(values)
+        self._changed()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._changed()
+
+    def remove(self, value):
+        super().remove(value)
+        self._changed()
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._changed()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+class GridGraph(dict):
+    """Adjacency mapping of grid nodes with a change counter.
+
+    ``version`` increases on every mutation, including in-place edits of a
+    node's neighbor list, so derived structures such as route tables can tell
+    cheaply whether they are stale. Edits made through the
+    :class:`InterconnectConfig` topology API are also journaled in
+    ``changes`` so caches can invalidate only what an edge affects; any other
+    edit leaves a gap in the journal, which consumers treat as "everything
+    changed".
+    """
+
+    def __init__(self, nodes: Dict[str, List[str]] | None = None):
+        super().__init__()
+        self.version = 0
+        self.changes: deque = deque(maxlen=_JOURNAL_LENGTH)
+        for node, neighbors in (nodes or {}).items():
+            dict.__setitem__(self, node, _Adjacency(self, neighbors))
+
+    def __setitem__(self, node, neighbors):
+        dict.__setitem__(self, node, _Adjacency(self, neighbors))
+        self.version += 1
+
+    def __delitem__(self, node):
+        dict.__delitem__(self, node)
+        self.version += 1
+
+    def __reduce__(self):
+        return (GridGraph, ({node: list(neighbors) for node, neighbors in self.items()},))
+
+    def record_change(self, kind: str, source: str, target: str, before: int) -> TopologyChange:
+        """Journal an edit of ``source -> target`` that started at version ``before``."""
+
+        self.version += 1
+        change = TopologyChange(before, self.version, kind, source, target)
+        self.changes.append(change)
+        return change
+
+    def changes_since(self, version: int) -> List[TopologyChange] | None:
+        """Journaled edits after ``version``, or ``None`` if they don't explain every change."""
+
+        changes = [change for change in self.changes if change.after > version]
+        for change in changes:
+            if change.before != version:
+                return None
+            version = change.after
+        return changes if version == self.version else None
+
+    def update(self, *args, **kwargs):
+        for node, neighbors in dict(*args, **kwargs).items():
+            dict.__setitem__(self, node, _Adjacency(self, neighbors))
+        self.version += 1
+
+    def setdefault(self, node, default=None):
+        if node not in self:
+            self[node] = default or []
+        return dict.__getitem__(self, node)
+
+    def pop(self, node, *default):
+        had_node = node in self
+        value = dict.pop(self, node, *default)
+        if had_node:
+            self.version += 1
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.version += 1
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self.version += 1
+
+
+@dataclass
+class GridLine:
+    """Physical and commercial attributes of a directed grid edge."""
+
+    capacity_mw: float = float("inf")
+    loss_factor: float = 0.0
+    wheeling_cost_usd_per_mwh: float = 1.0
+    owner: str | None = None
+    reactance_pu: float = 0.1
 
 
 @dataclass
@@ -12,6 +173,83 @@ class InterconnectConfig:
     ev_charging_partners: List[str]
     grid_nodes: Dict[str, List[str]]
     regional_constraints: Dict[str, str] = field(default_factory=dict)
+    lines: Dict[str, Dict[str, GridLine]] = field(default_factory=dict)
+    out_of_service: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+
+    def line(self, source: str, target: str) -> GridLine:
+        """Return the attributes of ``source -> target`` or the default line."""
+
+        return self.lines.get(source, {}).get(target, DEFAULT_LINE)
+
+    # Topology changes ------------------------------------------------------
+    # These keep ``grid_nodes.changes`` in step so routers can invalidate
+    # cached routes per edge; editing ``grid_nodes`` directly still works
+    # but makes them drop their whole cache.
+
+    def add_edge(self, source: str, target: str, line: GridLine | None = None) -> None:
+        """Energize ``source -> target``, optionally with line attributes."""
+
+        graph = self.grid_nodes
+        before = graph.version
+        neighbors = graph.setdefault(source, [])
+        if target not in neighbors:
+            neighbors.append(target)
+        if target not in graph:
+            graph[target] = []
+        if line is not None:
+            self.lines.setdefault(source, {})[target] = line
+        graph.record_change("add", source, target, before)
+
+    def remove_edge(self, source: str, target: str) -> None:
+        """Take ``source -> target`` out of the graph (e.g. a line outage).
+
+        Line attributes are kept so a later :meth:`add_edge` restores them.
+        """
+
+        graph = self.grid_nodes
+        neighbors = graph.get(source)
+        if neighbors is None or target not in neighbors:
+            raise KeyError(f"No edge from {source} to {target}")
+        before = graph.version
+        neighbors.remove(target)
+        graph.record_change("remove", source, target, before)
+
+    def set_line(self, source: str, target: str, line: GridLine) -> None:
+        """Replace the attributes of an existing edge, e.g. a curtailed capacity."""
+
+        graph = self.grid_nodes
+        if target not in graph.get(source, ()):
+            raise KeyError(f"No edge from {source} to {target}")
+        before = graph.version
+        self.lines.setdefault(source, {})[target] = line
+        graph.record_change("line", source, target, before)
+
+    def set_node_in_service(self, node: str, in_service: bool) -> None:
+        """Remove every edge touching ``node``, or restore the edges removed earlier."""
+
+        graph = self.grid_nodes
+        if node not in graph:
+            raise KeyError(f"Unknown grid node {node}")
+        if in_service:
+            for source, target in self.out_of_service.pop(node, []):
+                if source in graph and target in graph:
+                    self.add_edge(source, target)
+            return
+        if node in self.out_of_service:
+            return
+        removed = [(node, target) for target in graph[node]]
+        removed += [(source, node) for source, neighbors in graph.items() if source != node and node in neighbors]
+        for source, target in removed:
+            self.remove_edge(source, target)
+        self.out_of_service[node] = removed
+
+    def __setattr__(self, name, value):
+        if name == "grid_nodes" and not isinstance(value, GridGraph):
+            value = GridGraph(value)
+        super().__setattr__(name, value)
+
+
+DEFAULT_LINE = GridLine()
 
 
 OHIO_INTERCONNECT = InterconnectConfig(
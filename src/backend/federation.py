@@ -0,0 +1,305 @@
+"""Trading across several interconnects.
+
+A :class:`Federation` holds one :class:`InterconnectConfig`, :class:`Registry`
+and table-mode :class:`Router` per region plus the :class:`TiePoint` lines
+that join regions. Cross-region routes are found hierarchically: a small
+overlay graph links the tie-point endpoints ("portals") of every region, with
+intra-region legs priced by the region's route table, and only the chosen
+legs are expanded into node paths.
+
+Order clearing stays regional. :meth:`Federation.clear` runs one
+:class:`MatchingEngine` per region in a process pool and the parent process
+logs the resulting fills, so regions scale across cores while every ledger
+write happens in one place. Orders left (partly) unmatched come back in
+:attr:`ClearingResult.unfilled` with their remaining kWh, ready to be carried
+into the next round. Fills are logged as ``{region}-fill-{bid_id}-{ask_id}``,
+so tx_ids stay unique across rounds and across restarts of the parent.
+"""
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .config import GridLine, InterconnectConfig
+from .matching import Fill, MatchingEngine, fill_record, fill_tx_id
+from .registration import Participant, Registry
+from .routing import Router
+from .transactions import TransactionLogger
+from src.ledger.adapter import LedgerAdapter
+
+RegionNode = Tuple[str, str]
+
+
+@dataclass
+class TiePoint:
+    """A directed line from a node in one region to a node in another."""
+
+    from_region: str
+    from_node: str
+    to_region: str
+    to_node: str
+    capacity_mw: float = float("inf")
+
+
+@dataclass
+class ClearingOrder:
+    """An ask or bid submitted for regional clearing.
+
+    Bids double as the charge request :meth:`MatchingEngine.submit_bid`
+    expects, so ``price_usd`` is the total limit for the order.
+    """
+
+    order_id: str
+    participant_id: str
+    side: str
+    price_per_kwh: float
+    kilowatt_hours: float
+    desired_start: datetime | None = None
+    station_id: str | None = None
+    priority: str = "standard"
+
+    @property
+    def price_usd(self) -> float:
+        return self.price_per_kwh * self.kilowatt_hours
+
+
+@dataclass
+class ClearingResult:
+    fills: Dict[str, List[Fill]] = field(default_factory=dict)
+    unfilled: Dict[str, List[ClearingOrder]] = field(default_factory=dict)
+    payloads: List[Dict] = field(default_factory=list)
+    rejected: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class Federation:
+    """Hierarchical routing and parallel clearing across interconnect regions."""
+
+    def __init__(
+        self,
+        configs: Mapping[str, InterconnectConfig],
+        tie_points: Iterable[TiePoint] = (),
+        max_workers: int | None = None,
+    ):
+        self.configs: Dict[str, InterconnectConfig] = dict(configs)
+        self.registries = {region: Registry(config) for region, config in self.configs.items()}
+        self.routers = {region: Router(config, mode="table") for region, config in self.configs.items()}
+        self.max_workers = max_workers
+        self.tie_points: List[TiePoint] = []
+        self._ties: Dict[RegionNode, List[TiePoint]] = {}
+        self._portals: Dict[str, List[str]] = {region: [] for region in self.configs}
+        self._pool: ProcessPoolExecutor | None = None
+        for tie in tie_points:
+            self.add_tie_point(tie)
+
+    def add_tie_point(self, tie: TiePoint) -> None:
+        for region, node in ((tie.from_region, tie.from_node), (tie.to_region, tie.to_node)):
+            if region not in self.configs:
+                raise KeyError(f"Unknown region {region}")
+            if node not in self.configs[region].grid_nodes:
+                raise ValueError(f"Tie point node {node} is not in region {region}")
+            if node not in self._portals[region]:
+                self._portals[region].append(node)
+        self.tie_points.append(tie)
+        self._ties.setdefault((tie.from_region, tie.from_node), []).append(tie)
+
+    def register(self, region: str, participant: Participant) -> None:
+        self.registries[region].register(participant)
+
+    # Routing ---------------------------------------------------------------
+
+    def route(
+        self,
+        source_region: str,
+        start: str,
+        target_region: str,
+        goal: str,
+        demand_mw: float = 0.0,
+    ) -> List[RegionNode]:
+        """Return the ``(region, node)`` path from ``start`` to ``goal`` or ``[]``.
+
+        Hops count equally whether they cross a tie point or not; tie points
+        below ``demand_mw`` are skipped.
+        """
+
+        source, target = (source_region, start), (target_region, goal)
+        best: Dict[RegionNode, float] = {source: 0}
+        previous: Dict[RegionNode, Tuple[RegionNode, bool]] = {}
+        heap: List[Tuple[float, RegionNode]] = [(0, source)]
+        while heap:
+            cost, current = heapq.heappop(heap)
+            if current == target:
+                return self._expand(source, target, previous)
+            if cost > best[current]:
+                continue
+            for neighbor, step, crosses in self._overlay_edges(current, target, demand_mw):
+                candidate = cost + step
+                if candidate < best.get(neighbor, float("inf")):
+                    best[neighbor] = candidate
+                    previous[neighbor] = (current, crosses)
+                    heapq.heappush(heap, (candidate, neighbor))
+        return []
+
+    def _overlay_edges(self, current: RegionNode, target: RegionNode, demand_mw: float):
+        region, node = current
+        router = self.routers[region]
+        exits = list(self._portals[region])
+        if target[0] == region:
+            exits.append(target[1])
+        for other in exits:
+            if other != node:
+                leg = router.route_between(node, other)
+                if leg:
+                    yield (region, other), len(leg) - 1, False
+        for tie in self._ties.get(current, ()):
+            if tie.capacity_mw >= demand_mw:
+                yield (tie.to_region, tie.to_node), 1, True
+
+    def _expand(
+        self,
+        source: RegionNode,
+        target: RegionNode,
+        previous: Dict[RegionNode, Tuple[RegionNode, bool]],
+    ) -> List[RegionNode]:
+        stops = [target]
+        while stops[-1] != source:
+            stops.append(previous[stops[-1]][0])
+        stops.reverse()
+        path = [source]
+        for (region, node), stop in zip(stops, stops[1:]):
+            if previous[stop][1]:
+                path.append(stop)
+            else:
+                path.extend((region, hop) for hop in self.routers[region].route_between(node, stop[1])[1:])
+        return path
+
+    # Clearing --------------------------------------------------------------
+
+    def clear(self, orders: Mapping[str, Iterable[ClearingOrder]], ledger: LedgerAdapter | None = None) -> ClearingResult:
+        """Match each region's orders in parallel and log the fills.
+
+        Orders are matched in the given sequence within their own region.
+        Orders still resting afterwards are returned in ``unfilled`` as
+        copies whose ``kilowatt_hours`` is the unmatched remainder.
+        When ``ledger`` (a ledger adapter) is given, all fills are
+        logged from this process, one batched append per region.
+        """
+
+        jobs = {}
+        for region, region_orders in orders.items():
+            region_orders = list(region_orders)
+            ids = {order.participant_id for order in region_orders}
+            jobs[region] = (
+                self.configs[region],
+                list(self.registries[region].get_many(ids).values()),
+                region_orders,
+            )
+
+        if self.max_workers == 0 or len(jobs) <= 1:
+            outcomes = {region: _clear_region(*job) for region, job in jobs.items()}
+        else:
+            pool = self._executor()
+            futures = {region: pool.submit(_clear_region, *job) for region, job in jobs.items()}
+            outcomes = {region: future.result() for region, future in futures.items()}
+
+        result = ClearingResult()
+        for region, (fills, rejected, resting) in outcomes.items():
+            by_id = {order.order_id: order for order in jobs[region][2]}
+            result.fills[region] = fills
+            result.unfilled[region] = [
+                replace(by_id[order_id], kilowatt_hours=remaining) for order_id, remaining in resting
+            ]
+            result.rejected.extend(rejected)
+            if ledger is not None and fills:
+                result.payloads.extend(self._log(region, fills, jobs[region][2], ledger))
+        return result
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _log(self, region: str, fills: List[Fill], orders: List[ClearingOrder], ledger: LedgerAdapter) -> List[Dict]:
+        bids = {order.order_id: order for order in orders if order.side == "bid"}
+        registry = self.registries[region]
+        records = []
+        for fill in fills:
+            bid = bids[fill.bid_id]
+            records.append(
+                fill_record(
+                    fill,
+                    fill_tx_id(fill, prefix=f"{region}-"),
+                    registry.get(fill.producer_id),
+                    registry.get(fill.consumer_id),
+                    bid.desired_start,
+                    bid.station_id,
+                    bid.priority,
+                )
+            )
+        return TransactionLogger(self.configs[region], ledger).log_transactions(records)
+
+
+def _clear_region(
+    config: InterconnectConfig,
+    participants: List[Participant],
+    orders: List[ClearingOrder],
+) -> Tuple[List[Fill], List[Tuple[str, str]], List[Tuple[str, float]]]:
+    """Run one region's double auction; executed in a worker process.
+
+    Returns the fills, the rejected ``(order_id, reason)`` pairs and the
+    ``(order_id, remaining_kwh)`` of every order left resting.
+    """
+
+    registry = Registry(config)
+    registry.register_many(participants)
+    engine = MatchingEngine(registry, Router(config, mode="table"))
+    fills: List[Fill] = []
+    rejected: List[Tuple[str, str]] = []
+    for order in orders:
+        try:
+            if order.side == "ask":
+                fills.extend(
+                    engine.submit_ask(order.order_id, order.participant_id, order.price_per_kwh, order.kilowatt_hours)
+                )
+            elif order.side == "bid":
+                fills.extend(engine.submit_bid(order.order_id, order.participant_id, order))
+            else:
+                raise ValueError(f"Unknown order side {order.side}")
+        except (KeyError, ValueError) as exc:
+            rejected.append((order.order_id, str(exc)))
+    resting = [(order.order_id, order.remaining_kwh) for order in engine.orders.values()]
+    return fills, rejected, resting
+
+
+def load_federation(path: str | os.PathLike, max_workers: int | None = None) -> Federation:
+    """Build a :class:`Federation` from a JSON file.
+
+    The file holds ``{"regions": {name: {...}}, "tie_points": [...]}`` where
+    each region uses the :class:`InterconnectConfig` field names and
+    ``lines`` maps ``source -> target -> GridLine fields``.
+    """
+
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    configs = {}
+    for region, fields in data["regions"].items():
+        fields = dict(fields)
+        lines = fields.pop("lines", {})
+        fields.setdefault("name", region)
+        fields.setdefault("transmission_operator", "")
+        for key in ("compliance_rules", "utility_partners", "ev_charging_partners"):
+            fields.setdefault(key, [])
+        fields["lines"] = {
+            source: {target: GridLine(**attributes) for target, attributes in targets.items()}
+            for source, targets in lines.items()
+        }
+        configs[region] = InterconnectConfig(**fields)
+    ties = [TiePoint(**tie) for tie in data.get("tie_points", [])]
+    return Federation(configs, ties, max_workers=max_workers)
@@ -0,0 +1,281 @@
+"""DC power-flow congestion checks for batches of trades.
+
+Routing only proves that a path exists; physically, every trade spreads over
+all parallel lines in proportion to their susceptance. :class:`DCPowerFlow`
+linearizes the network (lossless, flat voltages, small angles) and
+precomputes its PTDF matrix: ``ptdf[l, b]`` is the MW flowing on branch ``l``
+per MW injected at bus ``b`` and withdrawn at the island's slack bus. Flows
+for any set of balanced injections are then one matrix product, so a batch
+of ``k`` trade scenarios is checked with a single ``(branches x buses) @
+(buses x k)`` multiply. :class:`FlowState` keeps the flows of committed trades
+and adds or removes one trade in O(branches). After a topology change it
+recomputes them. If the change left a committed trade without an electrical
+path, it raises ``ValueError`` naming the trade and keeps its previous state
+until the trade is removed (see :meth:`FlowState.islanded`).
+
+Each pair of nodes joined in either direction in ``grid_nodes`` is one
+branch, with the smallest ``capacity_mw`` and the first ``reactance_pu``
+given for the two directions. The PTDF is dense, costing
+``8 * branches * buses`` bytes and a solve cubic in the bus count. That suits
+interconnect-sized models of a few thousand buses, not distribution feeders.
+
+Requires NumPy (``pip install numpy``). The module imports without it, but
+constructing :class:`DCPowerFlow` raises ``ImportError``.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .config import InterconnectConfig
+
+Trade = Tuple[str, str, float]
+
+
+@dataclass
+class Overload:
+    source: str
+    target: str
+    flow_mw: float
+    limit_mw: float
+
+    @property
+    def loading(self) -> float:
+        return abs(self.flow_mw) / self.limit_mw
+
+
+class DCPowerFlow:
+    """PTDF-based DC power flow over an interconnect graph.
+
+    The model is rebuilt automatically when ``grid_nodes`` changes; call
+    :meth:`rebuild` after editing ``interconnect.lines`` in place.
+    """
+
+    def __init__(self, interconnect: InterconnectConfig):
+        if np is None:
+            raise ImportError("DCPowerFlow requires numpy; install it with 'pip install numpy'")
+        self.interconnect = interconnect
+        self._graph = None
+        self._version = -1
+        self.generation = 0
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        graph = self.interconnect.grid_nodes
+        self._graph, self._version = graph, getattr(graph, "version", 0)
+        self.generation += 1
+        self.buses: List[str] = sorted(set(graph) | {target for targets in graph.values() for target in targets})
+        self.bus_index: Dict[str, int] = {bus: index for index, bus in enumerate(self.buses)}
+
+        branches: Dict[Tuple[str, str], List[float]] = {}
+        for source, targets in graph.items():
+            for target in targets:
+                if source == target:
+                    continue
+                line = self.interconnect.line(source, target)
+                key = (source, target) if source < target else (target, source)
+                existing = branches.get(key)
+                if existing is None:
+                    branches[key] = [line.capacity_mw, line.reactance_pu]
+                else:
+                    existing[0] = min(existing[0], line.capacity_mw)
+        self.branches: List[Tuple[str, str]] = list(branches)
+        self.limits = np.array([attributes[0] for attributes in branches.values()], dtype=float)
+        susceptance = np.array([1.0 / attributes[1] for attributes in branches.values()], dtype=float)
+
+        bus_count, branch_count = len(self.buses), len(self.branches)
+        incidence = np.zeros((branch_count, bus_count))
+        rows = np.arange(branch_count)
+        incidence[rows, [self.bus_index[source] for source, _ in self.branches]] = 1.0
+        incidence[rows, [self.bus_index[target] for _, target in self.branches]] = -1.0
+        self.island, self.slack_buses = self._islands()
+
+        # Ground one slack bus per island so the reduced susceptance matrix is invertible.
+        slack = np.zeros(bus_count, dtype=bool)
+        slack[[self.bus_index[bus] for bus in self.slack_buses]] = True
+        keep = np.flatnonzero(~slack)
+        weighted = incidence * susceptance[:, None]
+        laplacian = incidence.T @ weighted
+        self.ptdf = np.zeros((branch_count, bus_count))
+        if keep.size:
+            reactance = np.linalg.inv(laplacian[np.ix_(keep, keep)])
+            self.ptdf[:, keep] = weighted[:, keep] @ reactance
+
+    def _refresh(self) -> None:
+        graph = self.interconnect.grid_nodes
+        if graph is not self._graph or getattr(graph, "version", 0) != self._version:
+            self.rebuild()
+
+    def _islands(self) -> Tuple[List[int], List[str]]:
+        """Island number of every bus, plus the first bus of each island as its slack."""
+
+        neighbors: List[List[int]] = [[] for _ in self.buses]
+        for source, target in self.branches:
+            neighbors[self.bus_index[source]].append(self.bus_index[target])
+            neighbors[self.bus_index[target]].append(self.bus_index[source])
+        island = [-1] * len(self.buses)
+        roots: List[str] = []
+        for root in range(len(self.buses)):
+            if island[root] >= 0:
+                continue
+            island[root] = count = len(roots)
+            roots.append(self.buses[root])
+            queue = deque([root])
+            while queue:
+                bus = queue.popleft()
+                for neighbor in neighbors[bus]:
+                    if island[neighbor] < 0:
+                        island[neighbor] = count
+                        queue.append(neighbor)
+        return island, roots
+
+    # Flows -----------------------------------------------------------------
+
+    def transfer(self, source: str, sink: str) -> "np.ndarray":
+        """Branch flows per MW moved from ``source`` to ``sink``."""
+
+        self._refresh()
+        try:
+            start, end = self.bus_index[source], self.bus_index[sink]
+        except KeyError as exc:
+            raise KeyError(f"Node {exc.args[0]} is not in the interconnect") from exc
+        if self.island[start] != self.island[end]:
+            raise ValueError(f"No electrical path from {source} to {sink}")
+        return self.ptdf[:, start] - self.ptdf[:, end]
+
+    def injections(self, trades: Iterable[Trade]) -> "np.ndarray":
+        """Net injection vector (MW per bus) for ``(source, sink, mw)`` trades."""
+
+        self._refresh()
+        vector = np.zeros(len(self.buses))
+        for source, sink, megawatts in trades:
+            if self.island[self.bus_index[source]] != self.island[self.bus_index[sink]]:
+                raise ValueError(f"No electrical path from {source} to {sink}")
+            vector[self.bus_index[source]] += megawatts
+            vector[self.bus_index[sink]] -= megawatts
+        return vector
+
+    def flows(self, injections: "np.ndarray") -> "np.ndarray":
+        """Branch flows for a ``(buses,)`` vector or a ``(buses, k)`` batch of injections.
+
+        Injections must balance within each island; the slack bus absorbs any
+        remainder, which then shows up as flow.
+        """
+
+        self._refresh()
+        return self.ptdf @ injections
+
+    def loadings(self, injections: "np.ndarray") -> "np.ndarray":
+        """``|flow| / limit`` for every branch (and batch column); unlimited lines load 0."""
+
+        flows = self.flows(injections)
+        limits = self.limits if flows.ndim == 1 else self.limits[:, None]
+        return np.abs(flows) / limits
+
+    def feasible(self, injections: "np.ndarray", base_flows: "np.ndarray | None" = None) -> "np.ndarray | bool":
+        """Whether no branch exceeds its limit, per batch column."""
+
+        flows = self.flows(injections)
+        if base_flows is not None:
+            flows = flows + (base_flows if flows.ndim == 1 else base_flows[:, None])
+        limits = self.limits if flows.ndim == 1 else self.limits[:, None]
+        within = np.abs(flows) <= limits + 1e-9
+        return bool(within.all()) if flows.ndim == 1 else within.all(axis=0)
+
+    def overloads(self, flows: "np.ndarray") -> List[Overload]:
+        """Branches whose ``flows`` exceed their limit, worst first."""
+
+        over = np.flatnonzero(np.abs(flows) > self.limits + 1e-9)
+        found = [
+            Overload(self.branches[index][0], self.branches[index][1], float(flows[index]), float(self.limits[index]))
+            for index in over
+        ]
+        return sorted(found, key=lambda overload: overload.loading, reverse=True)
+
+
+class FlowState:
+    """Line flows of the trades committed so far, updated one trade at a time."""
+
+    def __init__(self, model: DCPowerFlow):
+        self.model = model
+        self.trades: Dict[str, Trade] = {}
+        self._generation = model.generation
+        self.flows = np.zeros(len(model.branches))
+
+    def add(self, trade_id: str, source: str, sink: str, megawatts: float, enforce: bool = True) -> None:
+        """Commit a trade; with ``enforce`` raise ``ValueError`` instead of overloading a line."""
+
+        if trade_id in self.trades:
+            raise ValueError(f"Trade {trade_id} already committed")
+        self._sync()
+        flows = self.flows + megawatts * self.model.transfer(source, sink)
+        if enforce:
+            overloads = self.model.overloads(flows)
+            if overloads:
+                worst = overloads[0]
+                raise ValueError(
+                    f"Trade {trade_id} would load {worst.source}-{worst.target} to {worst.loading:.0%} of its limit"
+                )
+        self.flows = flows
+        self.trades[trade_id] = (source, sink, megawatts)
+
+    def remove(self, trade_id: str) -> None:
+        """Withdraw a committed trade; this also works for a trade :meth:`islanded` reports."""
+
+        if trade_id not in self.trades:
+            raise KeyError(f"Trade {trade_id} is not committed")
+        self.model._refresh()
+        if self._generation != self.model.generation:
+            remaining = {key: trade for key, trade in self.trades.items() if key != trade_id}
+            flows = self._recompute(remaining)
+        else:
+            source, sink, megawatts = self.trades[trade_id]
+            flows = self.flows - megawatts * self.model.transfer(source, sink)
+        self.flows, self._generation = flows, self.model.generation
+        del self.trades[trade_id]
+
+    def check(self, batch: Sequence[Sequence[Trade]]) -> "np.ndarray":
+        """Whether each candidate group of trades fits on top of the committed flows.
+
+        All groups are evaluated with one matrix multiply.
+        """
+
+        self._sync()
+        if not batch:
+            return np.zeros(0, dtype=bool)
+        injections = np.column_stack([self.model.injections(trades) for trades in batch])
+        return self.model.feasible(injections, self.flows)
+
+    def loadings(self) -> "np.ndarray":
+        self._sync()
+        return np.abs(self.flows) / self.model.limits
+
+    def islanded(self) -> List[str]:
+        """Committed trades whose endpoints the current topology no longer connects."""
+
+        self.model._refresh()
+        island, index = self.model.island, self.model.bus_index
+        return [
+            trade_id
+            for trade_id, (source, sink, _) in self.trades.items()
+            if source not in index or sink not in index or island[index[source]] != island[index[sink]]
+        ]
+
+    def _sync(self) -> None:
+        """Recompute flows from the committed trades after a topology change."""
+
+        self.model._refresh()
+        if self._generation != self.model.generation:
+            self.flows, self._generation = self._recompute(self.trades), self.model.generation
+
+    def _recompute(self, trades: Dict[str, Trade]) -> "np.ndarray":
+        stranded = [trade_id for trade_id in self.islanded() if trade_id in trades]
+        if stranded:
+            raise ValueError(
+                f"Committed trades {', '.join(stranded)} have no electrical path after a topology change; remove them"
+            )
+        return self.model.flows(self.model.injections(trades.values()))
@@ -0,0 +1,135 @@
+"""Find registered producers that can serve a grid node.
+
+:class:`ProducerLocator` joins a reverse-reachability view of
+``InterconnectConfig.grid_nodes`` with the producers registered at each node.
+For a target node it runs one reverse BFS (hop counts) and one reverse
+Dijkstra (route cost from :class:`WeightedRoutingEngine`) and caches the
+upstream nodes in both orders, so "top five producers within three hops of
+EVHub-Dayton, cheapest first" walks candidate nodes in order instead of
+routing every producer. The per-node producer map is filled once from
+``Registry.iter_participants`` (streamed from SQLite for a
+:class:`~src.backend.registry_store.PersistentRegistry`, so consumers are never
+loaded), then fed by a registry listener. The cached reachability is dropped
+whenever the graph changes.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .config import GridGraph
+from .registration import Participant, Registry
+from .weighted_routing import WeightedRoutingEngine
+
+PRODUCER_ROLES = ("producer", "hybrid")
+RANKINGS = ("hops", "cost")
+
+
+@dataclass
+class ProducerMatch:
+    participant: Participant
+    node: str
+    hops: int
+    cost: float
+
+
+class _Reach:
+    """Nodes that can deliver to one target, in hop and cost order."""
+
+    __slots__ = ("by_hops", "by_cost")
+
+    def __init__(self, hops: Dict[str, int], costs: Dict[str, float]):
+        entries = [(hops[node], costs.get(node, float("inf")), node) for node in hops]
+        self.by_hops: List[Tuple[int, float, str]] = sorted(entries)
+        self.by_cost: List[Tuple[int, float, str]] = sorted(entries, key=lambda entry: (entry[1], entry[0], entry[2]))
+
+
+class ProducerLocator:
+    """Top-k nearest or cheapest producer lookup for a consumer node."""
+
+    def __init__(self, registry: Registry, engine: WeightedRoutingEngine | None = None):
+        self.registry = registry
+        self.interconnect = registry.interconnect
+        self.engine = engine or WeightedRoutingEngine(self.interconnect)
+        self._producers: Dict[str, Dict[str, Participant]] = {}
+        self._reach: Dict[str, _Reach] = {}
+        self._upstream: Dict[str, List[str]] | None = None
+        self._graph = None
+        self._version = -1
+        for participant in registry.iter_participants(PRODUCER_ROLES):
+            self.record(participant)
+        registry.add_listener(self.record)
+
+    def record(self, participant: Participant) -> None:
+        """Index a newly registered participant if it can supply energy."""
+
+        node = participant.metadata.get("node")
+        if participant.role in PRODUCER_ROLES and node is not None:
+            self._producers.setdefault(node, {})[participant.participant_id] = participant
+
+    def nearest_producers(
+        self,
+        node: str,
+        limit: int = 5,
+        max_hops: int | None = None,
+        rank: str = "hops",
+        min_capacity_kw: float = 0.0,
+    ) -> List[ProducerMatch]:
+        """Return up to ``limit`` producers that can route energy to ``node``.
+
+        ``rank="hops"`` orders by hop count then route cost; ``rank="cost"``
+        orders by route cost then hops. Producers at the same node are
+        ordered by descending capacity, then ID.
+        """
+
+        if rank not in RANKINGS:
+            raise ValueError(f"rank must be one of {', '.join(RANKINGS)}")
+        if limit <= 0:
+            return []
+        reach = self._reachability(node)
+        ordered = reach.by_hops if rank == "hops" else reach.by_cost
+        matches: List[ProducerMatch] = []
+        for hops, cost, source in ordered:
+            if max_hops is not None and hops > max_hops:
+                if rank == "hops":
+                    break
+                continue
+            producers = self._producers.get(source)
+            if not producers:
+                continue
+            candidates = sorted(
+                (p for p in producers.values() if p.capacity_kw >= min_capacity_kw),
+                key=lambda p: (-p.capacity_kw, p.participant_id),
+            )
+            matches.extend(ProducerMatch(p, source, hops, cost) for p in candidates)
+            if len(matches) >= limit:
+                break
+        return matches[:limit]
+
+    def _reachability(self, node: str) -> _Reach:
+        graph = self.interconnect.grid_nodes
+        if graph is not self._graph or getattr(graph, "version", None) != self._version:
+            self._reach.clear()
+            self._upstream = None
+            self._graph = graph
+            self._version = graph.version if isinstance(graph, GridGraph) else None
+        reach = self._reach.get(node)
+        if reach is None:
+            reach = self._reach[node] = _Reach(self._hops_to(node), self.engine.distances_to(node))
+        return reach
+
+    def _hops_to(self, node: str) -> Dict[str, int]:
+        upstream = self._upstream
+        if upstream is None:
+            upstream = self._upstream = {}
+            for source, neighbors in self.interconnect.grid_nodes.items():
+                for neighbor in neighbors:
+                    upstream.setdefault(neighbor, []).append(source)
+        hops = {node: 0}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            for source in upstream.get(current, ()):
+                if source not in hops:
+                    hops[source] = hops[current] + 1
+                    queue.append(source)
+        return hops
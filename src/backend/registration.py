@@ -1,8 +1,16 @@
 """Producer and consumer registration logic."""
 from dataclasses import dataclass, field
-from typing import Dict
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, Iterator, List
 
 from .config import InterconnectConfig
+from src.observability import metrics
+
+ROLES = {"producer", "consumer", "hybrid"}
+REGISTER_SECONDS = metrics.histogram(
+    "gridshare_registry_register_seconds", "Latency of Registry.register calls", "seconds"
+)
+REGISTERED = metrics.counter("gridshare_registry_participants_registered_total", "Participants registered")
 
 
 @dataclass
@@ -13,19 +21,55 @@ class Participant:
     metadata: Dict[str, str] = field(default_factory=dict)
 
 
+RegistryListener = Callable[[Participant], None]
+
+
+def validate_role(participant: Participant) -> None:
+    if participant.role not in ROLES:
+        raise ValueError("role must be 'producer', 'consumer', or 'hybrid'")
+
+
 class Registry:
     """Simple in-memory registry for producers and consumers."""
 
     def __init__(self, interconnect: InterconnectConfig):
         self.interconnect = interconnect
         self.entries: Dict[str, Participant] = {}
+        self._by_node: Dict[str, Dict[str, Participant]] = {}
+        self._listeners: List[RegistryListener] = []
+
+    def add_listener(self, listener: RegistryListener) -> None:
+        """Call ``listener(participant)`` after every future registration."""
+
+        self._listeners.append(listener)
 
     def register(self, participant: Participant) -> None:
+        started = perf_counter_ns() if metrics.enabled else 0
         if participant.participant_id in self.entries:
             raise ValueError(f"Participant {participant.participant_id} already registered")
-        if participant.role not in {"producer", "consumer", "hybrid"}:
-            raise ValueError("role must be 'producer', 'consumer', or 'hybrid'")
+        validate_role(participant)
         self.entries[participant.participant_id] = participant
+        node = participant.metadata.get("node")
+        if node is not None:
+            self._by_node.setdefault(node, {})[participant.participant_id] = participant
+        for listener in self._listeners:
+            listener(participant)
+        if started:
+            REGISTER_SECONDS.record(perf_counter_ns() - started)
+            REGISTERED.inc()
+
+    def register_many(self, participants: Iterable[Participant]) -> None:
+        """Register several participants; nothing is stored if any is invalid."""
+
+        participants = list(participants)
+        seen = set()
+        for participant in participants:
+            if participant.participant_id in self.entries or participant.participant_id in seen:
+                raise ValueError(f"Participant {participant.participant_id} already registered")
+            validate_role(participant)
+            seen.add(participant.participant_id)
+        for participant in participants:
+            self.register(participant)
 
     def get(self, participant_id: str) -> Participant:
         try:
@@ -33,6 +77,29 @@ class Registry:
         except KeyError as exc:
             raise KeyError(f"Participant {participant_id} is not registered") from exc
 
+    def contains(self, participant_id: str) -> bool:
+        return participant_id in self.entries
+
+    def get_many(self, participant_ids: Iterable[str]) -> Dict[str, Participant]:
+        """Return the registered subset of ``participant_ids`` keyed by ID."""
+
+        entries = self.entries
+        return {pid: entries[pid] for pid in participant_ids if pid in entries}
+
+    def by_node(self, node: str, role: str | None = None) -> List[Participant]:
+        """Participants attached to a grid node, optionally filtered by role."""
+
+        participants = self._by_node.get(node, {}).values()
+        return [participant for participant in participants if role is None or participant.role == role]
+
+    def iter_participants(self, roles: Iterable[str] | None = None) -> Iterator[Participant]:
+        """Yield registered participants, optionally only those with one of ``roles``."""
+
+        roles = None if roles is None else set(roles)
+        for participant in list(self.entries.values()):
+            if roles is None or participant.role in roles:
+                yield participant
+
     @property
     def participants(self) -> Dict[str, Participant]:
         """Return a copy of registered participants keyed by ID."""
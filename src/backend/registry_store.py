@@ -0,0 +1,230 @@
+"""Persistent, sharded participant registry backed by SQLite.
+
+Participants are spread over ``shards`` SQLite files by a stable CRC32 of
+their ID. Each shard keeps the participant row keyed by ID plus an index on
+``(node, role)``, so point lookups, bulk ``get_many`` calls, and "all
+producers at AEP-Prospect" queries never scan the registry. Nothing is loaded
+at startup and shard connections open on first use, which keeps warm starts
+fast regardless of how many meters are registered.
+"""
+import json
+import os
+import sqlite3
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, Iterable, Iterator, List
+
+from .config import InterconnectConfig
+from .registration import REGISTER_SECONDS, REGISTERED, Participant, Registry, RegistryListener, validate_role
+from src.observability import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    participant_id TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    capacity_kw REAL NOT NULL,
+    node TEXT,
+    metadata TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS participants_by_node ON participants (node, role);
+"""
+_COLUMNS = "participant_id, role, capacity_kw, metadata"
+_BATCH = 500
+
+
+def _row(participant: Participant) -> tuple:
+    return (
+        participant.participant_id,
+        participant.role,
+        participant.capacity_kw,
+        participant.metadata.get("node"),
+        json.dumps(participant.metadata, separators=(",", ":")),
+    )
+
+
+def _participant(row: tuple) -> Participant:
+    participant_id, role, capacity_kw, metadata = row
+    return Participant(participant_id=participant_id, role=role, capacity_kw=capacity_kw, metadata=json.loads(metadata))
+
+
+class _ShardedEntries(Mapping):
+    """Read-only mapping view so ``registry.entries`` keeps working."""
+
+    def __init__(self, registry: "PersistentRegistry"):
+        self._registry = registry
+
+    def __getitem__(self, participant_id: str) -> Participant:
+        participant = self._registry._fetch(participant_id)
+        if participant is None:
+            raise KeyError(participant_id)
+        return participant
+
+    def __contains__(self, participant_id) -> bool:
+        return self._registry.contains(participant_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for connection in self._registry._all_shards():
+            for (participant_id,) in connection.execute("SELECT participant_id FROM participants"):
+                yield participant_id
+
+    def __len__(self) -> int:
+        return sum(
+            connection.execute("SELECT COUNT(*) FROM participants").fetchone()[0]
+            for connection in self._registry._all_shards()
+        )
+
+
+class PersistentRegistry(Registry):
+    """Drop-in :class:`Registry` whose entries live in sharded SQLite files."""
+
+    def __init__(self, interconnect: InterconnectConfig, path: str | os.PathLike, shards: int = 16):
+        self.interconnect = interconnect
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shard_count = self._stored_shard_count(shards)
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._listeners: List[RegistryListener] = []
+        self.entries = _ShardedEntries(self)
+
+    # Registry API ----------------------------------------------------------
+
+    def register(self, participant: Participant) -> None:
+        started = perf_counter_ns() if metrics.enabled else 0
+        self.register_many([participant])
+        if started:
+            REGISTER_SECONDS.record(perf_counter_ns() - started)
+
+    def register_many(self, participants: Iterable[Participant]) -> None:
+        """Insert participants with one transaction per shard.
+
+        Raises ``ValueError`` (and stores nothing) if any ID is already taken.
+        """
+
+        participants = list(participants)
+        by_shard: Dict[int, List[tuple]] = {}
+        seen = set()
+        for participant in participants:
+            validate_role(participant)
+            if participant.participant_id in seen:
+                raise ValueError(f"Participant {participant.participant_id} already registered")
+            seen.add(participant.participant_id)
+            by_shard.setdefault(self._shard_of(participant.participant_id), []).append(_row(participant))
+
+        existing = self.get_many(seen)
+        if existing:
+            raise ValueError(f"Participant {next(iter(existing))} already registered")
+        connections = []
+        try:
+            for shard, rows in by_shard.items():
+                connection = self._shard(shard)
+                connection.execute("BEGIN")
+                connections.append(connection)
+                connection.executemany("INSERT INTO participants VALUES (?, ?, ?, ?, ?)", rows)
+        except Exception:
+            for connection in connections:
+                connection.rollback()
+            raise
+        for connection in connections:
+            connection.commit()
+        for participant in participants:
+            for listener in self._listeners:
+                listener(participant)
+        if metrics.enabled:
+            REGISTERED.inc(len(participants))
+
+    def get(self, participant_id: str) -> Participant:
+        participant = self._fetch(participant_id)
+        if participant is None:
+            raise KeyError(f"Participant {participant_id} is not registered")
+        return participant
+
+    def contains(self, participant_id: str) -> bool:
+        connection = self._shard(self._shard_of(participant_id))
+        return connection.execute("SELECT 1 FROM participants WHERE participant_id = ?", (participant_id,)).fetchone() is not None
+
+    def get_many(self, participant_ids: Iterable[str]) -> Dict[str, Participant]:
+        by_shard: Dict[int, List[str]] = {}
+        for participant_id in participant_ids:
+            by_shard.setdefault(self._shard_of(participant_id), []).append(participant_id)
+        found: Dict[str, Participant] = {}
+        for shard, ids in by_shard.items():
+            connection = self._shard(shard)
+            for start in range(0, len(ids), _BATCH):
+                chunk = ids[start : start + _BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                query = f"SELECT {_COLUMNS} FROM participants WHERE participant_id IN ({placeholders})"
+                for row in connection.execute(query, chunk):
+                    found[row[0]] = _participant(row)
+        return found
+
+    def by_node(self, node: str, role: str | None = None) -> List[Participant]:
+        if role is None:
+            query, params = f"SELECT {_COLUMNS} FROM participants WHERE node = ?", (node,)
+        else:
+            query, params = f"SELECT {_COLUMNS} FROM participants WHERE node = ? AND role = ?", (node, role)
+        return [_participant(row) for connection in self._all_shards() for row in connection.execute(query, params)]
+
+    def iter_participants(self, roles: Iterable[str] | None = None) -> Iterator[Participant]:
+        """Stream participants shard by shard without loading the registry."""
+
+        query, params = f"SELECT {_COLUMNS} FROM participants", ()
+        if roles is not None:
+            params = tuple(roles)
+            query += f" WHERE role IN ({','.join('?' * len(params))})"
+        for connection in self._all_shards():
+            for row in connection.execute(query, params):
+                yield _participant(row)
+
+    @property
+    def participants(self) -> Dict[str, Participant]:
+        """Load every participant; prefer ``contains``/``get_many`` for large registries."""
+
+        return {
+            row[0]: _participant(row)
+            for connection in self._all_shards()
+            for row in connection.execute(f"SELECT {_COLUMNS} FROM participants")
+        }
+
+    def close(self) -> None:
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+    # Shards ----------------------------------------------------------------
+
+    def _fetch(self, participant_id: str) -> Participant | None:
+        connection = self._shard(self._shard_of(participant_id))
+        row = connection.execute(
+            f"SELECT {_COLUMNS} FROM participants WHERE participant_id = ?", (participant_id,)
+        ).fetchone()
+        return None if row is None else _participant(row)
+
+    def _shard_of(self, participant_id: str) -> int:
+        return zlib.crc32(participant_id.encode("utf-8")) % self.shard_count
+
+    def _shard(self, shard: int) -> sqlite3.Connection:
+        connection = self._connections.get(shard)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path / f"shard-{shard:03d}.sqlite", isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connections[shard] = connection
+        return connection
+
+    def _all_shards(self) -> Iterator[sqlite3.Connection]:
+        for shard in range(self.shard_count):
+            yield self._shard(shard)
+
+    def _stored_shard_count(self, requested: int) -> int:
+        """Pin the shard count on first use so IDs always hash to the same file."""
+
+        marker = self.path / "shards"
+        if marker.exists():
+            return int(marker.read_text())
+        marker.write_text(str(requested))
+        return requested
@@ -0,0 +1,109 @@
+"""Precomputed shortest-path tables over the interconnect graph.
+
+A :class:`RouteTable` maps node names to dense integer IDs, stores the graph
+as compact CSR arrays, and keeps one BFS predecessor row per source node.
+Rows are built on first use (or all at once via :meth:`RouteTable.build_all`)
+so a lookup costs O(path length) instead of a fresh BFS per trade.
+"""
+from array import array
+from collections import deque
+from typing import Dict, List
+
+from .config import GridGraph, InterconnectConfig
+
+_UNREACHED = -1
+
+
+class RouteTable:
+    """Next-hop/predecessor tables for one interconnect graph."""
+
+    def __init__(self, interconnect: InterconnectConfig):
+        self.interconnect = interconnect
+        self._graph = None
+        self._version = -1
+        self.rebuild()
+
+    @property
+    def is_stale(self) -> bool:
+        graph = self.interconnect.grid_nodes
+        return graph is not self._graph or getattr(graph, "version", None) != self._version
+
+    def rebuild(self) -> None:
+        """Re-index the graph and drop every cached predecessor row."""
+
+        graph = self.interconnect.grid_nodes
+        names: List[str] = list(graph)
+        ids: Dict[str, int] = {name: index for index, name in enumerate(names)}
+        for neighbors in graph.values():
+            for neighbor in neighbors:
+                if neighbor not in ids:
+                    ids[neighbor] = len(names)
+                    names.append(neighbor)
+
+        offsets = array("i", [0])
+        targets = array("i")
+        for name in names:
+            targets.extend(ids[neighbor] for neighbor in graph.get(name, ()))
+            offsets.append(len(targets))
+
+        self.node_names = names
+        self.node_ids = ids
+        self._offsets = offsets
+        self._targets = targets
+        self._predecessors: Dict[int, array] = {}
+        self._graph = graph
+        self._version = graph.version if isinstance(graph, GridGraph) else None
+
+    def build_all(self) -> None:
+        """Eagerly compute predecessor rows for every source node."""
+
+        self._refresh()
+        for source in range(len(self.node_names)):
+            if source not in self._predecessors:
+                self._predecessors[source] = self._bfs(source)
+
+    def lookup(self, start: str, goal: str) -> List[str]:
+        """Return the shortest path from ``start`` to ``goal`` or ``[]``."""
+
+        self._refresh()
+        source = self.node_ids.get(start)
+        target = self.node_ids.get(goal)
+        if source is None or target is None:
+            return []
+        predecessors = self._predecessors.get(source)
+        if predecessors is None:
+            predecessors = self._predecessors[source] = self._bfs(source)
+        if predecessors[target] == _UNREACHED:
+            return []
+
+        names = self.node_names
+        path = [names[target]]
+        while target != source:
+            target = predecessors[target]
+            path.append(names[target])
+        path.reverse()
+        return path
+
+    def next_hop(self, start: str, goal: str) -> str | None:
+        """Return the first node after ``start`` on the path to ``goal``."""
+
+        path = self.lookup(start, goal)
+        return path[1] if len(path) > 1 else None
+
+    def _refresh(self) -> None:
+        if self.is_stale:
+            self.rebuild()
+
+    def _bfs(self, source: int) -> array:
+        offsets, targets = self._offsets, self._targets
+        predecessors = array("i", [_UNREACHED]) * len(self.node_names)
+        predecessors[source] = source
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for index in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[index]
+                if predecessors[neighbor] == _UNREACHED:
+                    predecessors[neighbor] = node
+                    queue.append(neighbor)
+        return predecessors
@@ -1,30 +1,241 @@
 """SDNC-like routing across the interconnect graph."""
-from collections import deque
-from typing import List
+from collections import OrderedDict, deque
+from time import perf_counter_ns
+from typing import Dict, Iterable, List, Set, Tuple
 
-from .config import InterconnectConfig
+from .config import InterconnectConfig, TopologyChange
 from .registration import Participant
+from .route_table import RouteTable
+from .weighted_routing import WeightedRoutingEngine, preferred_owner
+from src.observability import metrics
+
+ROUTING_MODES = ("bfs", "table", "weighted")
+_INF = float("inf")
+_TOLERANCE = 1e-9
+ROUTE_SECONDS = metrics.histogram("gridshare_route_compute_seconds", "Latency of Router.compute_route calls", "seconds")
+ROUTE_HOPS = metrics.histogram("gridshare_route_hops", "Lines crossed by computed routes")
+ROUTE_FAILURES = metrics.counter("gridshare_route_failures_total", "compute_route calls that found no path")
 
 
 class Router:
-    def __init__(self, interconnect: InterconnectConfig):
+    """Compute producer-to-consumer paths.
+
+    ``mode="bfs"`` searches the graph on every call; ``mode="table"`` answers
+    from a :class:`RouteTable` that is rebuilt whenever ``grid_nodes`` changes;
+    ``mode="weighted"`` runs a least-cost search that honours line capacity,
+    losses, wheeling charges, and the utility routing preference.
+
+    Results are kept in an LRU cache of ``cache_size`` routes (``0``
+    disables it). Edges changed through the :class:`InterconnectConfig`
+    topology API only evict the routes they affect: removing or re-rating an
+    edge drops the routes that use it, and adding one drops the routes it
+    could shorten. Any other edit of ``grid_nodes`` clears the cache; after
+    editing ``interconnect.lines`` in place, call :meth:`clear_cache`.
+    """
+
+    def __init__(self, interconnect: InterconnectConfig, mode: str = "bfs", cache_size: int = 4096):
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"mode must be one of {', '.join(ROUTING_MODES)}")
         self.interconnect = interconnect
+        self.mode = mode
+        self.cache_size = cache_size
+        self._table: RouteTable | None = None
+        self._engine: WeightedRoutingEngine | None = None
+        self._cache: "OrderedDict[Tuple, Tuple[List[str], float]]" = OrderedDict()
+        self._edge_keys: Dict[Tuple[str, str], Set[Tuple]] = {}
+        self._cache_graph = None
+        self._cache_version = -1
+
+    @property
+    def route_table(self) -> RouteTable:
+        if self._table is None or self._table.interconnect is not self.interconnect:
+            self._table = RouteTable(self.interconnect)
+        return self._table
+
+    @property
+    def weighted_engine(self) -> WeightedRoutingEngine:
+        if self._engine is None or self._engine.interconnect is not self.interconnect:
+            self._engine = WeightedRoutingEngine(self.interconnect)
+        return self._engine
+
+    def route_key(self, producer: Participant, consumer: Participant) -> Tuple:
+        """Key under which routes for this participant pair can be shared.
+
+        Pairs with equal keys always receive the same route from
+        :meth:`compute_route`, so batch callers compute each key once.
+        """
 
-    def compute_route(self, producer: Participant, consumer: Participant) -> List[str]:
+        key = (producer.metadata.get("node"), consumer.metadata.get("node"))
+        if self.mode == "weighted":
+            key += (min(producer.capacity_kw, consumer.capacity_kw),)
+        return key
+
+    def compute_route(
+        self,
+        producer: Participant,
+        consumer: Participant,
+        demand_mw: float | None = None,
+    ) -> List[str]:
+        """Return the node path from producer to consumer.
+
+        ``demand_mw`` only applies in weighted mode; it defaults to the smaller
+        of the two participants' capacities.
+        """
+
+        started = perf_counter_ns() if metrics.enabled else 0
         graph = self.interconnect.grid_nodes
-        start_nodes = [node for node in graph if producer.metadata.get("node") == node]
+        start = producer.metadata.get("node")
         end_node = consumer.metadata.get("node")
-        if not start_nodes:
+        if start not in graph:
             raise ValueError("Producer node not set in metadata")
         if not end_node:
             raise ValueError("Consumer node not set in metadata")
 
-        for start in start_nodes:
-            route = self._shortest_path(graph, start, end_node)
+        if demand_mw is None:
+            demand_mw = min(producer.capacity_kw, consumer.capacity_kw) / 1000
+        route = self.route_between(start, end_node, demand_mw)
+        if started:
+            ROUTE_SECONDS.record(perf_counter_ns() - started)
             if route:
-                return route
+                ROUTE_HOPS.record(len(route) - 1)
+            else:
+                ROUTE_FAILURES.inc()
+        if route:
+            return route
         raise ValueError(f"No available route from {producer.participant_id} to {consumer.participant_id}")
 
+    def route_between(self, start: str, goal: str, demand_mw: float = 0.0) -> List[str]:
+        """Return the node path from ``start`` to ``goal`` or ``[]`` if none exists."""
+
+        if self.cache_size <= 0 or not self._sync_cache():
+            return self._search(start, goal, demand_mw)[0]
+        key = (start, goal, demand_mw) if self.mode == "weighted" else (start, goal)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return list(cached[0])
+        route, cost = self._search(start, goal, demand_mw)
+        self._remember(key, route, cost)
+        return list(route)
+
+    @property
+    def cached_routes(self) -> int:
+        return len(self._cache)
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._edge_keys.clear()
+
+    def _search(self, start: str, goal: str, demand_mw: float) -> Tuple[List[str], float]:
+        if self.mode == "weighted":
+            return self.weighted_engine.shortest_path(start, goal, demand_mw=demand_mw)
+        if self.mode == "table":
+            route = self.route_table.lookup(start, goal)
+        elif start not in self.interconnect.grid_nodes:
+            route = []
+        else:
+            route = self._shortest_path(self.interconnect.grid_nodes, start, goal)
+        return route, (len(route) - 1 if route else _INF)
+
+    # Route cache -----------------------------------------------------------
+
+    def _remember(self, key: Tuple, route: List[str], cost: float) -> None:
+        self._cache[key] = (route, cost)
+        for edge in zip(route, route[1:]):
+            self._edge_keys.setdefault(edge, set()).add(key)
+        while len(self._cache) > self.cache_size:
+            self._forget(*self._cache.popitem(last=False))
+
+    def _forget(self, key: Tuple, entry: Tuple[List[str], float]) -> None:
+        route = entry[0]
+        for edge in zip(route, route[1:]):
+            keys = self._edge_keys.get(edge)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._edge_keys[edge]
+
+    def _sync_cache(self) -> bool:
+        """Bring the cache in line with ``grid_nodes``; ``False`` if it cannot be used."""
+
+        graph = self.interconnect.grid_nodes
+        version = getattr(graph, "version", None)
+        if version is None:
+            return False
+        if graph is not self._cache_graph:
+            self.clear_cache()
+        elif version != self._cache_version:
+            changes = graph.changes_since(self._cache_version)
+            if changes is None:
+                self.clear_cache()
+            else:
+                self._invalidate(changes)
+        self._cache_graph = graph
+        self._cache_version = version
+        return True
+
+    def _invalidate(self, changes: Iterable[TopologyChange]) -> None:
+        added = []
+        for change in changes:
+            edge = (change.source, change.target)
+            if change.kind in ("remove", "line"):
+                for key in self._edge_keys.pop(edge, ()):
+                    entry = self._cache.pop(key, None)
+                    if entry is not None:
+                        self._forget(key, entry)
+            if change.kind in ("add", "line"):
+                added.append(edge)
+        graph = self.interconnect.grid_nodes
+        for source, target in dict.fromkeys(added):
+            if self._cache and target in graph.get(source, ()):
+                self._drop_improvable(source, target)
+
+    def _drop_improvable(self, source: str, target: str) -> None:
+        """Evict cached routes that ``source -> target`` could make cheaper.
+
+        Any better route must use the new edge, so it costs at least
+        ``d(start, source) + w + d(target, goal)`` in the current graph.
+        """
+
+        if self.mode == "weighted":
+            engine = self.weighted_engine
+            capacity = self.interconnect.line(source, target).capacity_mw
+            edge_cost = engine.edge_cost(source, target, preferred_owner(self.interconnect))
+            to_source = engine.distances_to(source)
+            from_target = engine.distances_from(target)
+        else:
+            capacity = _INF
+            edge_cost = 1.0
+            to_source = self._hops(source, upstream=True)
+            from_target = self._hops(target, upstream=False)
+
+        for key, (route, cost) in list(self._cache.items()):
+            if self.mode == "weighted" and capacity < key[2]:
+                continue
+            bound = to_source.get(key[0], _INF) + edge_cost + from_target.get(key[1], _INF)
+            if bound < cost - _TOLERANCE:
+                del self._cache[key]
+                self._forget(key, (route, cost))
+
+    def _hops(self, node: str, upstream: bool) -> Dict[str, float]:
+        graph = self.interconnect.grid_nodes
+        if upstream:
+            adjacency: Dict[str, List[str]] = {}
+            for source, neighbors in graph.items():
+                for neighbor in neighbors:
+                    adjacency.setdefault(neighbor, []).append(source)
+        else:
+            adjacency = graph
+        hops = {node: 0.0}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            for neighbor in adjacency.get(current, ()):
+                if neighbor not in hops:
+                    hops[neighbor] = hops[current] + 1
+                    queue.append(neighbor)
+        return hops
+
     @staticmethod
     def _shortest_path(graph, start, goal) -> List[str]:
         queue = deque([(start, [start])])
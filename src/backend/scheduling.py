@@ -0,0 +1,298 @@
+"""Capacity reservations for EV charging windows.
+
+:class:`CapacityScheduler` keeps one bucketed timeline per participant: an
+array of committed kW per fixed-length slot. A charge request becomes a
+:class:`Reservation` of ``power_kw`` over enough consecutive slots to deliver
+its kWh, and is admitted only if both the producer's and the consumer's
+timelines stay within capacity. Admission touches only the slots a request
+covers, so it costs O(k) in the request length regardless of how many
+reservations exist.
+
+When a fast-track request does not fit, standard-priority reservations in
+the way are shifted to the next slots where they fit. :meth:`rebalance` does
+the same in bulk after a capacity cut (e.g. a curtailment notice). Every
+reservation that ends up moved or dropped is reported to listeners, so the
+ledger can record the change.
+"""
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Tuple
+
+from .registration import Registry
+
+_EPOCH = datetime(1970, 1, 1)
+_TOLERANCE = 1e-9
+
+
+class CapacityError(ValueError):
+    """Raised when a reservation would exceed a participant's capacity."""
+
+
+@dataclass
+class Reservation:
+    reservation_id: str
+    producer_id: str
+    consumer_id: str
+    start_slot: int
+    slot_count: int
+    power_kw: float
+    priority: str = "standard"
+
+    @property
+    def end_slot(self) -> int:
+        return self.start_slot + self.slot_count
+
+
+@dataclass
+class RebalanceReport:
+    moved: List[Tuple[str, int, int]] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+RESERVATION = "reservation"
+MOVED = "moved"
+DROPPED = "dropped"
+# listener(action, reservation, previous_start_slot)
+ScheduleListener = Callable[[str, Reservation, int], None]
+
+
+class _Timeline:
+    """Committed kW per slot, stored densely from ``base`` onwards."""
+
+    __slots__ = ("base", "used")
+
+    def __init__(self) -> None:
+        self.base = 0
+        self.used = array("d")
+
+    def _ensure(self, start: int, end: int) -> None:
+        if not self.used:
+            self.base = start
+        if start < self.base:
+            self.used[0:0] = array("d", bytes(8 * (self.base - start)))
+            self.base = start
+        missing = end - self.base - len(self.used)
+        if missing > 0:
+            self.used.extend(array("d", bytes(8 * missing)))
+
+    def peak(self, start: int, end: int) -> float:
+        low = max(start - self.base, 0)
+        high = min(end - self.base, len(self.used))
+        return max(self.used[low:high], default=0.0)
+
+    def add(self, start: int, end: int, power_kw: float) -> None:
+        self._ensure(start, end)
+        offset = start - self.base
+        for index in range(offset, offset + end - start):
+            self.used[index] += power_kw
+
+    def overflowing(self, capacity_kw: float) -> List[int]:
+        return [self.base + index for index, used in enumerate(self.used) if used > capacity_kw + _TOLERANCE]
+
+
+class CapacityScheduler:
+    """Admits charging reservations against per-participant capacity."""
+
+    def __init__(self, registry: Registry, slot_minutes: int = 15, max_shift_slots: int = 96):
+        self.registry = registry
+        self.slot = timedelta(minutes=slot_minutes)
+        self.max_shift_slots = max_shift_slots
+        self.reservations: Dict[str, Reservation] = {}
+        self._timelines: Dict[str, _Timeline] = {}
+        self._capacity_overrides: Dict[str, float] = {}
+        self._holders: Dict[str, Dict[str, Reservation]] = {}
+        self._listeners: List[ScheduleListener] = []
+
+    def add_listener(self, listener: ScheduleListener) -> None:
+        """Call ``listener(action, reservation, previous_start)`` when a reservation is moved or dropped."""
+
+        self._listeners.append(listener)
+
+    # Slots ---------------------------------------------------------------
+
+    def slot_of(self, moment: datetime) -> int:
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return (moment - _EPOCH) // self.slot
+
+    def slot_start(self, slot: int) -> datetime:
+        return _EPOCH + slot * self.slot
+
+    def capacity(self, participant_id: str) -> float:
+        override = self._capacity_overrides.get(participant_id)
+        return self.registry.get(participant_id).capacity_kw if override is None else override
+
+    def set_capacity(self, participant_id: str, capacity_kw: float) -> RebalanceReport:
+        """Change a participant's usable capacity and rebalance its reservations."""
+
+        self._capacity_overrides[participant_id] = capacity_kw
+        return self.rebalance(participant_id)
+
+    # Reservations --------------------------------------------------------
+
+    def reserve(
+        self,
+        reservation_id: str,
+        request,
+        producer_id: str,
+        consumer_id: str,
+        power_kw: float | None = None,
+    ) -> Reservation:
+        """Reserve capacity for an :class:`EVChargeRequest` or raise :class:`CapacityError`."""
+
+        if reservation_id in self.reservations:
+            raise ValueError(f"Reservation {reservation_id} already exists")
+        if power_kw is None:
+            power_kw = min(self.capacity(producer_id), self.capacity(consumer_id))
+        if power_kw <= 0 or request.kilowatt_hours <= 0:
+            raise CapacityError("power_kw and kilowatt_hours must be positive")
+        slot_hours = self.slot.total_seconds() / 3600
+        reservation = Reservation(
+            reservation_id=reservation_id,
+            producer_id=producer_id,
+            consumer_id=consumer_id,
+            start_slot=self.slot_of(request.desired_start),
+            slot_count=math.ceil(request.kilowatt_hours / (power_kw * slot_hours) - _TOLERANCE),
+            power_kw=power_kw,
+            priority=request.priority,
+        )
+
+        if self._fits(reservation, reservation.start_slot):
+            self._commit(reservation)
+            return reservation
+        if reservation.priority == "fast-track" and self._make_room(reservation):
+            return reservation
+        raise CapacityError(
+            f"Insufficient capacity for {reservation_id} at {self.slot_start(reservation.start_slot).isoformat()}"
+        )
+
+    def release(self, reservation_id: str) -> Reservation:
+        reservation = self.reservations.pop(reservation_id)
+        self._apply(reservation, -reservation.power_kw)
+        for participant_id in (reservation.producer_id, reservation.consumer_id):
+            self._holders[participant_id].pop(reservation_id, None)
+        return reservation
+
+    def committed_kw(self, participant_id: str, moment: datetime) -> float:
+        slot = self.slot_of(moment)
+        timeline = self._timelines.get(participant_id)
+        return timeline.peak(slot, slot + 1) if timeline else 0.0
+
+    def rebalance(self, participant_id: str) -> RebalanceReport:
+        """Resolve overflowing slots on one participant's timeline.
+
+        Standard reservations are shifted to the next slots where they fit
+        before fast-track ones; anything that cannot be moved within
+        ``max_shift_slots`` is dropped and reported.
+        """
+
+        report = RebalanceReport()
+        timeline = self._timelines.get(participant_id)
+        if timeline is None:
+            return report
+        capacity = self.capacity(participant_id)
+        for slot in timeline.overflowing(capacity):
+            if timeline.peak(slot, slot + 1) <= capacity + _TOLERANCE:
+                continue
+            holders = reversed(list(self._holders.get(participant_id, {}).values()))
+            victims = sorted(
+                (r for r in holders if r.start_slot <= slot < r.end_slot),
+                key=lambda r: (r.priority == "fast-track", -r.start_slot),
+            )
+            for victim in victims:
+                if timeline.peak(slot, slot + 1) <= capacity + _TOLERANCE:
+                    break
+                old_start = victim.start_slot
+                self.release(victim.reservation_id)
+                new_start = self._next_fit(victim, slot + 1)
+                if new_start is None:
+                    report.dropped.append(victim.reservation_id)
+                    self._notify(DROPPED, victim, old_start)
+                    continue
+                victim.start_slot = new_start
+                self._commit(victim)
+                report.moved.append((victim.reservation_id, old_start, new_start))
+                self._notify(MOVED, victim, old_start)
+        return report
+
+    # Internals -----------------------------------------------------------
+
+    def _fits(self, reservation: Reservation, start: int) -> bool:
+        end = start + reservation.slot_count
+        for participant_id in (reservation.producer_id, reservation.consumer_id):
+            timeline = self._timelines.get(participant_id)
+            used = timeline.peak(start, end) if timeline else 0.0
+            if used + reservation.power_kw > self.capacity(participant_id) + _TOLERANCE:
+                return False
+        return True
+
+    def _next_fit(self, reservation: Reservation, earliest: int) -> int | None:
+        for start in range(max(earliest, reservation.start_slot), reservation.start_slot + self.max_shift_slots + 1):
+            if self._fits(reservation, start):
+                return start
+        return None
+
+    def _make_room(self, reservation: Reservation) -> bool:
+        """Shift standard reservations out of the way of a fast-track one."""
+
+        start, end = reservation.start_slot, reservation.end_slot
+        blockers = {
+            other.reservation_id: other
+            for participant_id in (reservation.producer_id, reservation.consumer_id)
+            for other in self._holders.get(participant_id, {}).values()
+            if other.priority != "fast-track" and other.start_slot < end and start < other.end_slot
+        }
+        # Latest-starting, then most recently admitted, reservations move first.
+        moved: List[Tuple[Reservation, int]] = []
+        for blocker in sorted(reversed(list(blockers.values())), key=lambda r: -r.start_slot):
+            self.release(blocker.reservation_id)
+            moved.append((blocker, blocker.start_slot))
+            if self._fits(reservation, start):
+                break
+        if not self._fits(reservation, start):
+            for blocker, original_start in moved:
+                blocker.start_slot = original_start
+                self._commit(blocker)
+            return False
+
+        self._commit(reservation)
+        placed: List[Reservation] = []
+        for blocker, _ in moved:
+            new_start = self._next_fit(blocker, end)
+            if new_start is None:
+                break
+            blocker.start_slot = new_start
+            self._commit(blocker)
+            placed.append(blocker)
+        else:
+            for blocker, original_start in moved:
+                self._notify(MOVED, blocker, original_start)
+            return True
+
+        # Some displaced reservation has nowhere to go: undo everything.
+        for blocker in placed:
+            self.release(blocker.reservation_id)
+        self.release(reservation.reservation_id)
+        for blocker, original_start in moved:
+            blocker.start_slot = original_start
+            self._commit(blocker)
+        return False
+
+    def _notify(self, action: str, reservation: Reservation, previous_start: int) -> None:
+        for listener in self._listeners:
+            listener(action, reservation, previous_start)
+
+    def _commit(self, reservation: Reservation) -> None:
+        self.reservations[reservation.reservation_id] = reservation
+        self._apply(reservation, reservation.power_kw)
+        for participant_id in (reservation.producer_id, reservation.consumer_id):
+            self._holders.setdefault(participant_id, {})[reservation.reservation_id] = reservation
+
+    def _apply(self, reservation: Reservation, power_kw: float) -> None:
+        for participant_id in (reservation.producer_id, reservation.consumer_id):
+            timeline = self._timelines.get(participant_id)
+            if timeline is None:
+                timeline = self._timelines[participant_id] = _Timeline()
+            timeline.add(reservation.start_slot, reservation.end_slot, power_kw)
@@ -0,0 +1,238 @@
+"""Incremental settlement and netting of logged trades.
+
+:class:`SettlementEngine` follows a ledger through its listener hook. Each
+trade entry updates two things in O(1): the running :class:`Balance` of its
+producer and consumer, and the open netting window (hourly or daily) its
+timestamp falls in. :meth:`SettlementEngine.settle` closes finished windows
+and appends one compact ``entry_type="settlement"`` batch per window, with
+each participant's net position, so billing reads a handful of settlement
+entries instead of re-scanning every trade.
+
+Timezone-aware timestamps are converted to naive UTC before bucketing, the
+same way :mod:`src.ledger.index` keys them. Trades logged from different
+offsets then net into the same window.
+
+When a durable ledger is reattached, earlier settlement entries mark their
+windows as closed. Replaying the ledger then rebuilds balances and open
+windows without emitting any batch twice. :meth:`SettlementEngine.state` and
+:meth:`SettlementEngine.from_state` let a snapshot carry the engine across
+restarts, so that replay only covers the entries logged after it.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from src.ledger.adapter import LedgerAdapter
+
+SETTLEMENT = "settlement"
+NETTING_WINDOWS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+
+
+@dataclass
+class Balance:
+    """Running totals for one participant across every trade seen."""
+
+    participant_id: str
+    kwh_delivered: float = 0.0
+    kwh_received: float = 0.0
+    usd_receivable: float = 0.0
+    usd_owed: float = 0.0
+    trades: int = 0
+
+    @property
+    def net_kwh(self) -> float:
+        return self.kwh_delivered - self.kwh_received
+
+    @property
+    def net_usd(self) -> float:
+        return self.usd_receivable - self.usd_owed
+
+
+def _naive_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def window_start(timestamp: datetime, window: str) -> datetime:
+    """Start of the ``window`` netting period containing ``timestamp``, in naive UTC."""
+
+    timestamp = _naive_utc(timestamp)
+    if window == "hourly":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if window == "daily":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"window must be one of {', '.join(NETTING_WINDOWS)}")
+
+
+class _Window:
+    """Per-participant positions accumulated in one open netting window."""
+
+    __slots__ = ("positions", "trades", "first_position", "last_position")
+
+    def __init__(self, position: int) -> None:
+        # participant -> [kwh_delivered, kwh_received, usd_receivable, usd_owed]
+        self.positions: Dict[str, List[float]] = {}
+        self.trades = 0
+        self.first_position = position
+        self.last_position = position
+
+    def add(self, participant_id: str, column: int, kilowatt_hours: float, price_usd: float) -> None:
+        position = self.positions.get(participant_id)
+        if position is None:
+            position = self.positions[participant_id] = [0.0, 0.0, 0.0, 0.0]
+        position[column] += kilowatt_hours
+        position[column + 2] += price_usd
+
+
+class SettlementEngine:
+    """Running balances plus netting-window settlement batches for one ledger."""
+
+    def __init__(self, window: str = "hourly") -> None:
+        if window not in NETTING_WINDOWS:
+            raise ValueError(f"window must be one of {', '.join(NETTING_WINDOWS)}")
+        self.window = window
+        self.ledger: LedgerAdapter | None = None
+        self.balances: Dict[str, Balance] = {}
+        self._open: Dict[datetime, _Window] = {}
+        self._batches: Dict[datetime, int] = {}
+        self._seen = 0
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SettlementEngine":
+        """Rebuild an unattached engine from :meth:`state`; ``attach`` replays the rest."""
+
+        engine = cls(state["window"])
+        engine._seen = state["position"]
+        for participant_id, *totals in state["balances"]:
+            engine.balances[participant_id] = Balance(participant_id, *totals)
+        for start, trades, first_position, last_position, positions in state["open"]:
+            window = engine._open[datetime.fromisoformat(start)] = _Window(first_position)
+            window.trades, window.last_position, window.positions = trades, last_position, positions
+        engine._batches = {datetime.fromisoformat(start): count for start, count in state["batches"].items()}
+        return engine
+
+    def state(self) -> Dict:
+        """JSON-ready copy of everything recorded from the first ``position`` entries."""
+
+        return {
+            "window": self.window,
+            "position": self._seen,
+            "balances": [
+                [b.participant_id, b.kwh_delivered, b.kwh_received, b.usd_receivable, b.usd_owed, b.trades]
+                for b in self.balances.values()
+            ],
+            "open": [
+                [start.isoformat(), window.trades, window.first_position, window.last_position, window.positions]
+                for start, window in self._open.items()
+            ],
+            "batches": {start.isoformat(): count for start, count in self._batches.items()},
+        }
+
+    def attach(self, ledger: LedgerAdapter) -> "SettlementEngine":
+        """Replay entries not seen yet, then follow new appends."""
+
+        self.ledger = ledger
+        for position, entry in enumerate(ledger.iter_entries(self._seen), start=self._seen):
+            self.record(position, entry)
+        ledger.add_listener(self.record)
+        return self
+
+    def record(self, position: int, entry: Dict) -> None:
+        self._seen = position + 1
+        if entry.get("entry_type") == SETTLEMENT:
+            if entry.get("window") == self.window:
+                start = datetime.fromisoformat(entry["window_start"])
+                self._open.pop(start, None)
+                self._batches[start] = max(self._batches.get(start, 0), entry["batch"] + 1)
+            return
+        timestamp = entry.get("timestamp")
+        producer_id, consumer_id = entry.get("producer_id"), entry.get("consumer_id")
+        if timestamp is None or producer_id is None or consumer_id is None:
+            return
+        kilowatt_hours = float(entry.get("kilowatt_hours") or 0.0)
+        price_usd = float(entry.get("price_usd") or 0.0)
+
+        producer = self.balance(producer_id, create=True)
+        producer.kwh_delivered += kilowatt_hours
+        producer.usd_receivable += price_usd
+        producer.trades += 1
+        consumer = self.balance(consumer_id, create=True)
+        consumer.kwh_received += kilowatt_hours
+        consumer.usd_owed += price_usd
+        consumer.trades += 1
+
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        start = window_start(timestamp, self.window)
+        window = self._open.get(start)
+        if window is None:
+            window = self._open[start] = _Window(position)
+        window.add(producer_id, 0, kilowatt_hours, price_usd)
+        window.add(consumer_id, 1, kilowatt_hours, price_usd)
+        window.trades += 1
+        window.last_position = position
+
+    def balance(self, participant_id: str, create: bool = False) -> Balance:
+        """Running balance of ``participant_id`` (all zero if it has not traded)."""
+
+        balance = self.balances.get(participant_id)
+        if balance is None:
+            balance = Balance(participant_id)
+            if create:
+                self.balances[participant_id] = balance
+        return balance
+
+    @property
+    def open_windows(self) -> List[datetime]:
+        return sorted(self._open)
+
+    def settle(self, until: datetime | None = None) -> List[Dict]:
+        """Close every window ending at or before ``until`` (all if ``None``).
+
+        One settlement batch per window is appended to the attached ledger in
+        a single write and returned, oldest window first.
+        """
+
+        length = NETTING_WINDOWS[self.window]
+        if until is not None:
+            until = _naive_utc(until)
+        batches = []
+        for start in sorted(self._open):
+            if until is not None and start + length > until:
+                continue
+            batches.append(self._batch(start, self._open.pop(start)))
+            self._batches[start] = self._batches.get(start, 0) + 1
+        if batches and self.ledger is not None:
+            self.ledger.append_entries(batches)
+        return batches
+
+    def _batch(self, start: datetime, window: _Window) -> Dict:
+        end = start + NETTING_WINDOWS[self.window]
+        sequence = self._batches.get(start, 0)
+        settlement_id = f"settle-{self.window}-{start.isoformat()}"
+        if sequence:
+            settlement_id += f"-{sequence}"
+        return {
+            "entry_type": SETTLEMENT,
+            "settlement_id": settlement_id,
+            "window": self.window,
+            "window_start": start.isoformat(),
+            "window_end": end.isoformat(),
+            "batch": sequence,
+            "timestamp": end.isoformat(),
+            "trade_count": window.trades,
+            "first_position": window.first_position,
+            "last_position": window.last_position,
+            "positions": [
+                {
+                    "participant_id": participant_id,
+                    "kwh_delivered": round(delivered, 6),
+                    "kwh_received": round(received, 6),
+                    "usd_receivable": round(receivable, 6),
+                    "usd_owed": round(owed, 6),
+                    "net_usd": round(receivable - owed, 6),
+                }
+                for participant_id, (delivered, received, receivable, owed) in sorted(window.positions.items())
+            ],
+        }
@@ -0,0 +1,377 @@
+"""Binary state snapshots for fast restarts.
+
+Rebuilding an app from a durable ledger otherwise means decoding every
+entry and re-appending it to :class:`~src.backend.columnar.TransactionColumns`.
+A :class:`SnapshotStore` instead writes the registry and the transaction
+columns to one binary file. Typed arrays go in as raw ``array.tobytes()``
+buffers and strings as one UTF-8 blob with an offset array. The file also
+records the ledger position it covers, so :meth:`SnapshotStore.recover`
+loads it and replays only the ledger tail.
+
+Settlement engines (:mod:`src.backend.settlement`) that the app has built
+are stored too, as JSON state tagged with the ledger position each one has
+seen. After recovery they replay only the entries logged after that position.
+
+Registrations are not written to the ledger. While a :class:`Snapshotter`
+is attached, each one is appended to ``registry.journal`` and the journal is
+truncated after every snapshot. A :class:`PersistentRegistry` is durable
+already and is left out of both.
+
+Snapshot layout (integers little endian, arrays in the writer's byte order)::
+
+    file    := b"GSSN" u8 version u8 byteorder u64 ledger_position section* u32 crc32
+
+Version 2 adds a final strings section with one JSON settlement state per
+engine. Version 1 files, which do not have it, still load.
+    section := array | strings
+    array   := u8 typecode u64 byte_length bytes
+    strings := array(offsets, "Q") u64 byte_length utf8
+
+Files are written to a temporary name, fsynced and moved into place with
+``os.replace``, so a crash leaves either the old or the new snapshot. The
+ledger is synced first, so a snapshot never covers entries that a group-fsynced
+ledger could still lose. ``recover`` also skips any snapshot that covers more
+entries than the ledger holds, falling back to an older one or a full replay.
+"""
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple
+
+from .columnar import StringPool, TransactionColumns
+from .registration import Participant, Registry
+from .registry_store import PersistentRegistry
+from .settlement import SettlementEngine
+from .transactions import EnergyTransaction, TransactionLogger
+
+MAGIC = b"GSSN"
+VERSION = 2
+SUFFIX = ".gss"
+JOURNAL = "registry.journal"
+_HEADER = struct.Struct("<4sBBQ")
+_ARRAY_HEADER = struct.Struct("<cQ")
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+_BYTEORDERS = ("little", "big")
+_COLUMN_ARRAYS = (
+    "producer_codes",
+    "consumer_codes",
+    "source_codes",
+    "session_codes",
+    "kilowatt_hours",
+    "price_usd",
+    "timestamps",
+    "utc_flags",
+)
+
+
+class Snapshot(NamedTuple):
+    position: int
+    participants: List[Participant]
+    columns: TransactionColumns
+    settlements: List[Dict]
+
+
+# Encoding -------------------------------------------------------------------
+
+
+def _pack_array(values: array) -> bytes:
+    data = values.tobytes()
+    return _ARRAY_HEADER.pack(values.typecode.encode("ascii"), len(data)) + data
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    offsets = array("Q", [0])
+    total = 0
+    for value in values:
+        total += len(value)
+        offsets.append(total)
+    text = "".join(values).encode("utf-8")
+    return _pack_array(offsets) + _U64.pack(len(text)) + text
+
+
+class _Reader:
+    def __init__(self, data: bytes, swap: bool) -> None:
+        self.data = memoryview(data)
+        self.offset = _HEADER.size
+        self.swap = swap
+
+    def array(self) -> array:
+        typecode, length = _ARRAY_HEADER.unpack_from(self.data, self.offset)
+        self.offset += _ARRAY_HEADER.size
+        values = array(typecode.decode("ascii"))
+        values.frombytes(self.data[self.offset : self.offset + length])
+        self.offset += length
+        if self.swap:
+            values.byteswap()
+        return values
+
+    def strings(self) -> List[str]:
+        offsets = self.array()
+        (length,) = _U64.unpack_from(self.data, self.offset)
+        self.offset += _U64.size
+        text = str(self.data[self.offset : self.offset + length], "utf-8")
+        self.offset += length
+        return [text[offsets[index] : offsets[index + 1]] for index in range(len(offsets) - 1)]
+
+
+def encode_snapshot(
+    position: int,
+    participants: List[Participant],
+    columns: TransactionColumns,
+    settlements: Iterable[Dict] = (),
+) -> bytes:
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, _BYTEORDERS.index(sys.byteorder), position),
+        _pack_strings([participant.participant_id for participant in participants]),
+        _pack_strings([participant.role for participant in participants]),
+        _pack_array(array("d", [participant.capacity_kw for participant in participants])),
+        _pack_strings([json.dumps(participant.metadata, separators=(",", ":")) for participant in participants]),
+        _pack_strings(columns.tx_ids),
+        _pack_strings(columns.participants.values),
+        _pack_strings(columns.sources.values),
+        _pack_strings(columns.sessions.values),
+    ]
+    parts.extend(_pack_array(getattr(columns, name)) for name in _COLUMN_ARRAYS)
+    parts.append(_pack_strings([json.dumps(state, separators=(",", ":")) for state in settlements]))
+    body = b"".join(parts)
+    return body + _U32.pack(zlib.crc32(body))
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    if len(data) < _HEADER.size + _U32.size:
+        raise ValueError("snapshot is truncated")
+    magic, version, byteorder, position = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a GridShare snapshot")
+    if version not in (1, VERSION):
+        raise ValueError(f"unsupported snapshot version {version}")
+    (checksum,) = _U32.unpack_from(data, len(data) - _U32.size)
+    if zlib.crc32(memoryview(data)[: -_U32.size]) != checksum:
+        raise ValueError("snapshot checksum mismatch")
+
+    reader = _Reader(data, _BYTEORDERS[byteorder] != sys.byteorder)
+    ids, roles, capacities, metadata = reader.strings(), reader.strings(), reader.array(), reader.strings()
+    participants = [
+        Participant(participant_id, role, capacity_kw, json.loads(details))
+        for participant_id, role, capacity_kw, details in zip(ids, roles, capacities, metadata)
+    ]
+    columns = TransactionColumns()
+    columns.tx_ids = reader.strings()
+    columns.participants = StringPool(reader.strings())
+    columns.sources = StringPool(reader.strings())
+    columns.sessions = StringPool(reader.strings())
+    for name in _COLUMN_ARRAYS:
+        setattr(columns, name, reader.array())
+    settlements = [json.loads(state) for state in reader.strings()] if version >= 2 else []
+    return Snapshot(position, participants, columns, settlements)
+
+
+def transaction_from_entry(entry: Dict) -> EnergyTransaction | None:
+    """Rebuild the logged transaction behind a ledger payload (``None`` for other entries)."""
+
+    if entry.get("entry_type") is not None or "tx_id" not in entry or "producer_id" not in entry:
+        return None
+    timestamp = entry["timestamp"]
+    return EnergyTransaction(
+        tx_id=entry["tx_id"],
+        producer_id=entry["producer_id"],
+        consumer_id=entry["consumer_id"],
+        kilowatt_hours=entry["kilowatt_hours"],
+        price_usd=entry["price_usd"],
+        timestamp=datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp,
+        energy_source=entry.get("energy_source", "solar"),
+        ev_session_id=entry.get("ev_session_id"),
+    )
+
+
+# Store ----------------------------------------------------------------------
+
+
+def _position_of(path: Path) -> int:
+    try:
+        return int(path.stem.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+class SnapshotStore:
+    """Directory of snapshots named by the ledger position they cover."""
+
+    def __init__(self, directory: str | os.PathLike, keep: int = 2):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep = max(keep, 1)
+
+    @property
+    def journal_path(self) -> Path:
+        return self.directory / JOURNAL
+
+    def paths(self) -> List[Path]:
+        """Snapshot files, newest first."""
+
+        return sorted(self.directory.glob(f"snapshot-*{SUFFIX}"), reverse=True)
+
+    def write(
+        self,
+        registry: Registry,
+        logger: TransactionLogger,
+        settlements: Mapping[str, SettlementEngine] | None = None,
+    ) -> Path:
+        """Snapshot ``registry``, ``logger.store`` and ``settlements`` as of the current ledger end."""
+
+        logger.ledger.sync()
+        position = logger.ledger.entry_count
+        participants = [] if isinstance(registry, PersistentRegistry) else list(registry.entries.values())
+        states = [engine.state() for engine in (settlements or {}).values()]
+        data = encode_snapshot(position, participants, logger.store, states)
+        path = self.directory / f"snapshot-{position:012d}{SUFFIX}"
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        self._sync_directory()
+        self.journal_path.write_bytes(b"")
+        for stale in self.paths()[self.keep :]:
+            stale.unlink()
+        return path
+
+    def latest(self, max_position: int | None = None) -> Snapshot | None:
+        """Newest snapshot that decodes cleanly, or ``None``.
+
+        With ``max_position``, snapshots covering more ledger entries than that
+        are skipped.
+        """
+
+        for path in self.paths():
+            if max_position is not None and _position_of(path) > max_position:
+                continue
+            try:
+                snapshot = decode_snapshot(path.read_bytes())
+            except (OSError, ValueError):
+                continue
+            if max_position is None or snapshot.position <= max_position:
+                return snapshot
+        return None
+
+    def recover(
+        self,
+        registry: Registry,
+        logger: TransactionLogger,
+        settlements: Dict[str, SettlementEngine] | None = None,
+    ) -> int:
+        """Load the latest snapshot into empty ``registry``/``logger`` and replay the tail.
+
+        Settlement engines in the snapshot are added to ``settlements``
+        unattached; attaching them to the ledger replays their own tail.
+        Returns how many ledger entries were replayed.
+        """
+
+        if len(logger.store):
+            raise ValueError("recover() needs a TransactionLogger with an empty store")
+        # After a crash the ledger may have lost unsynced entries a snapshot covers.
+        snapshot = self.latest(max_position=logger.ledger.entry_count)
+        position = 0
+        if snapshot is not None:
+            position = snapshot.position
+            logger.store = snapshot.columns
+            if settlements is not None:
+                for state in snapshot.settlements:
+                    settlements.setdefault(state["window"], SettlementEngine.from_state(state))
+            if not isinstance(registry, PersistentRegistry):
+                registry.register_many(
+                    participant for participant in snapshot.participants if not registry.contains(participant.participant_id)
+                )
+        for participant in self._journal():
+            if not registry.contains(participant.participant_id):
+                registry.register(participant)
+
+        replayed = 0
+        for entry in logger.ledger.iter_entries(position):
+            transaction = transaction_from_entry(entry)
+            if transaction is not None:
+                logger.store.append(transaction)
+            replayed += 1
+        return replayed
+
+    def _journal(self) -> Iterator[Participant]:
+        try:
+            handle = open(self.journal_path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            for line in handle:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:  # torn final write
+                    break
+                yield Participant(row["participant_id"], row["role"], row["capacity_kw"], row["metadata"])
+
+    def _sync_directory(self) -> None:
+        try:
+            descriptor = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class Snapshotter:
+    """Journal registrations and snapshot every ``every`` ledger appends."""
+
+    def __init__(
+        self,
+        store: SnapshotStore,
+        registry: Registry,
+        logger: TransactionLogger,
+        every: int = 10_000,
+        settlements: Mapping[str, SettlementEngine] | None = None,
+    ):
+        self.store = store
+        self.registry = registry
+        self.logger = logger
+        self.settlements = settlements
+        self.every = every
+        self.pending = 0
+        self._journal = None
+        if not isinstance(registry, PersistentRegistry):
+            self._journal = open(store.journal_path, "a", encoding="utf-8")
+            registry.add_listener(self._record_participant)
+        logger.ledger.add_listener(self._record_entry)
+
+    def snapshot(self) -> Path:
+        """Write a snapshot now; the registration journal starts over empty."""
+
+        self.pending = 0
+        if self._journal is not None:
+            self._journal.flush()
+        return self.store.write(self.registry, self.logger, self.settlements)
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _record_participant(self, participant: Participant) -> None:
+        row = {
+            "participant_id": participant.participant_id,
+            "role": participant.role,
+            "capacity_kw": participant.capacity_kw,
+            "metadata": participant.metadata,
+        }
+        self._journal.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self._journal.flush()
+
+    def _record_entry(self, position: int, entry: Dict) -> None:
+        self.pending += 1
+        if self.every and self.pending >= self.every and position + 1 == self.logger.ledger.entry_count:
+            self.snapshot()
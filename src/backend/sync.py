@@ -0,0 +1,199 @@
+"""Exactly-once delta sync for queued mobile transactions.
+
+Devices queue transactions while offline (:class:`~src.mobile.offline.OfflineQueue`),
+number them with a per-device sequence, and upload the ones the server has not
+acknowledged as compressed batches. :class:`SyncService` keeps a high-water
+mark per device and *epoch*, the highest sequence already handled. The epoch
+is a random token created with the device's queue, so a reinstalled device
+that starts again at sequence 1 gets a fresh mark instead of having its new
+trades mistaken for replays. Each sync starts with :meth:`SyncService.handshake`,
+which returns the mark so the device can drop what the server already has.
+
+Items at or below the mark, and items whose ``tx_id`` is already on the
+ledger, are acknowledged as duplicates and skipped, so a batch resent after a
+lost reply is applied once. The rest of the batch is logged with one
+``log_transactions`` call. Each reply carries the new mark, and the device
+drops everything up to it.
+
+Item metadata is merged into the logged payload, so keys that would overwrite
+a trade field (:data:`RESERVED_METADATA`) get the item rejected. Logged
+payloads carry ``device_id``, ``device_epoch`` and ``device_seq``.
+Attaching a service to an existing ledger therefore rebuilds the marks, and
+they survive a server restart together with the ledger. Rejected items
+(malformed, or naming an unknown participant) are not logged, so after a
+restart the mark may fall back below them. Sequences therefore only have to
+increase within a batch; they may skip numbers.
+
+Wire format, one batch per request::
+
+    batch := zlib(json({"device_id": str, "epoch": str, "items": [item, ...]}))
+    item  := {"seq": int, "transaction": {EnergyTransaction fields, ISO timestamp},
+              "route": [str, ...] | null, "metadata": {...} | null}
+"""
+import json
+import threading
+import zlib
+from dataclasses import fields
+from typing import Dict, List, Set, Tuple
+
+from .registration import Registry
+from .snapshots import transaction_from_entry
+from .transactions import EnergyTransaction, TransactionLogger, TransactionRecord
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=str, check_circular=False)
+# Keys TransactionLogger writes itself, plus the ones this service adds.
+RESERVED_METADATA = frozenset(field.name for field in fields(EnergyTransaction)) | {
+    "interconnect",
+    "network",
+    "route",
+    "entry_type",
+    "device_id",
+    "device_epoch",
+    "device_seq",
+}
+
+
+def encode_batch(device_id: str, epoch: str, items: List[Dict], level: int = 6) -> bytes:
+    batch = {"device_id": device_id, "epoch": epoch, "items": items}
+    return zlib.compress(_ENCODER.encode(batch).encode("utf-8"), level)
+
+
+def decode_batch(data: bytes) -> Dict:
+    try:
+        batch = json.loads(zlib.decompress(data))
+    except (zlib.error, ValueError) as exc:
+        raise ValueError(f"malformed sync batch: {exc}") from exc
+    if not isinstance(batch, dict) or "device_id" not in batch or not isinstance(batch.get("items"), list):
+        raise ValueError("malformed sync batch: expected device_id and items")
+    sequences = [item.get("seq") if isinstance(item, dict) else None for item in batch["items"]]
+    if not all(isinstance(seq, int) and not isinstance(seq, bool) for seq in sequences):
+        raise ValueError("malformed sync batch: every item needs an integer seq")
+    if any(later <= earlier for earlier, later in zip(sequences, sequences[1:])):
+        raise ValueError("malformed sync batch: sequences must increase")
+    return batch
+
+
+def _parse_item(item: Dict) -> EnergyTransaction:
+    """The transaction behind a batch item; ``ValueError`` if it is malformed."""
+
+    try:
+        transaction = transaction_from_entry(item["transaction"])
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        raise ValueError(f"malformed transaction: {exc!r}") from exc
+    if transaction is None:
+        raise ValueError("malformed transaction: not a trade payload")
+    for name in ("tx_id", "producer_id", "consumer_id"):
+        value = getattr(transaction, name)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"malformed transaction: {name} must be a non-empty string")
+    for name in ("kilowatt_hours", "price_usd"):
+        value = getattr(transaction, name)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"malformed transaction: {name} must be a number")
+    if transaction.kilowatt_hours <= 0:
+        raise ValueError("malformed transaction: kilowatt_hours must be positive")
+    if not isinstance(item.get("route") or [], list) or not isinstance(item.get("metadata") or {}, dict):
+        raise ValueError("malformed transaction: route must be a list and metadata an object")
+    reserved = sorted(RESERVED_METADATA.intersection(item.get("metadata") or {}))
+    if reserved:
+        raise ValueError(f"malformed transaction: metadata may not set {', '.join(reserved)}")
+    return transaction
+
+
+class SyncService:
+    """Applies device batches to a :class:`TransactionLogger` exactly once per trade."""
+
+    def __init__(self, registry: Registry, transactions: TransactionLogger):
+        self.registry = registry
+        self.transactions = transactions
+        self.marks: Dict[Tuple[str, str], int] = {}
+        self.tx_ids: Set[str] = set()
+        self._seen = 0
+        self._lock = threading.Lock()
+        ledger = transactions.ledger
+        for position, entry in enumerate(ledger.iter_entries(self._seen), start=self._seen):
+            self.record(position, entry)
+        ledger.add_listener(self.record)
+
+    def record(self, position: int, entry: Dict) -> None:
+        self._seen = position + 1
+        tx_id = entry.get("tx_id")
+        if tx_id is not None:
+            self.tx_ids.add(tx_id)
+        device_id = entry.get("device_id")
+        if device_id is not None:
+            key = (device_id, entry.get("device_epoch", ""))
+            if entry.get("device_seq", 0) > self.marks.get(key, 0):
+                self.marks[key] = entry["device_seq"]
+
+    def high_water_mark(self, device_id: str, epoch: str) -> int:
+        """Highest sequence from ``device_id``'s ``epoch`` already handled (0 if none)."""
+
+        return self.marks.get((device_id, epoch), 0)
+
+    def handshake(self, device_id: str, epoch: str) -> int:
+        """Start a sync: return the mark the device can acknowledge up to."""
+
+        with self._lock:
+            return self.high_water_mark(device_id, epoch)
+
+    def receive(self, data: bytes) -> Dict:
+        """Apply one encoded batch and return the device's new high-water mark.
+
+        The reply holds ``high_water_mark``, ``applied``, ``duplicates`` and
+        ``rejected`` (``[seq, tx_id, reason]`` rows). A batch without
+        increasing integer sequences raises ``ValueError`` and applies nothing.
+        """
+
+        batch = decode_batch(data)
+        device_id, epoch = str(batch["device_id"]), str(batch.get("epoch", ""))
+        with self._lock:
+            mark = self.high_water_mark(device_id, epoch)
+            fresh = [item for item in batch["items"] if item["seq"] > mark]
+            parsed: List[Tuple[Dict, EnergyTransaction]] = []
+            rejected = []
+            duplicates = len(batch["items"]) - len(fresh)
+            batch_tx_ids = set()
+            for item in fresh:
+                try:
+                    transaction = _parse_item(item)
+                except ValueError as exc:
+                    tx_id = item.get("transaction", {}).get("tx_id") if isinstance(item.get("transaction"), dict) else None
+                    rejected.append([item["seq"], tx_id, str(exc)])
+                    continue
+                if transaction.tx_id in self.tx_ids or transaction.tx_id in batch_tx_ids:
+                    duplicates += 1
+                    continue
+                batch_tx_ids.add(transaction.tx_id)
+                parsed.append((item, transaction))
+
+            participants = self.registry.get_many(
+                {transaction.producer_id for _, transaction in parsed}
+                | {transaction.consumer_id for _, transaction in parsed}
+            )
+            records: List[TransactionRecord] = []
+            for item, transaction in parsed:
+                producer = participants.get(transaction.producer_id)
+                consumer = participants.get(transaction.consumer_id)
+                if producer is None or consumer is None:
+                    missing = transaction.producer_id if producer is None else transaction.consumer_id
+                    rejected.append([item["seq"], transaction.tx_id, f"Participant {missing} is not registered"])
+                    continue
+                metadata = dict(item.get("metadata") or {})
+                metadata["device_id"] = device_id
+                metadata["device_epoch"] = epoch
+                metadata["device_seq"] = item["seq"]
+                records.append((transaction, producer, consumer, item.get("route"), metadata))
+
+            if records:
+                self.transactions.log_transactions(records)
+            if fresh:
+                key = (device_id, epoch)
+                self.marks[key] = max(self.marks.get(key, 0), fresh[-1]["seq"])
+            return {
+                "device_id": device_id,
+                "high_water_mark": self.high_water_mark(device_id, epoch),
+                "applied": len(records),
+                "duplicates": duplicates,
+                "rejected": rejected,
+            }
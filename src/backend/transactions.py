@@ -1,11 +1,24 @@
 """Transaction logging across the grid ledger."""
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, List, Tuple
 
+from .columnar import TransactionColumns
 from .config import InterconnectConfig
 from .registration import Participant
 from src.ledger.adapter import LedgerAdapter
+from src.ledger.integrity import HashChain, MerkleProof
+from src.observability import metrics
+
+LOG_SECONDS = metrics.histogram(
+    "gridshare_transaction_log_seconds",
+    "Latency of TransactionLogger.log_transaction and log_transactions calls",
+    "seconds",
+)
+LOGGED = metrics.counter("gridshare_transactions_logged_total", "Transactions written to the ledger")
+NETWORK = "Virtual Clean Power Network"
 
 
 @dataclass
@@ -20,17 +33,59 @@ class EnergyTransaction:
     ev_session_id: str | None = None
 
 
+@lru_cache(maxsize=None)
+def payload_encoder(cls: type) -> Callable[[object], Dict]:
+    """Return a function turning instances of dataclass ``cls`` into flat dicts.
+
+    Unlike ``dataclasses.asdict`` it neither recurses nor deep-copies field
+    values. For plain dataclasses whose fields are all set by ``__init__``,
+    the instance ``__dict__`` already holds exactly the fields in declaration
+    order, so it is copied directly. Slotted classes, and instances that
+    carry extra attributes, are read field by field.
+    """
+
+    names = tuple(field.name for field in fields(cls))
+
+    def by_field(instance: object) -> Dict:
+        return {name: getattr(instance, name) for name in names}
+
+    if "__slots__" in cls.__dict__ or not all(field.init for field in fields(cls)):
+        return by_field
+
+    def by_dict(instance: object) -> Dict:
+        attributes = instance.__dict__
+        return attributes.copy() if len(attributes) == len(names) else by_field(instance)
+
+    return by_dict
+
+
+TransactionRecord = Tuple[EnergyTransaction, Participant, Participant, List[str] | None, Dict | None]
+
+
 class TransactionLogger:
     """Collects transactions and writes them to the ledger adapter."""
 
-    def __init__(self, interconnect: InterconnectConfig, ledger: LedgerAdapter):
+    def __init__(self, interconnect: InterconnectConfig, ledger: LedgerAdapter, hash_chain: HashChain | None = None):
         self.interconnect = interconnect
         self.ledger = ledger
-        self._transactions: List[EnergyTransaction] = []
+        self.store = TransactionColumns()
+        self._hash_chain = hash_chain
+
+    @property
+    def hash_chain(self) -> HashChain:
+        """Hash chain over the ledger, attached on first use."""
+
+        if self._hash_chain is None:
+            self._hash_chain = HashChain()
+        if self._hash_chain.ledger is None:
+            self._hash_chain.attach(self.ledger)
+        return self._hash_chain
 
     @property
     def transactions(self) -> List[EnergyTransaction]:
-        return list(self._transactions)
+        """Materialize logged transactions; prefer ``store`` for large volumes."""
+
+        return self.store.transactions()
 
     def log_transaction(
         self,
@@ -39,16 +94,76 @@ class TransactionLogger:
         consumer: Participant,
         route: List[str] | None = None,
         additional_metadata: Dict | None = None,
+    ) -> Dict:
+        started = perf_counter_ns() if metrics.enabled else 0
+        payload = self._build_payload(transaction, producer, consumer, route, additional_metadata)
+        length = len(self.store)
+        try:
+            self.store.append(transaction)
+            self.ledger.append_entry(payload)
+        except Exception:
+            self.store.truncate(length)
+            raise
+        if started:
+            LOG_SECONDS.record(perf_counter_ns() - started)
+            LOGGED.inc()
+        return payload
+
+    def log_transaction_with_proof(
+        self,
+        transaction: EnergyTransaction,
+        producer: Participant,
+        consumer: Participant,
+        route: List[str] | None = None,
+        additional_metadata: Dict | None = None,
+    ) -> Tuple[Dict, MerkleProof]:
+        """Log a transaction and return its payload with a Merkle inclusion proof."""
+
+        chain = self.hash_chain
+        position = self.ledger.entry_count
+        payload = self.log_transaction(transaction, producer, consumer, route, additional_metadata)
+        return payload, chain.proof(position)
+
+    def log_transactions(self, batch: Iterable[TransactionRecord]) -> List[Dict]:
+        """Log many transactions with a single ledger append.
+
+        Each record is ``(transaction, producer, consumer, route, additional_metadata)``.
+        The whole batch is validated before anything is written.
+        """
+
+        started = perf_counter_ns() if metrics.enabled else 0
+        transactions: List[EnergyTransaction] = []
+        payloads: List[Dict] = []
+        for transaction, producer, consumer, route, additional_metadata in batch:
+            payloads.append(self._build_payload(transaction, producer, consumer, route, additional_metadata))
+            transactions.append(transaction)
+        length = len(self.store)
+        try:
+            self.store.extend(transactions)
+            self.ledger.append_entries(payloads)
+        except Exception:
+            self.store.truncate(length)
+            raise
+        if started:
+            LOG_SECONDS.record(perf_counter_ns() - started)
+            LOGGED.inc(len(payloads))
+        return payloads
+
+    def _build_payload(
+        self,
+        transaction: EnergyTransaction,
+        producer: Participant,
+        consumer: Participant,
+        route: List[str] | None,
+        additional_metadata: Dict | None,
     ) -> Dict:
         if producer.participant_id != transaction.producer_id or consumer.participant_id != transaction.consumer_id:
             raise ValueError("Producer or consumer mismatch")
-        payload = asdict(transaction)
+        payload = payload_encoder(type(transaction))(transaction)
         payload["timestamp"] = transaction.timestamp.isoformat()
         payload["interconnect"] = self.interconnect.name
-        payload["network"] = "Virtual Clean Power Network"
+        payload["network"] = NETWORK
         payload["route"] = route or []
         if additional_metadata:
             payload.update(additional_metadata)
-        self._transactions.append(transaction)
-        self.ledger.append_entry(payload)
         return payload
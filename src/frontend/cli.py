@@ -3,21 +3,39 @@
 The CLI wraps the existing mobile-facing orchestration so non-developers
 can register participants, request EV charging energy, and inspect the
 ledger without writing Python code.
+
+Backend modules are imported only by the commands that need them, so
+``--help`` and cheap commands start quickly. For many invocations in a row,
+run ``serve`` once and send commands through :mod:`src.frontend.client`.
 """
 from __future__ import annotations
 
 import argparse
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from src.mobile.app import EVChargeRequest, P2PConnectApp
 
-from src.mobile.app import EVChargeRequest, P2PConnectApp
+# Kept in sync with src.frontend.importers.FORMATS and
+# src.backend.settlement.NETTING_WINDOWS; literals here keep parser
+# construction free of backend imports.
+IMPORT_FORMATS = ("csv", "jsonl")
+SETTLEMENT_WINDOWS = ("hourly", "daily")
 
 
 class GridShareCLI:
     """High-level helper for orchestrating demo interactions."""
 
     def __init__(self, app: Optional[P2PConnectApp] = None):
-        self.app = app or P2PConnectApp()
+        if app is None:
+            from src.mobile.app import P2PConnectApp
+
+            app = P2PConnectApp()
+        self.app = app
 
     def bootstrap_demo_participants(
         self,
@@ -28,8 +46,8 @@ class GridShareCLI:
     ) -> Dict[str, str]:
         """Register a default producer and consumer if they are absent."""
 
-        participants = self.app.registry.participants
-        if producer_id not in participants:
+        registry = self.app.registry
+        if not registry.contains(producer_id):
             self.app.register_user(
                 participant_id=producer_id,
                 role="producer",
@@ -37,7 +55,7 @@ class GridShareCLI:
                 node=producer_node,
                 metadata={"resource": "solar farm"},
             )
-        if consumer_id not in participants:
+        if not registry.contains(consumer_id):
             self.app.register_user(
                 participant_id=consumer_id,
                 role="consumer",
@@ -57,6 +75,8 @@ class GridShareCLI:
     ) -> EVChargeRequest:
         """Validate inputs and return an EVChargeRequest instance."""
 
+        from src.mobile.app import EVChargeRequest
+
         start_dt = datetime.fromisoformat(desired_start)
         return EVChargeRequest(
             station_id=station_id,
@@ -87,28 +107,75 @@ class GridShareCLI:
     def render_ledger(self, entries: Optional[Iterable[Dict]] = None) -> str:
         """Render ledger entries in a human-readable format."""
 
-        entries = list(entries) if entries is not None else self.app.ledger_snapshot()
-        if not entries:
-            return "No ledger entries yet. Submit an EV charge request to get started."
+        return "\n".join(self.iter_ledger_lines(entries))
+
+    def iter_ledger_lines(self, entries: Optional[Iterable[Dict]] = None) -> Iterator[str]:
+        """Yield the lines of :meth:`render_ledger` one at a time."""
 
-        lines: List[str] = ["GridShare Ledger"]
-        for entry in entries:
+        entries = iter(entries if entries is not None else self.app.ledger.iter_entries())
+        first = next(entries, None)
+        if first is None:
+            yield "No ledger entries yet. Submit an EV charge request to get started."
+            return
+
+        yield "GridShare Ledger"
+        for entry in chain([first], entries):
+            if entry.get("entry_type") == "settlement":
+                yield from _settlement_lines(entry)
+                continue
+            if entry.get("entry_type") == "reservation":
+                yield _reservation_line(entry)
+                continue
             tx_id = entry.get("tx_id", "<unknown>")
             route = " -> ".join(entry.get("route", []))
-            lines.extend(
-                [
-                    f"- Transaction {tx_id}: {entry.get('kilowatt_hours')} kWh @ ${entry.get('price_usd')}",
-                    f"  Producer: {entry.get('producer_id')} | Consumer: {entry.get('consumer_id')} | Source: {entry.get('energy_source')}",
-                    f"  Route: {route}",
-                ]
-            )
-        return "\n".join(lines)
+            yield f"- Transaction {tx_id}: {entry.get('kilowatt_hours')} kWh @ ${entry.get('price_usd')}"
+            yield f"  Producer: {entry.get('producer_id')} | Consumer: {entry.get('consumer_id')} | Source: {entry.get('energy_source')}"
+            yield f"  Route: {route}"
+
+
+def _reservation_line(entry: Dict) -> str:
+    if entry.get("action") == "dropped":
+        return f"- Reservation {entry.get('reservation_id')} dropped (was from {entry.get('previous_from')})"
+    return (
+        f"- Reservation {entry.get('reservation_id')} moved: {entry.get('previous_from')} -> "
+        f"{entry.get('reserved_from')} until {entry.get('reserved_until')}"
+    )
+
+
+def _settlement_lines(entry: Dict) -> Iterator[str]:
+    positions = entry.get("positions", [])
+    yield (
+        f"- Settlement {entry.get('settlement_id')}: {entry.get('window_start')} -> {entry.get('window_end')}, "
+        f"{entry.get('trade_count')} trades, {len(positions)} participants"
+    )
+    net = " | ".join(f"{position['participant_id']} {position['net_usd']:+.2f}" for position in positions)
+    yield f"  Net USD: {net}"
 
 
 # CLI runner ---------------------------------------------------------------
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="GridShare demo CLI")
+    parser.add_argument(
+        "--ledger-path",
+        default=os.environ.get("GRIDSHARE_LEDGER_PATH"),
+        help="Directory for a durable ledger (defaults to $GRIDSHARE_LEDGER_PATH; in-memory if unset)",
+    )
+    parser.add_argument(
+        "--registry-path",
+        default=os.environ.get("GRIDSHARE_REGISTRY_PATH"),
+        help="Directory for a persistent participant registry (defaults to $GRIDSHARE_REGISTRY_PATH)",
+    )
+    parser.add_argument(
+        "--snapshot-path",
+        default=os.environ.get("GRIDSHARE_SNAPSHOT_PATH"),
+        help="Directory for state snapshots used to restart quickly (defaults to $GRIDSHARE_SNAPSHOT_PATH)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=os.environ.get("GRIDSHARE_METRICS_FILE"),
+        help="Enable metrics and write them in Prometheus text format to this file on exit",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     bootstrap = subparsers.add_parser("bootstrap", help="Register demo producer and consumer")
@@ -131,14 +198,67 @@ def _build_parser() -> argparse.ArgumentParser:
     ledger = subparsers.add_parser("ledger", help="Show ledger entries")
     ledger.add_argument("--as-json", action="store_true", help="Dump raw ledger entries")
 
+    export = subparsers.add_parser("export", help="Stream ledger entries as JSON Lines or columnar binary")
+    export.add_argument("--format", choices=["jsonl", "columnar"], default="jsonl")
+    export.add_argument("--since", help="Only entries stamped at or after this ISO timestamp")
+    export.add_argument("--limit", type=int, help="Stop after this many entries")
+    export.add_argument("--output", default="-", help="Output file (default: stdout)")
+    export.add_argument("--chunk-rows", type=int, default=4096, help="Rows per columnar chunk")
+
+    settle = subparsers.add_parser("settle", help="Net closed windows into settlement batches and show balances")
+    settle.add_argument("--window", choices=SETTLEMENT_WINDOWS, default="hourly")
+    settle.add_argument("--until", help="Close windows ending at or before this ISO timestamp (default: now, UTC)")
+
+    serve = subparsers.add_parser("serve", help="Keep the app warm and run commands sent by src.frontend.client")
+    serve.add_argument("--socket", help="Unix socket path (defaults to $GRIDSHARE_SOCKET or a per-user temp path)")
+
+    for name, help_text in (
+        ("import-participants", "Register participants from a CSV or JSON Lines file"),
+        ("import-requests", "Log charge requests from a CSV or JSON Lines file"),
+    ):
+        importer = subparsers.add_parser(name, help=help_text)
+        importer.add_argument("path")
+        importer.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to jsonl for .jsonl/.ndjson, else csv")
+        importer.add_argument("--chunk-size", type=int, default=5000, help="Rows validated and committed per batch")
+
     return parser
 
 
 def main(argv: Optional[List[str]] = None) -> None:
     parser = _build_parser()
     args = parser.parse_args(argv)
-    cli = GridShareCLI()
+    from src.mobile.app import P2PConnectApp
+    from src.observability import metrics
 
+    if args.metrics_file:
+        metrics.enable()
+    ledger = registry = None
+    if args.ledger_path:
+        from src.ledger.file_adapter import FileLedgerAdapter
+
+        ledger = FileLedgerAdapter(args.ledger_path)
+    if args.registry_path:
+        from src.backend.config import OHIO_INTERCONNECT
+        from src.backend.registry_store import PersistentRegistry
+
+        registry = PersistentRegistry(OHIO_INTERCONNECT, args.registry_path)
+    cli = GridShareCLI(P2PConnectApp(ledger=ledger, registry=registry))
+    snapshotter = cli.app.enable_snapshots(args.snapshot_path) if args.snapshot_path else None
+    try:
+        _run_command(cli, args)
+    finally:
+        if snapshotter is not None:
+            if snapshotter.pending:
+                snapshotter.snapshot()
+            snapshotter.close()
+        cli.app.ledger.close()
+        if registry is not None:
+            registry.close()
+        if args.metrics_file:
+            metrics.PrometheusTextFileExporter(args.metrics_file).export()
+
+
+def _run_command(cli: GridShareCLI, args: argparse.Namespace) -> None:
     if args.command == "bootstrap":
         participants = cli.bootstrap_demo_participants(
             producer_id=args.producer_id,
@@ -172,11 +292,79 @@ def main(argv: Optional[List[str]] = None) -> None:
         return
 
     if args.command == "ledger":
-        entries = cli.app.ledger_snapshot()
+        entries = cli.app.ledger.iter_entries()
         if args.as_json:
-            print(entries)
+            _write_json_array(entries, sys.stdout)
         else:
-            print(cli.render_ledger(entries))
+            for line in cli.iter_ledger_lines(entries):
+                print(line)
+        return
+
+    if args.command in ("import-participants", "import-requests"):
+        from src.frontend.importers import import_participants, import_requests, iter_rows
+
+        rows = iter_rows(args.path, args.format)
+        if args.command == "import-participants":
+            report = import_participants(cli.app, rows, chunk_size=args.chunk_size)
+        else:
+            report = import_requests(cli.app, rows, chunk_size=args.chunk_size)
+        print(report.summary())
+        return
+
+    if args.command == "serve":
+        from src.frontend.client import socket_path
+        from src.frontend.server import serve
+
+        serve(cli, socket_path(args.socket))
+        return
+
+    if args.command == "settle":
+        until = datetime.fromisoformat(args.until) if args.until else datetime.now(timezone.utc)
+        batches = cli.app.settle(args.window, until)
+        print(f"Emitted {len(batches)} settlement batch(es).")
+        for batch in batches:
+            for line in _settlement_lines(batch):
+                print(line)
+        balances = cli.app.settlement(args.window).balances
+        if balances:
+            print("Balances:")
+        for balance in sorted(balances.values(), key=lambda balance: balance.participant_id):
+            print(
+                f"- {balance.participant_id}: delivered {balance.kwh_delivered:.2f} kWh, "
+                f"received {balance.kwh_received:.2f} kWh, net ${balance.net_usd:+.2f} over {balance.trades} trades"
+            )
+        return
+
+    if args.command == "export":
+        from src.ledger.export import filter_entries
+
+        since = datetime.fromisoformat(args.since) if args.since else None
+        entries = filter_entries(cli.app.ledger.iter_entries(), since=since, limit=args.limit)
+        if args.output == "-":
+            sys.stdout.flush()
+            _export(entries, sys.stdout.buffer, args)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, "wb") as stream:
+                _export(entries, stream, args)
+
+
+def _export(entries: Iterable[Dict], stream, args: argparse.Namespace) -> int:
+    from src.ledger.export import write_columnar, write_jsonl
+
+    if args.format == "columnar":
+        return write_columnar(entries, stream, chunk_rows=args.chunk_rows)
+    return write_jsonl(entries, stream)
+
+
+def _write_json_array(entries: Iterable[Dict], stream) -> None:
+    from src.ledger.file_adapter import encode_entry
+
+    separator = "[\n  "
+    for entry in entries:
+        stream.write(separator + encode_entry(entry).decode("utf-8"))
+        separator = ",\n  "
+    stream.write("[]\n" if separator.startswith("[") else "\n]\n")
 
 
 if __name__ == "__main__":
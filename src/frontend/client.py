@@ -0,0 +1,82 @@
+"""Thin client for a running ``python -m src.frontend.cli serve``.
+
+Sends CLI arguments over the server's Unix socket and replays its output and
+exit status, so a call costs interpreter startup plus one round trip rather
+than importing the backend and rebuilding the app::
+
+    python -m src.frontend.cli --ledger-path ledger serve &
+    python -m src.frontend.client request --tx-id tx-1 --kilowatt-hours 12 ...
+
+The socket comes from ``--socket PATH`` (before the command), then
+``$GRIDSHARE_SOCKET``, then :data:`DEFAULT_SOCKET`. This module imports only
+the standard library on purpose.
+
+Wire format, one command per connection; the server closes the connection
+after replying::
+
+    request  := json({"argv": [str, ...]}) "\\n"
+    response := json({"status": int, "stdout": n, "stderr": m}) "\\n" stdout[n] stderr[m]
+"""
+import json
+import os
+import socket
+import sys
+from typing import List, Optional, Tuple
+
+DEFAULT_SOCKET = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"gridshare-{os.getuid()}.sock")
+
+
+def socket_path(path: Optional[str] = None) -> str:
+    return path or os.environ.get("GRIDSHARE_SOCKET") or DEFAULT_SOCKET
+
+
+def read_message(stream) -> Optional[dict]:
+    """Read one JSON header line, or ``None`` at end of stream."""
+
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def write_response(stream, status: int, stdout: bytes, stderr: bytes) -> None:
+    header = json.dumps({"status": status, "stdout": len(stdout), "stderr": len(stderr)})
+    stream.write(header.encode("utf-8") + b"\n" + stdout + stderr)
+    stream.flush()
+
+
+def call(argv: List[str], path: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[int, bytes, bytes]:
+    """Run ``argv`` on the server and return ``(status, stdout, stderr)``."""
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path(path))
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps({"argv": list(argv)}).encode("utf-8") + b"\n")
+            stream.flush()
+            header = read_message(stream)
+            if header is None:
+                raise ConnectionError("server closed the connection without replying")
+            return header["status"], stream.read(header["stdout"]), stream.read(header["stderr"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    path = None
+    if argv[:1] == ["--socket"] and len(argv) > 1:
+        path, argv = argv[1], argv[2:]
+    try:
+        status, stdout, stderr = call(argv, path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(
+            f"No GridShare server at {socket_path(path)}; start one with 'python -m src.frontend.cli serve'",
+            file=sys.stderr,
+        )
+        return 2
+    sys.stdout.buffer.write(stdout)
+    sys.stdout.buffer.flush()
+    sys.stderr.buffer.write(stderr)
+    sys.stderr.buffer.flush()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
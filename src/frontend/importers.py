@@ -0,0 +1,197 @@
+"""Bulk import of participants and charge requests from CSV or JSON Lines.
+
+Rows are streamed from disk, validated in chunks of ``chunk_size`` and
+committed with one ``Registry.register_many`` or
+``P2PConnectApp.request_ev_energy_batch`` call per chunk, so a large file
+costs one pass and a bounded amount of memory. Invalid rows are skipped and
+reported with their line number instead of aborting the import.
+
+A request row must name its ``station_id`` and a positive ``kilowatt_hours``.
+Its ``tx_id`` must not repeat within a chunk or match anything already on the
+app's ledger. That includes earlier chunks and earlier imports into a
+persistent ledger, so re-running an import only logs the rows that failed.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from src.backend.registration import ROLES, Participant
+from src.mobile.app import EVChargeOrder, EVChargeRequest, P2PConnectApp
+
+FORMATS = ("csv", "jsonl")
+PARTICIPANT_FIELDS = ("participant_id", "role", "capacity_kw", "node")
+Row = Tuple[int, Dict]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    imported: int = 0
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+    def summary(self, max_rejects: int = 20) -> str:
+        lines = [
+            f"Imported {self.imported} of {self.rows} rows in {self.seconds:.2f}s "
+            f"({self.rows_per_second:,.0f} rows/s); {len(self.rejected)} rejected"
+        ]
+        lines.extend(f"  line {line}: {reason}" for line, reason in self.rejected[:max_rejects])
+        if len(self.rejected) > max_rejects:
+            lines.append(f"  ... {len(self.rejected) - max_rejects} more")
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp; imports repeat the same slot starts, so results are cached."""
+
+    return datetime.fromisoformat(value)
+
+
+def iter_rows(path: str | os.PathLike, fmt: str | None = None) -> Iterator[Row]:
+    """Yield ``(line_number, row)`` pairs from a CSV (with header) or JSON Lines file."""
+
+    fmt = fmt or ("jsonl" if str(path).endswith((".jsonl", ".ndjson")) else "csv")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    with open(path, newline="", encoding="utf-8") as handle:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(handle, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, {"__error__": f"invalid JSON: {exc.msg}"}
+
+
+def _chunks(rows: Iterable[Row], chunk_size: int) -> Iterator[List[Row]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _participant(row: Dict) -> Participant:
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+    missing = [name for name in PARTICIPANT_FIELDS if row.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if row["role"] not in ROLES:
+        raise ValueError("role must be 'producer', 'consumer', or 'hybrid'")
+    metadata = {key: value for key, value in row.items() if key not in PARTICIPANT_FIELDS and value not in (None, "")}
+    metadata["node"] = row["node"]
+    return Participant(
+        participant_id=str(row["participant_id"]),
+        role=row["role"],
+        capacity_kw=float(row["capacity_kw"]),
+        metadata=metadata,
+    )
+
+
+def import_participants(app: P2PConnectApp, rows: Iterable[Row], chunk_size: int = 5000) -> ImportReport:
+    """Register participants, one ``register_many`` call per chunk."""
+
+    report = ImportReport()
+    started = time.perf_counter()
+    for chunk in _chunks(rows, chunk_size):
+        report.rows += len(chunk)
+        parsed: Dict[str, Tuple[int, Participant]] = {}
+        for line, row in chunk:
+            try:
+                participant = _participant(row)
+            except (TypeError, ValueError) as exc:
+                report.rejected.append((line, str(exc)))
+                continue
+            if participant.participant_id in parsed:
+                report.rejected.append((line, f"Participant {participant.participant_id} repeated in file"))
+                continue
+            parsed[participant.participant_id] = (line, participant)
+
+        existing = app.registry.get_many(parsed)
+        for participant_id in existing:
+            line, _ = parsed.pop(participant_id)
+            report.rejected.append((line, f"Participant {participant_id} already registered"))
+        app.registry.register_many(participant for _, participant in parsed.values())
+        report.imported += len(parsed)
+    report.rejected.sort()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _order(row: Dict) -> EVChargeOrder:
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+    missing = [name for name in ("desired_start", "station_id") if not row.get(name)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    kilowatt_hours = float(row["kilowatt_hours"])
+    if not kilowatt_hours > 0:
+        raise ValueError("kilowatt_hours must be positive")
+    request = EVChargeRequest(
+        station_id=str(row["station_id"]),
+        kilowatt_hours=kilowatt_hours,
+        price_usd=float(row["price_usd"]),
+        desired_start=parse_timestamp(row["desired_start"]),
+        priority=row.get("priority") or "standard",
+    )
+    if request.priority not in ("standard", "fast-track"):
+        raise ValueError("priority must be 'standard' or 'fast-track'")
+    return EVChargeOrder(
+        tx_id=str(row["tx_id"]),
+        request=request,
+        producer_id=str(row["producer_id"]),
+        consumer_id=str(row["consumer_id"]),
+        energy_source=row.get("energy_source") or "solar",
+    )
+
+
+def import_requests(app: P2PConnectApp, rows: Iterable[Row], chunk_size: int = 5000) -> ImportReport:
+    """Route and log charge requests, one batched ledger append per chunk."""
+
+    report = ImportReport()
+    started = time.perf_counter()
+    logged = app.ledger_index
+    for chunk in _chunks(rows, chunk_size):
+        report.rows += len(chunk)
+        orders: List[EVChargeOrder] = []
+        lines: Dict[str, int] = {}
+        for line, row in chunk:
+            try:
+                order = _order(row)
+            except KeyError as exc:
+                report.rejected.append((line, f"missing {exc.args[0]}"))
+                continue
+            except (TypeError, ValueError) as exc:
+                report.rejected.append((line, str(exc)))
+                continue
+            if order.tx_id in lines:
+                report.rejected.append((line, "duplicate tx_id in batch"))
+                continue
+            if order.tx_id in logged:
+                report.rejected.append((line, f"tx_id {order.tx_id} already logged"))
+                continue
+            lines[order.tx_id] = line
+            orders.append(order)
+
+        result = app.request_ev_energy_batch(orders)
+        report.imported += len(result.payloads)
+        report.rejected.extend((lines[tx_id], reason) for tx_id, reason in result.rejected)
+    report.rejected.sort()
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,112 @@
+"""Long-running CLI server behind ``python -m src.frontend.cli serve``.
+
+The server keeps one warm :class:`~src.frontend.cli.GridShareCLI` (app,
+registry, ledger, route caches) and runs each command received from
+:mod:`src.frontend.client` against it, capturing stdout/stderr and the exit
+status. Commands run one at a time in the serving thread, so the app needs no
+locking. Each connection therefore carries a single command and must send it
+within ``request_timeout`` seconds, so a stalled or idle client cannot block
+everyone else. Global options such as ``--ledger-path`` are fixed when the
+server starts and are rejected per command.
+
+The socket is bound under a ``0177`` umask, so it is owner-only from the
+moment it exists rather than from a later ``chmod``.
+"""
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import List, Tuple
+
+from .cli import GridShareCLI, _build_parser, _run_command
+from .client import read_message, write_response
+
+
+def execute(cli: GridShareCLI, argv: List[str]) -> Tuple[int, bytes, bytes]:
+    """Run one CLI command in-process and return ``(status, stdout, stderr)``."""
+
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+    stderr = io.StringIO()
+    status = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            if argv and argv[0].startswith("--") and argv[0] != "--help":
+                raise ValueError(f"global option {argv[0]} must be given when starting the server")
+            try:
+                args = _build_parser().parse_args(argv)
+            except SystemExit as exc:  # argparse errors and --help; a shutdown signal must still propagate
+                status = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+            else:
+                if args.command == "serve":
+                    raise ValueError("already serving")
+                _run_command(cli, args)
+        except Exception as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            status = 1
+    stdout.flush()
+    return status, stdout.buffer.getvalue(), stderr.getvalue().encode("utf-8")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self) -> None:
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def handle(self) -> None:
+        try:
+            message = read_message(self.rfile)
+        except (TimeoutError, ValueError):  # stalled client or garbled request
+            return
+        if not isinstance(message, dict):
+            return
+        status, stdout, stderr = execute(self.server.cli, [str(arg) for arg in message.get("argv", [])])
+        try:
+            write_response(self.wfile, status, stdout, stderr)
+        except (BrokenPipeError, TimeoutError):
+            pass
+
+
+class CLIServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str, cli: GridShareCLI, request_timeout: float = 5.0):
+        self.cli = cli
+        self.request_timeout = request_timeout
+        _remove_stale_socket(path)
+        previous = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(previous)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise OSError(f"A GridShare server is already listening on {path}")
+
+
+def serve(cli: GridShareCLI, path: str) -> None:
+    """Serve commands on the Unix socket ``path`` until SIGINT or SIGTERM."""
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with CLIServer(path, cli) as server:
+        print(f"Serving GridShare CLI on {path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,15 +1,113 @@
 """Minimal ledger adapter abstraction for blockchain integration."""
-from typing import Dict, List
+from collections.abc import Sequence
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from src.observability import metrics
+
+LedgerListener = Callable[[int, Dict], None]
+APPEND_SECONDS = metrics.histogram(
+    "gridshare_ledger_append_seconds", "Latency of ledger append_entry and append_entries calls", "seconds"
+)
+APPENDED = metrics.counter("gridshare_ledger_entries_appended_total", "Entries appended to the ledger")
+
+
+def record_append(started: int, count: int) -> None:
+    """Record one append call that began at ``started`` (perf_counter_ns)."""
+    APPEND_SECONDS.record(perf_counter_ns() - started)
+    APPENDED.inc(count)
+
+
+class LedgerView(Sequence):
+    """Read-only, zero-copy sequence over a ledger's entries.
+
+    It reads through ``entry``, ``entry_count`` and ``iter_entries``, so it
+    follows later appends and a durable ledger decodes entries only as
+    they are accessed. Slicing returns a list.
+    """
+
+    __slots__ = ("_ledger",)
+
+    def __init__(self, ledger: "LedgerAdapter") -> None:
+        self._ledger = ledger
+
+    def __len__(self) -> int:
+        return self._ledger.entry_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._ledger.entry(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self._ledger.entry(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._ledger.iter_entries()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LedgerView({len(self)} entries)"
 
 
 class LedgerAdapter:
     def __init__(self) -> None:
         self._entries: List[Dict] = []
+        self._listeners: List[LedgerListener] = []
 
     @property
-    def entries(self) -> List[Dict]:
-        return list(self._entries)
+    def entries(self) -> LedgerView:
+        """Every entry, as a live read-only view rather than a copy."""
+        return LedgerView(self)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+    def entry(self, position: int) -> Dict:
+        """Return the entry stored at ``position``."""
+        return self._entries[position]
+
+    def iter_entries(self, start: int = 0) -> Iterator[Dict]:
+        """Yield entries from position ``start`` without copying the ledger."""
+        for position in range(max(start, 0), len(self._entries)):
+            yield self._entries[position]
+
+    def add_listener(self, listener: LedgerListener) -> None:
+        """Call ``listener(position, entry)`` after every future append."""
+        self._listeners.append(listener)
 
     def append_entry(self, entry: Dict) -> None:
         """Simulate writing a transaction to a blockchain ledger."""
+        started = perf_counter_ns() if metrics.enabled else 0
         self._entries.append(entry)
+        self._notify(len(self._entries) - 1, [entry])
+        if started:
+            record_append(started, 1)
+
+    def append_entries(self, entries: Iterable[Dict]) -> None:
+        """Write a batch of transactions in a single ledger append."""
+        started = perf_counter_ns() if metrics.enabled else 0
+        first = len(self._entries)
+        self._entries.extend(entries)
+        self._notify(first, self._entries[first:])
+        if started:
+            record_append(started, len(self._entries) - first)
+
+    def sync(self) -> None:
+        """Force appended entries to stable storage (nothing to do in memory)."""
+
+    def close(self) -> None:
+        """Release any resources held by the adapter."""
+
+    def _notify(self, first_position: int, entries: List[Dict]) -> None:
+        for listener in self._listeners:
+            for offset, entry in enumerate(entries):
+                listener(first_position + offset, entry)
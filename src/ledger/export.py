@@ -0,0 +1,173 @@
+"""Streaming ledger export.
+
+Both writers consume an iterator of ledger entries and write as they go, so
+exporting a ledger of any size needs memory for one chunk at most.
+
+* :func:`write_jsonl` writes one compact JSON object per line.
+* :func:`write_columnar` writes chunks of ``chunk_rows`` entries in a small
+  Arrow-style columnar layout: each column is a contiguous buffer (float64
+  values, or UTF-8 data with offsets and a null bitmap). Fields outside
+  :data:`COLUMNS` are kept as a JSON ``extra`` column.
+
+Columnar layout (little endian)::
+
+    file   := b"GSLC" u8 version chunk* u32 0
+    chunk  := u32 rows u16 columns column*
+    column := u8 name_length name u8 kind body
+    body   := f64[rows]                                     (kind 0, NaN = null)
+            | bitmap[ceil(rows / 8)] u32 offsets[rows + 1] data  (kind 1)
+"""
+import json
+import math
+import struct
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from .file_adapter import encode_entry
+from .index import _time_key
+
+MAGIC = b"GSLC"
+VERSION = 1
+FLOAT, STRING = 0, 1
+ROUTE_SEPARATOR = "\x1f"
+COLUMNS: Tuple[Tuple[str, int], ...] = (
+    ("tx_id", STRING),
+    ("producer_id", STRING),
+    ("consumer_id", STRING),
+    ("kilowatt_hours", FLOAT),
+    ("price_usd", FLOAT),
+    ("timestamp", FLOAT),
+    ("energy_source", STRING),
+    ("ev_session_id", STRING),
+    ("ev_station_id", STRING),
+    ("route", STRING),
+    ("extra", STRING),
+)
+_KNOWN = {name for name, _ in COLUMNS}
+_U32 = struct.Struct("<I")
+_CHUNK_HEADER = struct.Struct("<IH")
+
+
+def filter_entries(
+    entries: Iterable[Dict],
+    since: datetime | None = None,
+    limit: int | None = None,
+) -> Iterator[Dict]:
+    """Yield entries stamped at or after ``since``, stopping after ``limit``."""
+
+    if since is not None:
+        since_key = _time_key(since)
+        entries = (entry for entry in entries if "timestamp" in entry and _time_key(entry["timestamp"]) >= since_key)
+    return iter(entries) if limit is None else islice(entries, limit)
+
+
+def write_jsonl(entries: Iterable[Dict], stream: BinaryIO) -> int:
+    """Write entries as JSON Lines and return how many were written."""
+
+    written = 0
+    for entry in entries:
+        stream.write(encode_entry(entry) + b"\n")
+        written += 1
+    return written
+
+
+def write_columnar(entries: Iterable[Dict], stream: BinaryIO, chunk_rows: int = 4096) -> int:
+    """Write entries in the columnar format and return how many were written."""
+
+    stream.write(MAGIC + bytes([VERSION]))
+    written = 0
+    iterator = iter(entries)
+    while True:
+        chunk = list(islice(iterator, chunk_rows))
+        if not chunk:
+            break
+        stream.write(_encode_chunk(chunk))
+        written += len(chunk)
+    stream.write(_U32.pack(0))
+    return written
+
+
+def read_columnar(stream: BinaryIO) -> Iterator[Dict[str, List]]:
+    """Yield each chunk of a columnar export as ``{column: values}``."""
+
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a GridShare columnar export")
+    version = stream.read(1)[0]
+    if version != VERSION:
+        raise ValueError(f"unsupported columnar export version {version}")
+    while True:
+        rows, columns = _read_chunk_header(stream)
+        if not rows:
+            return
+        chunk: Dict[str, List] = {}
+        for _ in range(columns):
+            name = stream.read(stream.read(1)[0]).decode("utf-8")
+            kind = stream.read(1)[0]
+            if kind == FLOAT:
+                values = struct.unpack(f"<{rows}d", stream.read(8 * rows))
+                chunk[name] = [None if math.isnan(value) else value for value in values]
+            else:
+                chunk[name] = _read_strings(stream, rows)
+        yield chunk
+
+
+def _read_chunk_header(stream: BinaryIO) -> Tuple[int, int]:
+    (rows,) = _U32.unpack(stream.read(4))
+    if not rows:
+        return 0, 0
+    return rows, struct.unpack("<H", stream.read(2))[0]
+
+
+def _read_strings(stream: BinaryIO, rows: int) -> List[str | None]:
+    bitmap = stream.read((rows + 7) // 8)
+    offsets = struct.unpack(f"<{rows + 1}I", stream.read(4 * (rows + 1)))
+    raw = stream.read(offsets[-1])
+    return [
+        raw[offsets[row] : offsets[row + 1]].decode("utf-8") if bitmap[row >> 3] & (1 << (row & 7)) else None
+        for row in range(rows)
+    ]
+
+
+def _encode_chunk(entries: List[Dict]) -> bytes:
+    rows = len(entries)
+    parts = [_CHUNK_HEADER.pack(rows, len(COLUMNS))]
+    for name, kind in COLUMNS:
+        parts.append(bytes([len(name)]) + name.encode("utf-8") + bytes([kind]))
+        if kind == FLOAT:
+            parts.append(struct.pack(f"<{rows}d", *(_float_value(entry, name) for entry in entries)))
+        else:
+            parts.append(_encode_strings([_string_value(entry, name) for entry in entries]))
+    return b"".join(parts)
+
+
+def _encode_strings(values: List[str | None]) -> bytes:
+    bitmap = bytearray((len(values) + 7) // 8)
+    offsets = [0]
+    data = bytearray()
+    for row, value in enumerate(values):
+        if value is not None:
+            bitmap[row >> 3] |= 1 << (row & 7)
+            data += value.encode("utf-8")
+        offsets.append(len(data))
+    return bytes(bitmap) + struct.pack(f"<{len(offsets)}I", *offsets) + bytes(data)
+
+
+def _float_value(entry: Dict, name: str) -> float:
+    value = entry.get(name)
+    if value is None:
+        return math.nan
+    if name == "timestamp":
+        return _time_key(value)
+    return float(value)
+
+
+def _string_value(entry: Dict, name: str) -> str | None:
+    if name == "route":
+        route = entry.get("route")
+        return None if route is None else ROUTE_SEPARATOR.join(route)
+    if name == "extra":
+        extra = {key: value for key, value in entry.items() if key not in _KNOWN}
+        return json.dumps(extra, separators=(",", ":"), default=str) if extra else None
+    value = entry.get(name)
+    return None if value is None else str(value)
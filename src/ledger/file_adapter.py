@@ -0,0 +1,107 @@
+"""Durable ledger adapter backed by an append-only segment log."""
+import json
+import math
+import os
+from time import perf_counter_ns
+from typing import Dict, Iterable, Iterator
+
+from .adapter import LedgerAdapter, record_append
+from .segment_log import SegmentLog
+from src.observability import metrics
+
+try:  # optional: encodes straight to bytes, about 5x faster than the json module
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+# One shared encoder: ``json.dumps`` with non-default options builds a new
+# JSONEncoder on every call.
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=str, check_circular=False)
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+)
+
+
+def encode_entry(entry: Dict) -> bytes:
+    """Compact JSON bytes for ``entry``; anything not JSON-native goes through ``str``.
+
+    With orjson installed the bytes are produced directly, without an
+    intermediate ``str``. The output then differs from the json module only
+    in spelling: non-ASCII is written as UTF-8 rather than escaped. Entries
+    orjson rejects, such as integers wider than 64 bits, and entries holding
+    NaN or infinities (which orjson would write as ``null``) fall back to the
+    json module.
+    """
+
+    if orjson is not None:
+        try:
+            record = orjson.dumps(entry, default=str, option=_ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError
+            pass
+        else:
+            if b"null" not in record or not _has_non_finite(entry):
+                return record
+    return _ENCODER.encode(entry).encode("utf-8")
+
+
+def _has_non_finite(value) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+
+def decode_entry(record: bytes) -> Dict:
+    return json.loads(record)
+
+
+class FileLedgerAdapter(LedgerAdapter):
+    """Ledger that persists every entry to disk and survives restarts.
+
+    Entries are JSON-encoded into a :class:`SegmentLog`; reads decode lazily
+    from memory-mapped segments, so ``iter_entries`` and ``entry`` do not load
+    the ledger into memory. ``entries`` is a :class:`LedgerView` over the
+    same reads, so it does not load the ledger either.
+    """
+
+    def __init__(self, path: str | os.PathLike, **log_options) -> None:
+        self.log = SegmentLog(path, **log_options)
+        self._listeners = []
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.log)
+
+    def entry(self, position: int) -> Dict:
+        """Return the entry at ``position`` (its sequence number)."""
+        return decode_entry(self.log.read(position))
+
+    def iter_entries(self, start: int = 0) -> Iterator[Dict]:
+        for _, record in self.log.iter_records(start):
+            yield decode_entry(record)
+
+    def append_entry(self, entry: Dict) -> None:
+        started = perf_counter_ns() if metrics.enabled else 0
+        position = self.log.append(encode_entry(entry))
+        self._notify(position, [entry])
+        if started:
+            record_append(started, 1)
+
+    def append_entries(self, entries: Iterable[Dict]) -> None:
+        started = perf_counter_ns() if metrics.enabled else 0
+        entries = list(entries)
+        positions = self.log.append_many([encode_entry(entry) for entry in entries])
+        if positions:
+            self._notify(positions[0], entries)
+        if started:
+            record_append(started, len(entries))
+
+    def sync(self) -> None:
+        """Force buffered entries to stable storage."""
+        self.log.sync()
+
+    def close(self) -> None:
+        self.log.close()
@@ -0,0 +1,140 @@
+"""Secondary indexes over ledger entries.
+
+:class:`LedgerIndex` follows a ledger through its listener hook and keeps a
+hash index on ``tx_id`` plus time-sorted postings for every producer,
+consumer, and EV station, and for the ledger as a whole. Only trades are
+indexed; entries with an ``entry_type`` are skipped. A query bisects the
+smallest matching postings list, so "all sessions at EVHub-Cleveland last
+week" costs O(log n + k) instead of a scan of every payload.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from .adapter import LedgerAdapter
+
+_EPOCH = datetime(1970, 1, 1)
+_POSTING_FIELDS = ("producer_id", "consumer_id", "ev_station_id")
+
+
+def _time_key(value: datetime | str) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+
+class _Postings:
+    """Ledger positions ordered by entry timestamp."""
+
+    __slots__ = ("times", "positions")
+
+    def __init__(self) -> None:
+        self.times = array("d")
+        self.positions = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, time_key: float, position: int) -> None:
+        if not self.times or time_key >= self.times[-1]:
+            self.times.append(time_key)
+            self.positions.append(position)
+        else:
+            index = bisect_right(self.times, time_key)
+            self.times.insert(index, time_key)
+            self.positions.insert(index, position)
+
+    def between(self, since: float | None, until: float | None) -> Tuple[int, int]:
+        low = 0 if since is None else bisect_left(self.times, since)
+        high = len(self.times) if until is None else bisect_left(self.times, until)
+        return low, high
+
+
+class LedgerIndex:
+    """Query API over a ledger backed by incrementally maintained indexes."""
+
+    def __init__(self) -> None:
+        self.ledger: LedgerAdapter | None = None
+        self._by_tx_id: Dict[str, int] = {}
+        self._all = _Postings()
+        self._postings: Dict[str, Dict[str, _Postings]] = {name: {} for name in _POSTING_FIELDS}
+        self._indexed = 0
+
+    def attach(self, ledger: LedgerAdapter) -> "LedgerIndex":
+        """Index existing entries, then follow new appends."""
+
+        self.ledger = ledger
+        for position, entry in enumerate(ledger.iter_entries(self._indexed), start=self._indexed):
+            self.record(position, entry)
+        ledger.add_listener(self.record)
+        return self
+
+    def record(self, position: int, entry: Dict) -> None:
+        self._indexed = position + 1
+        if entry.get("entry_type") is not None:
+            return  # settlement batches and reservation changes are not trades
+        tx_id = entry.get("tx_id")
+        if tx_id is not None:
+            self._by_tx_id[tx_id] = position
+        timestamp = entry.get("timestamp")
+        if timestamp is None:
+            return
+        time_key = _time_key(timestamp)
+        self._all.add(time_key, position)
+        for name in _POSTING_FIELDS:
+            value = entry.get(name)
+            if value is not None:
+                postings = self._postings[name].get(value)
+                if postings is None:
+                    postings = self._postings[name][value] = _Postings()
+                postings.add(time_key, position)
+
+    def get(self, tx_id: str) -> Dict | None:
+        """Return the entry logged under ``tx_id`` or ``None``."""
+
+        position = self._by_tx_id.get(tx_id)
+        return None if position is None else self.ledger.entry(position)
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self._by_tx_id
+
+    def query(
+        self,
+        producer_id: str | None = None,
+        consumer_id: str | None = None,
+        station_id: str | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+    ) -> Iterator[Dict]:
+        """Yield matching entries in timestamp order.
+
+        ``since`` is inclusive and ``until`` exclusive. When several keys are
+        given, the shortest postings list drives the scan and the remaining
+        keys are checked per entry.
+        """
+
+        filters = {"producer_id": producer_id, "consumer_id": consumer_id, "ev_station_id": station_id}
+        candidates: List[Tuple[int, str, _Postings]] = []
+        for name, value in filters.items():
+            if value is not None:
+                postings = self._postings[name].get(value)
+                if postings is None:
+                    return iter(())
+                candidates.append((len(postings), name, postings))
+        postings = min(candidates, key=lambda item: item[0])[2] if candidates else self._all
+        remaining = [(name, filters[name]) for _, name, other in candidates if other is not postings]
+
+        low, high = postings.between(
+            None if since is None else _time_key(since),
+            None if until is None else _time_key(until),
+        )
+        return self._iter_matches(postings.positions[low:high], remaining)
+
+    def _iter_matches(self, positions, remaining) -> Iterator[Dict]:
+        for position in positions:
+            entry = self.ledger.entry(position)
+            if all(entry.get(name) == value for name, value in remaining):
+                yield entry
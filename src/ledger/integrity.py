@@ -0,0 +1,284 @@
+"""Hash chaining, Merkle block receipts, and incremental verification.
+
+Every ledger entry is hashed from its canonical JSON form and folded into a
+running chain hash. Entries are grouped into fixed-size blocks; when a block
+fills, a :class:`BlockHeader` records its Merkle root, the chain hash at its
+last entry, and a block hash linking it to the previous header. Inclusion
+proofs are Merkle paths to a block root (or, for the still-open block, to
+the root over the leaves appended so far).
+
+:class:`HashChain` only keeps headers plus the leaves of the open block in
+memory; proofs for sealed blocks re-read that block from the ledger. With a
+``header_path`` the headers are persisted, so reattaching to a durable ledger
+replays only the entries after the last sealed block. Headers are fsynced one
+by one while the ledger is fsynced in groups, so the ledger is synced before
+each header is written. A crash therefore never leaves a header covering
+entries the ledger lost.
+:class:`LedgerVerifier` re-derives blocks from ledger entries and compares
+them to the headers, starting from a :class:`Checkpoint` so an audit only
+rehashes blocks sealed since the previous one.
+"""
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from .adapter import LedgerAdapter
+from .segment_log import SegmentLog
+
+GENESIS_HASH = "0" * 64
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+
+class IntegrityError(ValueError):
+    """Raised when ledger contents do not match their recorded hashes."""
+
+
+_CANONICAL = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str, check_circular=False)
+
+
+def entry_digest(entry: Dict) -> bytes:
+    return hashlib.sha256(_CANONICAL.encode(entry).encode("utf-8")).digest()
+
+
+def _chain(previous: bytes, digest: bytes) -> bytes:
+    return hashlib.sha256(previous + digest).digest()
+
+
+def _leaf(digest: bytes) -> bytes:
+    return hashlib.sha256(_LEAF_PREFIX + digest).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def merkle_levels(digests: List[bytes]) -> List[List[bytes]]:
+    """Return every tree level, leaves first; odd nodes are promoted unchanged."""
+
+    level = [_leaf(digest) for digest in digests]
+    levels = [level]
+    while len(level) > 1:
+        level = [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+
+def merkle_root(digests: List[bytes]) -> bytes:
+    return merkle_levels(digests)[-1][0] if digests else bytes(32)
+
+
+@dataclass
+class BlockHeader:
+    index: int
+    first_position: int
+    size: int
+    merkle_root: str
+    chain_hash: str
+    previous_block_hash: str
+    block_hash: str
+
+
+@dataclass
+class MerkleProof:
+    """Proof that the entry at ``position`` is leaf ``leaf_index`` of a block root.
+
+    ``sealed`` is false when the block was still open; ``root`` then covers
+    the first ``leaf_count`` leaves of the block.
+    """
+
+    position: int
+    block_index: int
+    leaf_index: int
+    leaf_count: int
+    entry_hash: str
+    siblings: List[Tuple[str, bool]]
+    root: str
+    sealed: bool
+
+    def verify(self, entry: Dict) -> bool:
+        """Check that ``entry`` hashes up to ``root`` along the proof path."""
+
+        if entry_digest(entry).hex() != self.entry_hash:
+            return False
+        current = _leaf(bytes.fromhex(self.entry_hash))
+        for sibling, sibling_is_left in self.siblings:
+            sibling = bytes.fromhex(sibling)
+            current = _node(sibling, current) if sibling_is_left else _node(current, sibling)
+        return current.hex() == self.root
+
+
+@dataclass
+class Checkpoint:
+    """Verification progress: every block below ``next_block`` has been checked."""
+
+    next_block: int = 0
+    block_hash: str = GENESIS_HASH
+    chain_hash: str = GENESIS_HASH
+
+
+def _block_hash(previous_block_hash: str, root: bytes, chain_hash: bytes) -> str:
+    return hashlib.sha256(bytes.fromhex(previous_block_hash) + root + chain_hash).hexdigest()
+
+
+class HashChain:
+    """Maintains chain hashes and Merkle block headers for a ledger."""
+
+    def __init__(self, block_size: int = 1024, header_path: str | os.PathLike | None = None):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
+        self.headers: List[BlockHeader] = []
+        self.ledger: LedgerAdapter | None = None
+        self._header_log = SegmentLog(header_path, fsync_every=1) if header_path is not None else None
+        if self._header_log is not None:
+            self.headers = [BlockHeader(**json.loads(record)) for _, record in self._header_log.iter_records()]
+            if any(header.size != block_size for header in self.headers):
+                raise ValueError("stored block headers use a different block_size")
+        self._open_digests: List[bytes] = []
+        self._chain_hash = bytes.fromhex(self.headers[-1].chain_hash) if self.headers else bytes.fromhex(GENESIS_HASH)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.headers) * self.block_size + len(self._open_digests)
+
+    @property
+    def head(self) -> str:
+        """Chain hash after the most recent entry."""
+
+        return self._chain_hash.hex()
+
+    def attach(self, ledger: LedgerAdapter) -> "HashChain":
+        """Hash entries not yet covered by a header, then follow new appends."""
+
+        if self.entry_count > ledger.entry_count:
+            raise IntegrityError("block headers cover more entries than the ledger holds")
+        self.ledger = ledger
+        for position, entry in enumerate(ledger.iter_entries(self.entry_count), start=self.entry_count):
+            self.record(position, entry)
+        ledger.add_listener(self.record)
+        return self
+
+    def record(self, position: int, entry: Dict) -> None:
+        if position != self.entry_count:
+            raise IntegrityError(f"expected entry {self.entry_count}, got {position}")
+        digest = entry_digest(entry)
+        self._chain_hash = _chain(self._chain_hash, digest)
+        self._open_digests.append(digest)
+        if len(self._open_digests) == self.block_size:
+            self._seal()
+
+    def proof(self, position: int) -> MerkleProof:
+        """Build an inclusion proof for the entry at ``position``."""
+
+        if not 0 <= position < self.entry_count:
+            raise IndexError(f"entry {position} is not in the chain")
+        block_index, leaf_index = divmod(position, self.block_size)
+        sealed = block_index < len(self.headers)
+        if sealed:
+            digests = self._block_digests(block_index)
+        else:
+            digests = list(self._open_digests)
+        levels = merkle_levels(digests)
+        siblings = []
+        index = leaf_index
+        for level in levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                siblings.append((level[sibling].hex(), sibling < index))
+            index //= 2
+        root = levels[-1][0].hex()
+        if sealed and root != self.headers[block_index].merkle_root:
+            raise IntegrityError(f"block {block_index} no longer matches its header")
+        return MerkleProof(
+            position=position,
+            block_index=block_index,
+            leaf_index=leaf_index,
+            leaf_count=len(digests),
+            entry_hash=digests[leaf_index].hex(),
+            siblings=siblings,
+            root=root,
+            sealed=sealed,
+        )
+
+    def close(self) -> None:
+        if self._header_log is not None:
+            self._header_log.close()
+
+    def _block_digests(self, block_index: int) -> List[bytes]:
+        if self.ledger is None:
+            raise ValueError("HashChain is not attached to a ledger")
+        first = block_index * self.block_size
+        digests = []
+        for entry in self.ledger.iter_entries(first):
+            digests.append(entry_digest(entry))
+            if len(digests) == self.block_size:
+                break
+        return digests
+
+    def _seal(self) -> None:
+        previous = self.headers[-1].block_hash if self.headers else GENESIS_HASH
+        root = merkle_root(self._open_digests)
+        header = BlockHeader(
+            index=len(self.headers),
+            first_position=len(self.headers) * self.block_size,
+            size=len(self._open_digests),
+            merkle_root=root.hex(),
+            chain_hash=self._chain_hash.hex(),
+            previous_block_hash=previous,
+            block_hash=_block_hash(previous, root, self._chain_hash),
+        )
+        self.headers.append(header)
+        self._open_digests = []
+        if self._header_log is not None:
+            if self.ledger is not None:
+                self.ledger.sync()
+            self._header_log.append(json.dumps(asdict(header)).encode("utf-8"))
+
+
+class LedgerVerifier:
+    """Incrementally re-derives block headers from ledger entries."""
+
+    def __init__(self, ledger: LedgerAdapter, headers: Iterable[BlockHeader]):
+        self.ledger = ledger
+        self.headers = list(headers)
+
+    def verify(self, checkpoint: Checkpoint | None = None) -> Checkpoint:
+        """Verify blocks sealed since ``checkpoint`` and return the new checkpoint.
+
+        Raises :class:`IntegrityError` naming the first block that fails.
+        """
+
+        checkpoint = checkpoint or Checkpoint()
+        if checkpoint.next_block >= len(self.headers):
+            return checkpoint
+        previous_block_hash = checkpoint.block_hash
+        chain_hash = bytes.fromhex(checkpoint.chain_hash)
+        header_index = checkpoint.next_block
+        header = self.headers[header_index]
+        digests: List[bytes] = []
+        for entry in self.ledger.iter_entries(header.first_position):
+            digest = entry_digest(entry)
+            chain_hash = _chain(chain_hash, digest)
+            digests.append(digest)
+            if len(digests) < header.size:
+                continue
+
+            root = merkle_root(digests)
+            if (
+                header.previous_block_hash != previous_block_hash
+                or header.merkle_root != root.hex()
+                or header.chain_hash != chain_hash.hex()
+                or header.block_hash != _block_hash(previous_block_hash, root, chain_hash)
+            ):
+                raise IntegrityError(f"block {header.index} failed verification")
+            previous_block_hash = header.block_hash
+            checkpoint = Checkpoint(header_index + 1, header.block_hash, header.chain_hash)
+            header_index += 1
+            if header_index == len(self.headers):
+                return checkpoint
+            header = self.headers[header_index]
+            digests = []
+        raise IntegrityError(f"ledger ends before block {header.index} is complete")
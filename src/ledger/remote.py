@@ -0,0 +1,399 @@
+"""Pipelined replication of ledger appends to a remote ledger node.
+
+:class:`RemoteLedgerAdapter` is a drop-in :class:`LedgerAdapter`. Appends
+land in the local in-memory ledger straight away, so positions, listeners,
+indexes and the hash chain behave as before. Each entry is also queued for
+the remote node. A pool of ``pool_size`` worker threads, each owning one
+:class:`LedgerConnection`, drains the queue in batches of up to
+``max_batch`` entries. Several batches are therefore in flight at once, and
+throughput is bounded by ``pool_size * max_batch / round_trip`` instead of
+one entry per round trip.
+
+:meth:`RemoteLedgerAdapter.submit` returns a :class:`~concurrent.futures.Future`
+that resolves to the entry's position on the remote node. Failed batches are
+retried up to ``retries`` times with exponential backoff. Entries are keyed
+by ``tx_id`` (``settlement_id`` for settlement batches, ``reservation_id``
+plus the per-reservation ``sequence`` for reservation changes): the node stores
+each key once, so a retry after a lost acknowledgement cannot duplicate an
+entry. Both sides remember a digest of the payload stored under each key and
+raise :class:`LedgerConflict` when a different payload reuses it, rather
+than acknowledging it as a replay. Resubmitting or re-appending a key that is
+in flight, acknowledged or failed never appends it locally again.
+
+:meth:`RemoteLedgerAdapter.flush` waits for every outstanding
+acknowledgement and raises :class:`LedgerSubmissionError` while entries that
+exhausted their retries remain. :meth:`RemoteLedgerAdapter.retry_failed`
+sends those again (they are already in the local ledger).
+
+:class:`LocalLedgerNode` is an in-process stand-in for a chaincode endpoint.
+It has configurable round-trip latency, jitter and injected failures, so
+pipelining and retry behaviour can be tested offline.
+"""
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Dict, Iterable, List, Protocol, Tuple
+
+from .adapter import LedgerAdapter
+from .integrity import entry_digest
+
+_STOP = object()
+
+
+class LedgerUnavailable(ConnectionError):
+    """A transient remote failure; the batch may or may not have been committed."""
+
+
+class LedgerConflict(ValueError):
+    """A key was reused for a payload that differs from the one stored under it."""
+
+    def __init__(self, keys: List[str]):
+        super().__init__(f"ledger keys reused with a different payload: {', '.join(keys)}")
+        self.keys = keys
+
+
+class LedgerSubmissionError(RuntimeError):
+    """Raised by :meth:`RemoteLedgerAdapter.flush` when entries were not acknowledged.
+
+    ``failed`` lists keys that exhausted their retries (see
+    :meth:`RemoteLedgerAdapter.retry_failed`); ``conflicts`` lists keys the
+    node refused because it holds a different payload for them.
+    """
+
+    def __init__(self, failed: List[str | None], conflicts: List[str] | None = None):
+        conflicts = conflicts or []
+        super().__init__(
+            f"{len(failed) + len(conflicts)} ledger entries were not acknowledged by the remote node"
+        )
+        self.failed = failed
+        self.conflicts = conflicts
+
+
+class LedgerConnection(Protocol):
+    def submit(self, entries: List[Dict]) -> List[int]:
+        """Commit ``entries`` and return their remote positions (idempotent per key).
+
+        Raises :class:`LedgerConflict`, committing nothing, if a key is already
+        stored with a different payload.
+        """
+
+    def close(self) -> None:
+        ...
+
+
+class LedgerNode(Protocol):
+    def connect(self) -> LedgerConnection:
+        ...
+
+
+def idempotency_key(entry: Dict) -> str | None:
+    if entry.get("entry_type") == "reservation" and "sequence" in entry:
+        return f"reservation:{entry.get('reservation_id')}:{entry['sequence']}"
+    return entry.get("tx_id") or entry.get("settlement_id")
+
+
+# Stand-in node --------------------------------------------------------------
+
+
+class LocalLedgerNode:
+    """In-process ledger node with simulated network latency and failures.
+
+    Each :meth:`LedgerConnection.submit` call sleeps ``latency`` seconds (plus
+    up to ``jitter``) outside any lock, so concurrent connections overlap the
+    way real round trips do. With probability ``failure_rate`` a call raises
+    :class:`LedgerUnavailable`, half the time before committing and half
+    after (a lost acknowledgement).
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.entries: List[Dict] = []
+        self.calls = 0
+        self._positions: Dict[str, int] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def connect(self) -> "_LocalConnection":
+        return _LocalConnection(self)
+
+    def commit(self, entries: List[Dict]) -> List[int]:
+        with self._lock:
+            digests: Dict[str, bytes] = {}
+            conflicts = []
+            for entry in entries:
+                key = idempotency_key(entry)
+                if key is None:
+                    continue
+                digest = entry_digest(entry)
+                known = digests.setdefault(key, self._digests.get(key, digest))
+                if known != digest:
+                    conflicts.append(key)
+            if conflicts:
+                raise LedgerConflict(conflicts)
+            positions = []
+            for entry in entries:
+                key = idempotency_key(entry)
+                position = self._positions.get(key) if key is not None else None
+                if position is None:
+                    position = len(self.entries)
+                    self.entries.append(entry)
+                    if key is not None:
+                        self._positions[key] = position
+                        self._digests[key] = digests[key]
+                positions.append(position)
+            return positions
+
+    def _roll(self) -> Tuple[float, str | None]:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                return delay, self._random.choice(("before", "after"))
+            return delay, None
+
+
+class _LocalConnection:
+    def __init__(self, node: LocalLedgerNode) -> None:
+        self.node = node
+
+    def submit(self, entries: List[Dict]) -> List[int]:
+        delay, failure = self.node._roll()
+        if delay:
+            time.sleep(delay / 2)
+        if failure == "before":
+            raise LedgerUnavailable("request lost")
+        positions = self.node.commit(entries)
+        if delay:
+            time.sleep(delay / 2)
+        if failure == "after":
+            raise LedgerUnavailable("acknowledgement lost")
+        return positions
+
+    def close(self) -> None:
+        pass
+
+
+# Adapter ---------------------------------------------------------------------
+
+
+class RemoteLedgerAdapter(LedgerAdapter):
+    """Local ledger whose appends are replicated to ``node`` through a connection pool.
+
+    A digest and, once acknowledged, the remote position of every keyed entry
+    are kept in memory (about 100 bytes per key).
+    """
+
+    def __init__(
+        self,
+        node: LedgerNode,
+        pool_size: int = 4,
+        max_batch: int = 256,
+        max_pending: int = 100_000,
+        retries: int = 3,
+        backoff: float = 0.05,
+    ) -> None:
+        super().__init__()
+        self.node = node
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff = backoff
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._in_flight: Dict[str, Future] = {}
+        self._outstanding: set = set()
+        self._digests: Dict[str, bytes] = {}
+        self._acknowledged: Dict[str, int] = {}
+        self._failed: List[Tuple[str | None, Dict]] = []
+        self._conflicts: List[str] = []
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, args=(node.connect(),), name=f"ledger-sender-{index}", daemon=True)
+            for index in range(pool_size)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def append_entry(self, entry: Dict) -> None:
+        self.submit(entry)
+
+    def append_entries(self, entries: Iterable[Dict]) -> None:
+        entries = list(entries)
+        self._check(entries)
+        fresh, seen = [], set()
+        for entry in entries:
+            key = idempotency_key(entry)
+            if key is None:
+                fresh.append(entry)
+            elif key not in seen:
+                seen.add(key)
+                if self._replay(key) is None:
+                    fresh.append(entry)
+        first = self.entry_count
+        super().append_entries(fresh)
+        for position in range(first, self.entry_count):
+            self._enqueue(self._entries[position])
+
+    def submit(self, entry: Dict) -> Future:
+        """Append ``entry`` and return a future for its remote position.
+
+        A key that is in flight, acknowledged, or failed is not appended
+        locally again: its existing future, a resolved one, or a fresh send of
+        the stored entry is returned instead.
+        """
+
+        key = idempotency_key(entry)
+        if key is not None:
+            self._check([entry])
+            known = self._replay(key)
+            if known is not None:
+                return known
+        super().append_entry(entry)
+        return self._enqueue(entry)
+
+    def retry_failed(self) -> List[Future]:
+        """Send again every entry that exhausted its retries; they are not re-appended locally."""
+
+        with self._lock:
+            failed, self._failed = self._failed, []
+        return [self._enqueue(entry) for _, entry in failed]
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait for outstanding acknowledgements; raise if any entry was not acknowledged.
+
+        Failed entries stay recorded until :meth:`retry_failed`; conflicts
+        are reported once.
+        """
+
+        with self._lock:
+            pending = list(self._outstanding)
+        wait(pending, timeout=timeout)
+        with self._lock:
+            failed = [key for key, _ in self._failed]
+            conflicts, self._conflicts = self._conflicts, []
+        if failed or conflicts:
+            raise LedgerSubmissionError(failed, conflicts)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._outstanding)
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            for _ in self._workers:
+                self._queue.put(_STOP)
+            for worker in self._workers:
+                worker.join()
+
+    def _check(self, entries: List[Dict]) -> None:
+        """Raise :class:`LedgerConflict` before anything is appended if a key is reused."""
+
+        digests: Dict[str, bytes] = {}
+        conflicts = []
+        with self._lock:
+            for entry in entries:
+                key = idempotency_key(entry)
+                if key is None:
+                    continue
+                digest = entry_digest(entry)
+                known = digests.setdefault(key, self._digests.get(key, digest))
+                if known != digest:
+                    conflicts.append(key)
+            if conflicts:
+                raise LedgerConflict(conflicts)
+            self._digests.update(digests)
+
+    def _replay(self, key: str) -> Future | None:
+        """Return the future of a key already handed to the adapter, or ``None`` if it is new."""
+
+        with self._lock:
+            existing = self._in_flight.get(key)
+            position = self._acknowledged.get(key)
+            failed = next((index for index, (other, _) in enumerate(self._failed) if other == key), None)
+            entry = self._failed.pop(failed)[1] if existing is None and failed is not None else None
+        if existing is not None:
+            return existing
+        if position is not None:
+            done: Future = Future()
+            done.set_result(position)
+            return done
+        if entry is not None:
+            return self._enqueue(entry)
+        return None
+
+    def _enqueue(self, entry: Dict) -> Future:
+        key = idempotency_key(entry)
+        future: Future = Future()
+        with self._lock:
+            if key is not None:
+                existing = self._in_flight.get(key)
+                if existing is not None:
+                    return existing
+                self._in_flight[key] = future
+            self._outstanding.add(future)
+        self._queue.put((key, entry, future))
+        return future
+
+    def _work(self, connection: LedgerConnection) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self._queue.put(_STOP)
+                        break
+                    batch.append(item)
+                self._send(connection, batch)
+        finally:
+            connection.close()
+
+    def _send(self, connection: LedgerConnection, batch: List[Tuple[str | None, Dict, Future]]) -> None:
+        attempt = 0
+        while batch:
+            try:
+                positions = connection.submit([entry for _, entry, _ in batch])
+            except LedgerConflict as exc:
+                # Not transient: fail the conflicting entries and send the rest straight away.
+                conflicting = set(exc.keys)
+                self._finish([item for item in batch if item[0] in conflicting], error=exc)
+                batch = [item for item in batch if item[0] not in conflicting]
+            except Exception as exc:
+                if attempt == self.retries:
+                    self._finish(batch, error=exc)
+                    return
+                time.sleep(self.backoff * (2**attempt))
+                attempt += 1
+            else:
+                self._finish(batch, positions=positions)
+                return
+
+    def _finish(self, batch, positions: List[int] | None = None, error: Exception | None = None) -> None:
+        for index, (_, _, future) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(positions[index])
+        with self._lock:
+            for index, (key, entry, future) in enumerate(batch):
+                if key is not None:
+                    self._in_flight.pop(key, None)
+                self._outstanding.discard(future)
+                if isinstance(error, LedgerConflict):
+                    self._conflicts.append(key)
+                elif error is not None:
+                    self._failed.append((key, entry))
+                elif key is not None:
+                    self._acknowledged[key] = positions[index]
@@ -0,0 +1,251 @@
+"""Append-only segmented record log with memory-mapped reads.
+
+Records are stored as ``<length:u32><crc32:u32><payload>`` frames in segment
+files named after the sequence number of their first record
+(``00000000000000000000.seg``). A segment is sealed once it reaches
+``segment_bytes`` and a new one is started. Writes go through a buffered
+file handle and are fsynced in groups, so one ``fsync`` covers many appends.
+A group is synced once it holds ``fsync_every`` records or once
+``fsync_interval`` seconds have passed since the previous sync, whichever
+comes first. The interval is also enforced when appends stop: a daemon
+flusher thread, started on the first deferred sync, syncs whatever is still
+pending when the interval runs out. A lock serialises it with appends.
+
+On open the log scans frame headers to rebuild its position index and
+truncates a torn or corrupt tail left by a crash. Reads map segments with
+:mod:`mmap`, so iterating or seeking never loads the whole log into memory.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+_HEADER = struct.Struct("<II")
+_SUFFIX = ".seg"
+
+
+class CorruptRecordError(ValueError):
+    """Raised when a frame fails its checksum outside the recoverable tail."""
+
+
+class SegmentLog:
+    """Durable append-only log of opaque byte records."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync_every: int = 256,
+        fsync_interval: float = 0.05,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        # Sequence number -> (segment index, byte position) lookup arrays.
+        self._segment_of = array("I")
+        self._position_of = array("Q")
+        self._segments: List[Tuple[int, Path]] = []
+        self._maps: dict = {}
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._writer = None
+        self._lock = threading.RLock()
+        self._due = threading.Condition(self._lock)
+        self._flusher: threading.Thread | None = None
+        self._closed = False
+        self._recover()
+
+    # Writing -------------------------------------------------------------
+
+    def append(self, record: bytes) -> int:
+        """Append one record and return its sequence number."""
+
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Iterable[bytes]) -> List[int]:
+        """Append records with one buffered write and at most one fsync."""
+
+        with self._lock:
+            sequence_numbers = []
+            chunk = bytearray()
+            for record in records:
+                frame_size = _HEADER.size + len(record)
+                if self._active_size + len(chunk) + frame_size > self.segment_bytes and self._active_size + len(chunk) > 0:
+                    self._write(chunk)
+                    chunk = bytearray()
+                    self._roll_segment()
+                self._segment_of.append(len(self._segments) - 1)
+                self._position_of.append(self._active_size + len(chunk))
+                chunk += _HEADER.pack(len(record), zlib.crc32(record))
+                chunk += record
+                sequence_numbers.append(len(self._position_of) - 1)
+            self._write(chunk)
+            self._unsynced += len(sequence_numbers)
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+            elif self._unsynced:
+                self._schedule_flush()
+            return sequence_numbers
+
+    def sync(self) -> None:
+        """Flush buffered writes and fsync the active segment."""
+
+        with self._lock:
+            if self._writer is None:
+                return
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self.sync()
+            self._closed = True
+            self._due.notify()
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.join()
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped[1].close()
+            self._maps.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    # Reading -------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._position_of)
+
+    def read(self, sequence: int) -> bytes:
+        """Return the record with the given sequence number."""
+
+        if not 0 <= sequence < len(self._position_of):
+            raise IndexError(f"record {sequence} is out of range")
+        view = self._map(self._segment_of[sequence])
+        position = self._position_of[sequence]
+        length, _ = _HEADER.unpack_from(view, position)
+        start = position + _HEADER.size
+        return view[start : start + length]
+
+    def iter_records(self, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """Yield ``(sequence, record)`` pairs from ``start`` onwards."""
+
+        sequence = max(start, 0)
+        while sequence < len(self._position_of):
+            segment = self._segment_of[sequence]
+            view = self._map(segment)
+            position = self._position_of[sequence]
+            end = len(view)
+            while position < end and sequence < len(self._position_of) and self._segment_of[sequence] == segment:
+                length, _ = _HEADER.unpack_from(view, position)
+                start_byte = position + _HEADER.size
+                yield sequence, view[start_byte : start_byte + length]
+                position = start_byte + length
+                sequence += 1
+
+    # Internals -----------------------------------------------------------
+
+    @property
+    def _active_size(self) -> int:
+        return self._writer.tell() if self._writer is not None else 0
+
+    def _schedule_flush(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="segment-log-flusher", daemon=True)
+            self._flusher.start()
+        else:
+            self._due.notify()
+
+    def _flush_loop(self) -> None:
+        """Sync pending records once ``fsync_interval`` has passed without a sync."""
+
+        with self._lock:
+            while not self._closed:
+                if not self._unsynced:
+                    self._due.wait()
+                    continue
+                remaining = self._last_sync + self.fsync_interval - time.monotonic()
+                if remaining > 0:
+                    self._due.wait(remaining)
+                    continue
+                self.sync()
+
+    def _write(self, chunk: bytearray) -> None:
+        if chunk:
+            self._writer.write(chunk)
+
+    def _roll_segment(self) -> None:
+        if self._writer is not None:
+            self.sync()
+            self._writer.close()
+            # Only the active segment is re-checked for growth in _map, so a map
+            # taken while the sealed segment was still active must not be reused.
+            self._maps.pop(len(self._segments) - 1, None)
+        base = len(self._position_of)
+        path = self.directory / f"{base:020d}{_SUFFIX}"
+        self._segments.append((base, path))
+        self._writer = open(path, "ab")
+
+    def _map(self, segment: int) -> bytes:
+        """Return a read-only view of a segment, remapping if it has grown."""
+
+        _, path = self._segments[segment]
+        if segment == len(self._segments) - 1:
+            with self._lock:
+                if self._writer is not None:
+                    self._writer.flush()
+        size = path.stat().st_size if segment == len(self._segments) - 1 else None
+        cached = self._maps.get(segment)
+        if cached is not None and (size is None or cached[0] == size):
+            return cached[1]
+        # A superseded map may still back a running iterator, so it is left for
+        # garbage collection instead of being closed here.
+        with open(path, "rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment] = (len(mapped), mapped)
+        return mapped
+
+    def _recover(self) -> None:
+        paths = sorted(self.directory.glob(f"*{_SUFFIX}"))
+        for path in paths:
+            base = int(path.stem)
+            if base != len(self._position_of):
+                raise CorruptRecordError(f"segment {path.name} does not follow record {len(self._position_of) - 1}")
+            self._segments.append((base, path))
+            valid_end = self._scan(len(self._segments) - 1, path, is_last=path == paths[-1])
+            if valid_end < path.stat().st_size:
+                with open(path, "r+b") as handle:
+                    handle.truncate(valid_end)
+        if self._segments:
+            self._writer = open(self._segments[-1][1], "ab")
+        else:
+            self._roll_segment()
+
+    def _scan(self, segment: int, path: Path, is_last: bool) -> int:
+        size = path.stat().st_size
+        if size == 0:
+            return 0
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            position = 0
+            while position + _HEADER.size <= size:
+                length, checksum = _HEADER.unpack_from(view, position)
+                end = position + _HEADER.size + length
+                if end > size or zlib.crc32(view[position + _HEADER.size : end]) != checksum:
+                    break
+                self._segment_of.append(segment)
+                self._position_of.append(position)
+                position = end
+        if position != size and not is_last:
+            raise CorruptRecordError(f"segment {path.name} is corrupt at byte {position}")
+        return position
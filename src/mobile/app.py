@@ -4,15 +4,21 @@ The app connects registration, routing, and ledger logging to demonstrate
 how the Virtual Clean Power Network (VCPN) moves clean energy to EV
 charging stations.
 """
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from src.backend.config import InterconnectConfig, OHIO_INTERCONNECT
+from src.backend.producer_locator import ProducerLocator, ProducerMatch
 from src.backend.registration import Participant, Registry
 from src.backend.routing import Router
+from src.backend.scheduling import MOVED, RESERVATION, CapacityError, CapacityScheduler, Reservation
+from src.backend.settlement import SettlementEngine
+from src.backend.snapshots import Snapshotter, SnapshotStore
 from src.backend.transactions import EnergyTransaction, TransactionLogger
 from src.ledger.adapter import LedgerAdapter
+from src.ledger.index import LedgerIndex
 
 
 @dataclass
@@ -26,15 +32,49 @@ class EVChargeRequest:
     priority: str = "standard"
 
 
+@dataclass
+class EVChargeOrder:
+    """One entry of a batch submitted to :meth:`P2PConnectApp.request_ev_energy_batch`."""
+
+    tx_id: str
+    request: EVChargeRequest
+    producer_id: str
+    consumer_id: str
+    energy_source: str = "solar"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch submission: logged payloads plus rejected orders."""
+
+    payloads: List[Dict] = field(default_factory=list)
+    rejected: List[Tuple[str, str]] = field(default_factory=list)
+
+
 class P2PConnectApp:
     """Coordinates the Virtual Clean Power Network for mobile clients."""
 
-    def __init__(self, interconnect: InterconnectConfig | None = None):
+    def __init__(
+        self,
+        interconnect: InterconnectConfig | None = None,
+        ledger: LedgerAdapter | None = None,
+        enforce_capacity: bool = False,
+        registry: Registry | None = None,
+    ):
         self.interconnect = interconnect or OHIO_INTERCONNECT
-        self.ledger = LedgerAdapter()
-        self.registry = Registry(self.interconnect)
+        self.ledger = ledger if ledger is not None else LedgerAdapter()
+        self.registry = registry if registry is not None else Registry(self.interconnect)
         self.transactions = TransactionLogger(self.interconnect, self.ledger)
         self.router = Router(self.interconnect)
+        self.scheduler = CapacityScheduler(self.registry) if enforce_capacity else None
+        if self.scheduler is not None:
+            self.scheduler.add_listener(self._reservation_changed)
+        self._unlogged: Dict[str, Dict] | None = None
+        self._deferred: List[Dict] | None = None
+        self._reservation_changes: Dict[str, int] = {}
+        self._ledger_index: LedgerIndex | None = None
+        self._producer_locator: ProducerLocator | None = None
+        self._settlements: Dict[str, SettlementEngine] = {}
 
     def register_user(
         self,
@@ -71,7 +111,156 @@ class P2PConnectApp:
 
         producer = self.registry.get(producer_id)
         consumer = self.registry.get(consumer_id)
-        route = self.connect_route(producer_id, consumer_id)
+        route = self.router.compute_route(producer, consumer)
+        transaction, metadata = self._charge_transaction(tx_id, request, producer, consumer, energy_source)
+        if self.scheduler is None:
+            return self.transactions.log_transaction(
+                transaction, producer, consumer, route=route, additional_metadata=metadata
+            )
+        with self._deferring_reservation_changes():
+            self._reserve(tx_id, request, producer_id, consumer_id, metadata)
+            try:
+                return self.transactions.log_transaction(
+                    transaction, producer, consumer, route=route, additional_metadata=metadata
+                )
+            except Exception:
+                self.scheduler.release(tx_id)
+                raise
+
+    def request_ev_energy_batch(self, orders: Iterable[EVChargeOrder]) -> BatchResult:
+        """Route and log many EV charging transactions at once.
+
+        Participants are fetched with one ``get_many`` call and routes once per distinct
+        :meth:`Router.route_key`. Orders with unknown participants, duplicate
+        ``tx_id`` values, no feasible route, or (when capacity is enforced) no
+        free capacity are rejected with a reason; the rest are committed to the
+        ledger in a single batched append.
+        """
+
+        if self.scheduler is None:
+            return self._request_batch(orders)
+        with self._deferring_reservation_changes():
+            return self._request_batch(orders)
+
+    def _request_batch(self, orders: Iterable[EVChargeOrder]) -> BatchResult:
+        result = BatchResult()
+        orders = list(orders)
+        participants = self.registry.get_many(
+            {order.producer_id for order in orders} | {order.consumer_id for order in orders}
+        )
+        routes: Dict[Tuple, List[str] | str] = {}
+        seen_tx_ids = set()
+        records = []
+
+        for order in orders:
+            if order.tx_id in seen_tx_ids:
+                result.rejected.append((order.tx_id, "duplicate tx_id in batch"))
+                continue
+            producer = participants.get(order.producer_id)
+            consumer = participants.get(order.consumer_id)
+            if producer is None or consumer is None:
+                missing = order.producer_id if producer is None else order.consumer_id
+                result.rejected.append((order.tx_id, f"Participant {missing} is not registered"))
+                continue
+
+            key = self.router.route_key(producer, consumer)
+            route = routes.get(key)
+            if route is None:
+                try:
+                    route = self.router.compute_route(producer, consumer)
+                except ValueError as exc:
+                    route = str(exc)
+                routes[key] = route
+            if isinstance(route, str):
+                result.rejected.append((order.tx_id, route))
+                continue
+
+            transaction, metadata = self._charge_transaction(
+                order.tx_id, order.request, producer, consumer, order.energy_source
+            )
+            if self.scheduler is not None:
+                try:
+                    self._reserve(order.tx_id, order.request, order.producer_id, order.consumer_id, metadata)
+                except CapacityError as exc:
+                    result.rejected.append((order.tx_id, str(exc)))
+                    continue
+            seen_tx_ids.add(order.tx_id)
+            # Each payload gets its own list: listeners and callers may edit one payload's route.
+            records.append((transaction, producer, consumer, list(route), metadata))
+
+        try:
+            result.payloads = self.transactions.log_transactions(records)
+        except Exception:
+            if self.scheduler is not None:
+                for transaction, *_ in records:
+                    self.scheduler.release(transaction.tx_id)
+            raise
+        return result
+
+    def _reserve(self, tx_id: str, request: EVChargeRequest, producer_id: str, consumer_id: str, metadata: Dict) -> None:
+        reservation = self.scheduler.reserve(tx_id, request, producer_id, consumer_id)
+        self._stamp_reservation(metadata, reservation)
+        if self._unlogged is not None:
+            self._unlogged[tx_id] = metadata
+
+    def _stamp_reservation(self, fields: Dict, reservation: Reservation) -> None:
+        fields["reserved_from"] = self.scheduler.slot_start(reservation.start_slot).isoformat()
+        fields["reserved_until"] = self.scheduler.slot_start(reservation.end_slot).isoformat()
+        fields["reserved_kw"] = reservation.power_kw
+
+    @contextmanager
+    def _deferring_reservation_changes(self):
+        """Hold reservation changes made while a request is cleared until its trades are logged.
+
+        Trades reserved but not yet logged get their ``reserved_*`` metadata
+        updated in place; every other change is appended after the trades.
+        """
+
+        self._unlogged, self._deferred = {}, []
+        try:
+            yield
+        finally:
+            deferred = self._deferred
+            self._unlogged = self._deferred = None
+            if deferred:
+                self.ledger.append_entries(deferred)
+
+    def _reservation_changed(self, action: str, reservation: Reservation, previous_start: int) -> None:
+        """Record a moved or dropped reservation on the ledger."""
+
+        metadata = None if self._unlogged is None else self._unlogged.get(reservation.reservation_id)
+        if metadata is not None and action == MOVED:
+            self._stamp_reservation(metadata, reservation)
+            return
+        entry = {
+            "entry_type": RESERVATION,
+            "action": action,
+            "reservation_id": reservation.reservation_id,
+            "sequence": self._next_reservation_change(reservation.reservation_id),
+            "previous_from": self.scheduler.slot_start(previous_start).isoformat(),
+        }
+        if action == MOVED:
+            self._stamp_reservation(entry, reservation)
+        if self._deferred is not None:
+            self._deferred.append(entry)
+        else:
+            self.ledger.append_entry(entry)
+
+    def _next_reservation_change(self, reservation_id: str) -> int:
+        """Number the ledger entries of one reservation so each has its own idempotency key."""
+
+        sequence = self._reservation_changes.get(reservation_id, 0) + 1
+        self._reservation_changes[reservation_id] = sequence
+        return sequence
+
+    @staticmethod
+    def _charge_transaction(
+        tx_id: str,
+        request: EVChargeRequest,
+        producer: Participant,
+        consumer: Participant,
+        energy_source: str,
+    ) -> Tuple[EnergyTransaction, Dict]:
         transaction = EnergyTransaction(
             tx_id=tx_id,
             producer_id=producer.participant_id,
@@ -87,11 +276,82 @@ class P2PConnectApp:
             "sdnc": "optimal-routing",
             "priority": request.priority,
         }
-        return self.transactions.log_transaction(
-            transaction, producer, consumer, route=route, additional_metadata=metadata
-        )
+        return transaction, metadata
 
     def ledger_snapshot(self) -> List[Dict]:
-        """Provide the current blockchain-backed transaction list."""
+        """Provide a copy of the current blockchain-backed transaction list.
+
+        Use ``ledger.entries`` for a live view that copies nothing.
+        """
+
+        return list(self.ledger.entries)
+
+    @property
+    def ledger_index(self) -> LedgerIndex:
+        """Secondary indexes over the ledger, built on first use."""
+
+        if self._ledger_index is None:
+            self._ledger_index = LedgerIndex().attach(self.ledger)
+        return self._ledger_index
+
+    def query_ledger(
+        self,
+        producer_id: str | None = None,
+        consumer_id: str | None = None,
+        station_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[Dict]:
+        """Iterate ledger entries matching the filters in timestamp order."""
+
+        return self.ledger_index.query(
+            producer_id=producer_id, consumer_id=consumer_id, station_id=station_id, since=since, until=until
+        )
+
+    @property
+    def producer_locator(self) -> ProducerLocator:
+        """Reverse-reachability producer index, built on first use."""
+
+        if self._producer_locator is None:
+            self._producer_locator = ProducerLocator(self.registry, self.router.weighted_engine)
+        return self._producer_locator
+
+    def find_producers(
+        self,
+        node: str,
+        limit: int = 5,
+        max_hops: int | None = None,
+        rank: str = "hops",
+    ) -> List[ProducerMatch]:
+        """Registered producers that can deliver to ``node``, nearest or cheapest first."""
+
+        return self.producer_locator.nearest_producers(node, limit=limit, max_hops=max_hops, rank=rank)
+
+    def settlement(self, window: str = "hourly") -> SettlementEngine:
+        """Settlement engine for ``window`` following the ledger, built on first use."""
+
+        engine = self._settlements.get(window)
+        if engine is None:
+            engine = self._settlements[window] = SettlementEngine(window).attach(self.ledger)
+        return engine
+
+    def settle(self, window: str = "hourly", until: datetime | None = None) -> List[Dict]:
+        """Append net settlement batches for every ``window`` closed by ``until``."""
+
+        return self.settlement(window).settle(until)
+
+    def enable_snapshots(self, directory: str, every: int = 10_000) -> Snapshotter:
+        """Restore registry and transaction state from ``directory``, then keep it snapshotted.
+
+        Call before registering or logging anything: the latest snapshot is
+        loaded, only the ledger entries after it are replayed (settlement
+        engines included), and from then on registrations are journaled and a snapshot is written every
+        ``every`` ledger appends.
+        """
 
-        return self.ledger.entries
+        store = SnapshotStore(directory)
+        store.recover(self.registry, self.transactions, self._settlements)
+        for engine in self._settlements.values():
+            if engine.ledger is None:
+                engine.attach(self.ledger)
+        return Snapshotter(store, self.registry, self.transactions, every=every, settlements=self._settlements)
@@ -0,0 +1,164 @@
+"""Asyncio front for :class:`~src.mobile.app.P2PConnectApp`.
+
+Many coroutines may submit charge requests at once. Submissions are queued
+and a single writer task drains the queue into micro-batches that go through
+:meth:`P2PConnectApp.request_ev_energy_batch`, so routing is shared within a
+batch and every ledger write happens from one place. Registrations take the
+same lock as the writer, which keeps ``Registry`` and ``TransactionLogger``
+mutations serialized. ``max_in_flight`` bounds outstanding submissions:
+callers wait for capacity, or get :class:`Overloaded` immediately when
+``reject_when_full`` is set.
+"""
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.backend.registration import Participant
+from src.mobile.app import EVChargeOrder, EVChargeRequest, P2PConnectApp
+
+
+class Overloaded(RuntimeError):
+    """Raised when the in-flight limit is reached and rejection is enabled."""
+
+
+class AsyncP2PConnectApp:
+    """Concurrent submission layer with a single micro-batching ledger writer."""
+
+    def __init__(
+        self,
+        app: P2PConnectApp | None = None,
+        max_batch: int = 512,
+        batch_window: float = 0.002,
+        max_in_flight: int = 10_000,
+        reject_when_full: bool = False,
+    ):
+        self.app = app or P2PConnectApp()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_in_flight = max_in_flight
+        self.reject_when_full = reject_when_full
+        self._queue: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._lock: asyncio.Lock | None = None
+        self._writer: asyncio.Task | None = None
+        self._pending_tx_ids: Set[str] = set()
+
+    async def __aenter__(self) -> "AsyncP2PConnectApp":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending_tx_ids)
+
+    async def start(self) -> None:
+        if self._writer is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._lock = asyncio.Lock()
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self) -> None:
+        """Flush queued submissions and stop the writer task."""
+
+        if self._writer is None:
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    async def register_user(
+        self,
+        participant_id: str,
+        role: str,
+        capacity_kw: float,
+        node: str,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Participant:
+        async with self._lock:
+            return self.app.register_user(participant_id, role, capacity_kw, node, metadata)
+
+    async def request_ev_energy(
+        self,
+        tx_id: str,
+        request: EVChargeRequest,
+        producer_id: str,
+        consumer_id: str,
+        energy_source: str = "solar",
+    ) -> Dict:
+        return await self.submit(EVChargeOrder(tx_id, request, producer_id, consumer_id, energy_source))
+
+    async def submit(self, order: EVChargeOrder) -> Dict:
+        """Queue an order and wait for its ledger payload.
+
+        Raises ``ValueError`` if the order is rejected by validation or
+        routing, and :class:`Overloaded` if the app is saturated and
+        ``reject_when_full`` is set.
+        """
+
+        if self._writer is None:
+            raise RuntimeError("AsyncP2PConnectApp is not started")
+        if self.reject_when_full and self._slots.locked():
+            raise Overloaded(f"{self.max_in_flight} submissions already in flight")
+        if order.tx_id in self._pending_tx_ids:
+            raise ValueError(f"Transaction {order.tx_id} is already in flight")
+        self._pending_tx_ids.add(order.tx_id)
+        try:
+            async with self._slots:
+                future = asyncio.get_running_loop().create_future()
+                await self._queue.put((order, future))
+                return await future
+        finally:
+            self._pending_tx_ids.discard(order.tx_id)
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[EVChargeOrder, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit(self, batch: List[Tuple[EVChargeOrder, asyncio.Future]]) -> None:
+        orders = [order for order, _ in batch]
+        async with self._lock:
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, self.app.request_ev_energy_batch, orders
+                )
+            except Exception as exc:  # surface unexpected failures to every waiter
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+        payloads = {payload["tx_id"]: payload for payload in result.payloads}
+        reasons = dict(result.rejected)
+        for order, future in batch:
+            if future.done():
+                continue
+            if order.tx_id in payloads:
+                future.set_result(payloads[order.tx_id])
+            else:
+                future.set_exception(ValueError(reasons.get(order.tx_id, "order was not logged")))
@@ -1,14 +1,39 @@
 """Placeholder mobile client flows for onboarding and logging."""
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, List, Protocol, Tuple
 
 from src.backend.registration import Participant, Registry
-from src.backend.transactions import EnergyTransaction, TransactionLogger
+from src.backend.sync import encode_batch
+from src.backend.transactions import EnergyTransaction, TransactionLogger, payload_encoder
+from src.mobile.offline import OfflineQueue
+
+
+class SyncEndpoint(Protocol):
+    def handshake(self, device_id: str, epoch: str) -> int:
+        """Return the server's high-water mark for the device's epoch."""
+
+    def receive(self, data: bytes) -> Dict:
+        """Apply an encoded batch and return the reply of :meth:`SyncService.receive`."""
+
+
+@dataclass
+class SyncResult:
+    """Outcome of :meth:`MobileClient.sync`."""
+
+    applied: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    bytes_sent: int = 0
+    rejected: List[Tuple[int, str, str]] = field(default_factory=list)
+    pending: int = 0
+    offline: bool = False
 
 
 class MobileClient:
-    def __init__(self, registry: Registry, transactions: TransactionLogger):
+    def __init__(self, registry: Registry, transactions: TransactionLogger, queue: OfflineQueue | None = None):
         self.registry = registry
         self.transactions = transactions
+        self.queue = queue
 
     def onboard(self, participant_data: Dict) -> Participant:
         participant = Participant(**participant_data)
@@ -27,3 +52,45 @@ class MobileClient:
         return self.transactions.log_transaction(
             transaction, producer, consumer, route=route, additional_metadata=additional_metadata
         )
+
+    def queue_transaction(self, tx_data: Dict, route: list | None = None, additional_metadata: Dict | None = None) -> int:
+        """Durably queue a transaction for the next :meth:`sync`; return its sequence number."""
+
+        if self.queue is None:
+            raise ValueError("MobileClient has no offline queue")
+        transaction = payload_encoder(EnergyTransaction)(EnergyTransaction(**tx_data))
+        transaction["timestamp"] = transaction["timestamp"].isoformat()
+        return self.queue.append(transaction, route=route, metadata=additional_metadata)
+
+    def sync(self, endpoint: SyncEndpoint, max_batch: int = 500) -> SyncResult:
+        """Upload queued transactions in compressed batches until the queue drains.
+
+        A handshake first fetches the server's mark, so items applied before a
+        lost reply are dropped without being resent. Stops early, keeping the
+        rest queued, when the endpoint raises ``ConnectionError``.
+        """
+
+        if self.queue is None:
+            raise ValueError("MobileClient has no offline queue")
+        result = SyncResult()
+        try:
+            self.queue.ack(endpoint.handshake(self.queue.device_id, self.queue.epoch))
+            while self.queue.pending:
+                items = self.queue.peek(max_batch)
+                data = encode_batch(self.queue.device_id, self.queue.epoch, items)
+                reply = endpoint.receive(data)
+                self._apply_reply(result, items, data, reply)
+        except ConnectionError:
+            result.offline = True
+        result.pending = self.queue.pending
+        return result
+
+    def _apply_reply(self, result: SyncResult, items: List[Dict], data: bytes, reply: Dict) -> None:
+        if reply["high_water_mark"] < items[-1]["seq"]:
+            raise ValueError(f"Server acknowledged up to {reply['high_water_mark']}, sent {items[-1]['seq']}")
+        self.queue.ack(reply["high_water_mark"])
+        result.batches += 1
+        result.bytes_sent += len(data)
+        result.applied += reply["applied"]
+        result.duplicates += reply["duplicates"]
+        result.rejected.extend(tuple(row) for row in reply["rejected"])
@@ -0,0 +1,149 @@
+"""Durable on-device queue of transactions waiting to be synced.
+
+:class:`OfflineQueue` appends each submission, with the next per-device
+sequence number, to ``queue.jsonl`` in its directory. The line is fsynced
+before the call returns, so queued trades survive the app being killed.
+:meth:`MobileClient.sync <src.mobile.client.MobileClient.sync>` uploads
+pending items in compressed batches to a
+:class:`~src.backend.sync.SyncService`. Once a reply acknowledges them,
+:meth:`OfflineQueue.ack` records the server's high-water mark in ``acked``
+and drops those items from memory. The file is compacted only once it holds
+more acknowledged lines than pending ones, so draining a large backlog costs
+linear rather than quadratic I/O.
+
+The queue's random ``epoch`` is stored in ``epoch`` when the directory is
+created. A wiped directory therefore starts a new epoch, and the server does
+not confuse its restarted sequence numbers with ones it has already seen.
+
+Each step writes through a temporary file and ``os.replace``, so a crash
+leaves either the old or the new state. A torn final line is cut off when
+the queue is reopened.
+"""
+import json
+import os
+import uuid
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Deque, Dict, List
+
+QUEUE = "queue.jsonl"
+ACKED = "acked"
+EPOCH = "epoch"
+
+
+def _line(item: Dict) -> str:
+    return json.dumps(item, separators=(",", ":"), default=str) + "\n"
+
+
+class OfflineQueue:
+    """Append-only journal of unsynced transactions for one device."""
+
+    def __init__(self, directory: str | os.PathLike, device_id: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.device_id = device_id
+        self.epoch = self._read_epoch()
+        self.acked = self._read_acked()
+        self.items: Deque[Dict] = deque()
+        self._stale = 0
+        self._load()
+        self.next_seq = (self.items[-1]["seq"] if self.items else self.acked) + 1
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    @property
+    def path(self) -> Path:
+        return self.directory / QUEUE
+
+    @property
+    def pending(self) -> int:
+        return len(self.items)
+
+    def append(self, transaction: Dict, route: List[str] | None = None, metadata: Dict | None = None) -> int:
+        """Durably queue one transaction payload and return its sequence number."""
+
+        item = {"seq": self.next_seq, "transaction": transaction, "route": route, "metadata": metadata}
+        self._handle.write(_line(item))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self.items.append(item)
+        self.next_seq += 1
+        return item["seq"]
+
+    def peek(self, limit: int) -> List[Dict]:
+        """The oldest ``limit`` pending items."""
+
+        return list(islice(self.items, limit))
+
+    def ack(self, mark: int) -> int:
+        """Drop every item with ``seq <= mark``; return how many were dropped."""
+
+        if mark <= self.acked:
+            return 0
+        self.acked = mark
+        self.next_seq = max(self.next_seq, mark + 1)
+        self._replace(self.directory / ACKED, str(mark))
+        dropped = 0
+        while self.items and self.items[0]["seq"] <= mark:
+            self.items.popleft()
+            dropped += 1
+        self._stale += dropped
+        if not self.items or self._stale > len(self.items):
+            self._compact()
+        return dropped
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def _compact(self) -> None:
+        self._handle.close()
+        self._replace(self.path, "".join(_line(item) for item in self.items))
+        self._handle = open(self.path, "a", encoding="utf-8")
+        self._stale = 0
+
+    def _read_epoch(self) -> str:
+        path = self.directory / EPOCH
+        try:
+            epoch = path.read_text().strip()
+        except FileNotFoundError:
+            epoch = ""
+        if not epoch:
+            epoch = uuid.uuid4().hex
+            self._replace(path, epoch)
+        return epoch
+
+    def _read_acked(self) -> int:
+        try:
+            return int((self.directory / ACKED).read_text() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> None:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:  # torn final write
+                break
+            if not line.endswith(b"\n"):
+                break
+            valid += len(line)
+            if item["seq"] > self.acked:
+                self.items.append(item)
+            else:
+                self._stale += 1
+        if valid < len(data):
+            with open(self.path, "r+b") as handle:
+                handle.truncate(valid)
+
+    def _replace(self, path: Path, text: str) -> None:
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
@@ -0,0 +1,244 @@
+"""Low-overhead metrics for the clearing pipeline.
+
+Instrumented code checks the module-level ``enabled`` flag once per call and
+does nothing else while metrics are off, so the disabled cost is a global
+lookup and a branch::
+
+    started = perf_counter_ns() if metrics.enabled else 0
+    ...
+    if started:
+        LATENCY.record(perf_counter_ns() - started)
+
+Histograms use HDR-style log-linear buckets: values below 32 get their own
+bucket, larger ones keep their top five significant bits, so every bucket is
+within 6.25% of the values it holds and memory grows with the number of
+distinct magnitudes seen, not with the number of samples. Latencies are
+recorded in integer nanoseconds and exported in seconds.
+
+Metrics are exported either as Prometheus text (:func:`render_prometheus`,
+:class:`PrometheusTextFileExporter` for the node_exporter textfile collector)
+or as an in-process :meth:`MetricRegistry.snapshot`. Updates are not locked;
+a racing thread may occasionally lose an increment.
+"""
+import os
+import tempfile
+from typing import Dict, Iterable, List, Protocol, Tuple
+
+enabled = False
+
+_LINEAR = 32
+_SUB_BUCKETS = 16
+_NANOSECONDS = 1e-9
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def bucket_index(value: int) -> int:
+    if value < _LINEAR:
+        return max(value, 0)
+    shift = value.bit_length() - 5
+    return _SUB_BUCKETS * shift + (value >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Inclusive ``(lowest, highest)`` value stored in bucket ``index``."""
+
+    if index < _LINEAR:
+        return index, index
+    shift = index // _SUB_BUCKETS - 1
+    mantissa = index % _SUB_BUCKETS + _SUB_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class Counter:
+    kind = "counter"
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def reset(self) -> None:
+        self.value = 0
+
+    def snapshot(self) -> Dict:
+        return {"type": self.kind, "value": self.value}
+
+
+class Histogram:
+    """Log-linear bucketed distribution of non-negative integer samples."""
+
+    kind = "histogram"
+
+    __slots__ = ("name", "help", "unit", "counts", "count", "total", "min", "max")
+
+    def __init__(self, name: str, help: str, unit: str = "") -> None:
+        self.name = name
+        self.help = help
+        self.unit = unit
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value: int) -> None:
+        index = value if 0 <= value < _LINEAR else bucket_index(value)
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> int | None:
+        """Upper bound of the bucket holding the ``fraction`` quantile."""
+
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def scale(self) -> float:
+        return _NANOSECONDS if self.unit == "seconds" else 1.0
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """``(upper_bound, cumulative_count)`` per populated bucket, in export units."""
+
+        scale = self.scale()
+        buckets, seen = [], 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            buckets.append((bucket_bounds(index)[1] * scale, seen))
+        return buckets
+
+    def snapshot(self) -> Dict:
+        scale = self.scale()
+        summary = {"type": self.kind, "unit": self.unit, "count": self.count, "sum": self.total * scale}
+        if self.count:
+            summary.update(
+                min=self.min * scale,
+                max=self.max * scale,
+                p50=self.percentile(0.5) * scale,
+                p90=self.percentile(0.9) * scale,
+                p99=self.percentile(0.99) * scale,
+            )
+        return summary
+
+
+class MetricRegistry:
+    """Named counters and histograms; asking for an existing name returns it."""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name: str, help: str, unit: str = "") -> Histogram:
+        return self._get(Histogram, name, help, unit)
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: metric.snapshot() for name, metric in sorted(self.metrics.items())}
+
+    def _get(self, cls, name: str, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+
+REGISTRY = MetricRegistry()
+
+
+def counter(name: str, help: str) -> Counter:
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name: str, help: str, unit: str = "") -> Histogram:
+    return REGISTRY.histogram(name, help, unit)
+
+
+def render_prometheus(registry: MetricRegistry = REGISTRY) -> str:
+    """Render every metric in the Prometheus text exposition format."""
+
+    lines: List[str] = []
+    for name, metric in sorted(registry.metrics.items()):
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        if isinstance(metric, Counter):
+            lines.append(f"{name} {metric.value}")
+            continue
+        for upper, seen in metric.cumulative_buckets():
+            lines.append(f'{name}_bucket{{le="{upper:.9g}"}} {seen}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {metric.count}')
+        lines.append(f"{name}_sum {metric.total * metric.scale():.9g}")
+        lines.append(f"{name}_count {metric.count}")
+    return "\n".join(lines) + "\n"
+
+
+class Exporter(Protocol):
+    def export(self, registry: MetricRegistry) -> None:
+        ...
+
+
+class PrometheusTextFileExporter:
+    """Atomically rewrite a ``.prom`` file for the node_exporter textfile collector."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = os.fspath(path)
+
+    def export(self, registry: MetricRegistry = REGISTRY) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                handle.write(render_prometheus(registry))
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+class SnapshotExporter:
+    """Keep the most recent snapshot in memory, e.g. for a health endpoint."""
+
+    def __init__(self) -> None:
+        self.latest: Dict[str, Dict] = {}
+
+    def export(self, registry: MetricRegistry = REGISTRY) -> None:
+        self.latest = registry.snapshot()
+
+
+def export(exporters: Iterable[Exporter], registry: MetricRegistry = REGISTRY) -> None:
+    for exporter in exporters:
+        exporter.export(registry)
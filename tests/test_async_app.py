@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mobile.app import EVChargeRequest
+from src.mobile.async_app import AsyncP2PConnectApp, Overloaded
+
+REQUEST = EVChargeRequest("EVHub-Cleveland", 25.0, 5.0, datetime(2025, 5, 10, 18, 0, 0))
+
+
+async def _registered(app):
+    await app.register_user("solar-001", "producer", 750, "AEP-Columbus")
+    await app.register_user("ev-station-9", "consumer", 200, "EVHub-Cleveland")
+
+
+def test_concurrent_submissions_are_micro_batched():
+    async def scenario():
+        async with AsyncP2PConnectApp(max_batch=64) as app:
+            await _registered(app)
+            batch_sizes = []
+            original = app.app.request_ev_energy_batch
+
+            def recording_batch(orders):
+                batch_sizes.append(len(orders))
+                return original(orders)
+
+            app.app.request_ev_energy_batch = recording_batch
+            payloads = await asyncio.gather(
+                *(app.request_ev_energy(f"tx-{index}", REQUEST, "solar-001", "ev-station-9") for index in range(200))
+            )
+            return app, payloads, batch_sizes
+
+    app, payloads, batch_sizes = asyncio.run(scenario())
+
+    assert [payload["tx_id"] for payload in payloads] == [f"tx-{index}" for index in range(200)]
+    assert app.app.ledger.entry_count == 200
+    assert sum(batch_sizes) == 200
+    assert max(batch_sizes) <= 64
+    assert len(batch_sizes) < 200
+
+
+def test_rejections_and_backpressure():
+    async def scenario():
+        async with AsyncP2PConnectApp(max_in_flight=1, reject_when_full=True) as app:
+            await _registered(app)
+            with pytest.raises(ValueError, match="not registered"):
+                await app.request_ev_energy("tx-bad", REQUEST, "solar-001", "ev-missing")
+
+            first = asyncio.create_task(app.request_ev_energy("tx-1", REQUEST, "solar-001", "ev-station-9"))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded):
+                await app.request_ev_energy("tx-2", REQUEST, "solar-001", "ev-station-9")
+            return await first
+
+    assert asyncio.run(scenario())["tx_id"] == "tx-1"
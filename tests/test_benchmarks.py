@@ -0,0 +1,61 @@
+from dataclasses import asdict, make_dataclass
+import json
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks import synthetic
+from benchmarks.run import compare, run
+
+
+def test_synthetic_grid_is_strongly_connected_lattice():
+    config = synthetic.grid_interconnect(100, chords_per_node=0)
+    assert len(config.grid_nodes) == 100
+    assert config.grid_nodes[synthetic.node_name(0)] == [synthetic.node_name(1), synthetic.node_name(10)]
+    assert config.line(synthetic.node_name(0), synthetic.node_name(1)).capacity_mw in (50.0, 200.0, 1000.0)
+
+
+def test_smoke_run_and_compare_against_baseline():
+    results = run(["register", "route_table", "request_ev_energy_batch"], [100], repeat=1)
+    assert [(r["name"], r["size"]) for r in results["results"]] == [
+        ("register", 100),
+        ("route_table", 100),
+        ("request_ev_energy_batch", 100),
+    ]
+    assert all(r["ops"] > 0 and r["ops_per_sec"] > 0 for r in results["results"])
+
+    baseline = {"results": [dict(r) for r in results["results"][:2]]}
+    baseline["results"][0]["ops_per_sec"] *= 10
+    lines, regressions = compare(results, baseline, tolerance=0.2)
+    assert regressions == [("register", 100)]
+    assert lines[2].endswith("(new)")
+
+
+def test_allocation_benchmark_matches_asdict_payloads():
+    from benchmarks import allocations
+    from src.backend.config import OHIO_INTERCONNECT
+    from src.backend.registration import Participant
+    from src.backend.transactions import TransactionLogger, payload_encoder
+    from src.ledger.adapter import LedgerAdapter
+    from src.ledger.file_adapter import encode_entry
+
+    transaction = allocations._transactions(1)[0]
+    producer = Participant("solar-1", "producer", 5000, {"node": "AEP-Columbus"})
+    consumer = Participant("ev-1", "consumer", 350, {"node": "EVHub-Cleveland"})
+    logger = TransactionLogger(OHIO_INTERCONNECT, LedgerAdapter())
+    payload = logger._build_payload(transaction, producer, consumer, allocations._ROUTE, None)
+    assert payload == allocations.asdict_payload(transaction)
+    assert list(payload) == list(allocations.asdict_payload(transaction))
+
+    slotted = make_dataclass("Slotted", ["a", "b"], slots=True)
+    assert payload_encoder(slotted)(slotted(1, 2)) == {"a": 1, "b": 2}
+    assert payload_encoder(type(transaction))(transaction) == asdict(transaction)
+
+    entry = dict(payload, note="\u00e9t\u00e9", at=transaction.timestamp, wide=2**70)
+    assert json.loads(encode_entry(entry)) == json.loads(allocations.json_dumps_entry(entry))
+
+    results = allocations.run(200)
+    assert results["payload_encoder"]["transient_bytes_per_call"] < results["payload_asdict"]["transient_bytes_per_call"]
+    assert results["encode_entry"]["transient_bytes_per_call"] < results["encode_json_dumps"]["transient_bytes_per_call"]
@@ -0,0 +1,72 @@
+from pathlib import Path
+import socket
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.frontend import client, server as server_module
+from src.frontend.cli import GridShareCLI
+from src.frontend.server import CLIServer, execute
+
+
+def test_client_commands_run_against_one_warm_app(tmp_path):
+    path = str(tmp_path / "cli.sock")
+    cli = GridShareCLI()
+    server = CLIServer(path, cli)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = ["request", "--kilowatt-hours", "12", "--price-usd", "3", "--desired-start", "2025-06-01T10:00:00"]
+        for tx_id in ("tx-1", "tx-2"):
+            status, stdout, stderr = client.call(request + ["--tx-id", tx_id], path, timeout=10)
+            assert (status, stderr) == (0, b"")
+            assert f"Transaction {tx_id}" in stdout.decode()
+        assert cli.app.ledger.entry_count == 2
+
+        status, stdout, _ = client.call(["export", "--limit", "1"], path, timeout=10)
+        assert status == 0 and stdout.startswith(b'{"tx_id":"tx-1"')
+
+        status, _, stderr = client.call(["nonsense"], path, timeout=10)
+        assert status == 2 and b"invalid choice" in stderr
+        status, _, stderr = client.call(["--ledger-path", "elsewhere", "ledger"], path, timeout=10)
+        assert status == 1 and b"global option" in stderr
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not Path(path).exists()
+    assert client.main(["--socket", path, "ledger"]) == 2
+
+
+def test_socket_is_private_and_stalled_clients_time_out(tmp_path):
+    path = str(tmp_path / "cli.sock")
+    server = CLIServer(path, GridShareCLI(), request_timeout=0.2)
+    assert stat.S_IMODE(Path(path).stat().st_mode) == 0o600
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(path)
+            started = time.monotonic()
+            status, stdout, _ = client.call(["ledger"], path, timeout=10)
+            assert status == 0 and stdout.startswith(b"No ledger entries yet")
+            assert time.monotonic() - started < 5
+            assert stalled.recv(1) == b""  # the server dropped the idle connection
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_shutdown_signal_during_a_command_is_not_swallowed(monkeypatch):
+    def interrupted(cli, args):
+        raise SystemExit(0)  # what the SIGTERM handler raises in the serving thread
+
+    monkeypatch.setattr(server_module, "_run_command", interrupted)
+    with pytest.raises(SystemExit):
+        execute(GridShareCLI(), ["ledger"])
+    assert execute(GridShareCLI(), ["--help"])[0] == 0
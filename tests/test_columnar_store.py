@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.columnar import TransactionColumns
+from src.backend.transactions import EnergyTransaction
+
+
+def _tx(tx_id, producer, kilowatt_hours, price_usd, timestamp, session=None):
+    return EnergyTransaction(
+        tx_id=tx_id,
+        producer_id=producer,
+        consumer_id="ev-station-9",
+        kilowatt_hours=kilowatt_hours,
+        price_usd=price_usd,
+        timestamp=timestamp,
+        ev_session_id=session,
+    )
+
+
+def test_rows_round_trip_through_columns():
+    store = TransactionColumns()
+    naive = _tx("tx-1", "solar-001", 10.0, 2.5, datetime(2025, 5, 10, 15, 30, 0, 125), session="EVHub-Cleveland")
+    aware = _tx("tx-2", "solar-001", 5.0, 1.0, datetime(2025, 5, 10, 12, 0, tzinfo=timezone(timedelta(hours=-4))))
+    store.extend([naive, aware])
+
+    assert store[0].to_transaction() == naive
+    assert store[-1].timestamp == datetime(2025, 5, 10, 16, 0, tzinfo=timezone.utc)
+    assert store[1].ev_session_id is None
+    assert len(store.participants) == 2
+    assert [row.tx_id for row in store] == ["tx-1", "tx-2"]
+
+
+def test_aggregates_run_over_columns():
+    store = TransactionColumns()
+    hour = datetime(2025, 5, 10, 15)
+    store.extend(
+        [
+            _tx("tx-1", "solar-001", 10.0, 2.0, hour + timedelta(minutes=5)),
+            _tx("tx-2", "wind-002", 30.0, 9.0, hour + timedelta(minutes=50)),
+            _tx("tx-3", "solar-001", 20.0, 8.0, hour + timedelta(hours=1)),
+        ]
+    )
+
+    assert store.total_kwh_by_producer() == {"solar-001": 30.0, "wind-002": 30.0}
+    assert store.vwap_by_hour() == {hour: 11.0 / 40.0, hour + timedelta(hours=1): 0.4}
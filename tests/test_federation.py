@@ -0,0 +1,142 @@
+from copy import deepcopy
+from datetime import datetime
+import json
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import InterconnectConfig, OHIO_INTERCONNECT
+from src.backend.federation import ClearingOrder, Federation, TiePoint, load_federation
+from src.backend.registration import Participant
+from src.ledger.adapter import LedgerAdapter
+
+MIDATLANTIC = InterconnectConfig(
+    name="Mid-Atlantic",
+    transmission_operator="PJM Interconnection",
+    compliance_rules=[],
+    utility_partners=["PPL"],
+    ev_charging_partners=[],
+    grid_nodes={
+        "PPL-Allentown": ["PPL-Harrisburg"],
+        "PPL-Harrisburg": ["EVHub-Philadelphia"],
+        "EVHub-Philadelphia": [],
+    },
+)
+
+
+def _federation(**options):
+    return Federation(
+        {"ohio": deepcopy(OHIO_INTERCONNECT), "midatlantic": deepcopy(MIDATLANTIC)},
+        [
+            TiePoint("ohio", "FirstEnergy-Akron", "midatlantic", "PPL-Allentown", capacity_mw=500),
+            TiePoint("midatlantic", "PPL-Harrisburg", "ohio", "AEP-Columbus"),
+        ],
+        **options,
+    )
+
+
+def test_hierarchical_route_crosses_tie_points():
+    federation = _federation()
+
+    assert federation.route("ohio", "AEP-Columbus", "midatlantic", "EVHub-Philadelphia") == [
+        ("ohio", "AEP-Columbus"),
+        ("ohio", "Duke-Cincinnati"),
+        ("ohio", "FirstEnergy-Akron"),
+        ("midatlantic", "PPL-Allentown"),
+        ("midatlantic", "PPL-Harrisburg"),
+        ("midatlantic", "EVHub-Philadelphia"),
+    ]
+    assert federation.route("midatlantic", "PPL-Allentown", "ohio", "EVHub-Dayton") == [
+        ("midatlantic", "PPL-Allentown"),
+        ("midatlantic", "PPL-Harrisburg"),
+        ("ohio", "AEP-Columbus"),
+        ("ohio", "Duke-Cincinnati"),
+        ("ohio", "EVHub-Dayton"),
+    ]
+    assert federation.route("ohio", "AEP-Columbus", "midatlantic", "EVHub-Philadelphia", demand_mw=600) == []
+    assert federation.route("ohio", "AEP-Columbus", "ohio", "EVHub-Cleveland") == [
+        ("ohio", "AEP-Columbus"),
+        ("ohio", "Duke-Cincinnati"),
+        ("ohio", "EVHub-Cleveland"),
+    ]
+
+
+def test_regions_clear_in_worker_processes_and_log_in_parent():
+    federation = _federation(max_workers=2)
+    federation.register("ohio", Participant("solar-oh", "producer", 500, {"node": "AEP-Columbus"}))
+    federation.register("ohio", Participant("ev-oh", "consumer", 150, {"node": "EVHub-Cleveland"}))
+    federation.register("midatlantic", Participant("wind-pa", "producer", 500, {"node": "PPL-Allentown"}))
+    federation.register("midatlantic", Participant("ev-pa", "consumer", 150, {"node": "EVHub-Philadelphia"}))
+    start = datetime(2025, 5, 10, 15, 30)
+    ledger = LedgerAdapter()
+    try:
+        result = federation.clear(
+            {
+                "ohio": [
+                    ClearingOrder("ask-oh", "solar-oh", "ask", 0.10, 40),
+                    ClearingOrder("bid-oh", "ev-oh", "bid", 0.12, 25, start, "EVHub-Cleveland"),
+                    ClearingOrder("bid-ghost", "nobody", "bid", 0.12, 25, start),
+                ],
+                "midatlantic": [
+                    ClearingOrder("ask-pa", "wind-pa", "ask", 0.20, 40),
+                    ClearingOrder("bid-pa", "ev-pa", "bid", 0.15, 25, start, "EVHub-Philadelphia"),
+                ],
+            },
+            ledger=ledger,
+        )
+    finally:
+        federation.close()
+
+    assert [(fill.ask_id, fill.kilowatt_hours) for fill in result.fills["ohio"]] == [("ask-oh", 25)]
+    assert result.fills["midatlantic"] == []
+    assert [order_id for order_id, _ in result.rejected] == ["bid-ghost"]
+    assert [(order.order_id, order.kilowatt_hours) for order in result.unfilled["ohio"]] == [("ask-oh", 15)]
+    assert [(order.order_id, order.kilowatt_hours) for order in result.unfilled["midatlantic"]] == [
+        ("ask-pa", 40),
+        ("bid-pa", 25),
+    ]
+    assert result.unfilled["midatlantic"][1].station_id == "EVHub-Philadelphia"
+    assert [entry["tx_id"] for entry in ledger.entries] == ["ohio-fill-bid-oh-ask-oh"]
+    assert ledger.entries[0]["route"] == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+
+
+def test_unfilled_orders_carry_into_the_next_round_with_distinct_tx_ids():
+    federation = _federation(max_workers=0)
+    federation.register("ohio", Participant("solar-oh", "producer", 500, {"node": "AEP-Columbus"}))
+    federation.register("ohio", Participant("ev-oh", "consumer", 150, {"node": "EVHub-Cleveland"}))
+    start = datetime(2025, 5, 10, 15, 30)
+    ledger = LedgerAdapter()
+
+    first = federation.clear(
+        {"ohio": [ClearingOrder("ask-1", "solar-oh", "ask", 0.10, 40), ClearingOrder("bid-1", "ev-oh", "bid", 0.12, 25, start)]},
+        ledger=ledger,
+    )
+    second = federation.clear(
+        {"ohio": first.unfilled["ohio"] + [ClearingOrder("bid-2", "ev-oh", "bid", 0.12, 25, start)]},
+        ledger=ledger,
+    )
+
+    assert [(fill.ask_id, fill.kilowatt_hours) for fill in second.fills["ohio"]] == [("ask-1", 15)]
+    assert [(order.order_id, order.kilowatt_hours) for order in second.unfilled["ohio"]] == [("bid-2", 10)]
+    assert [entry["tx_id"] for entry in ledger.entries] == ["ohio-fill-bid-1-ask-1", "ohio-fill-bid-2-ask-1"]
+
+
+def test_load_federation_from_json(tmp_path):
+    path = tmp_path / "federation.json"
+    path.write_text(
+        json.dumps(
+            {
+                "regions": {
+                    "west": {"grid_nodes": {"A": ["B"], "B": []}, "lines": {"A": {"B": {"capacity_mw": 5}}}},
+                    "east": {"grid_nodes": {"C": []}},
+                },
+                "tie_points": [{"from_region": "west", "from_node": "B", "to_region": "east", "to_node": "C"}],
+            }
+        )
+    )
+
+    federation = load_federation(path, max_workers=0)
+    assert federation.configs["west"].line("A", "B").capacity_mw == 5
+    assert federation.route("west", "A", "east", "C") == [("west", "A"), ("west", "B"), ("east", "C")]
@@ -0,0 +1,121 @@
+from pathlib import Path
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.frontend.cli import main
+from src.ledger.adapter import LedgerAdapter
+from src.ledger.file_adapter import FileLedgerAdapter, decode_entry, encode_entry
+from src.ledger.segment_log import SegmentLog
+
+
+def test_entries_survive_reopen_and_segment_rollover(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path, segment_bytes=256, fsync_every=4)
+    ledger.append_entry({"tx_id": "tx-0", "kilowatt_hours": 1.5})
+    ledger.append_entries({"tx_id": f"tx-{index}", "kilowatt_hours": index} for index in range(1, 20))
+    ledger.close()
+
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+
+    reopened = FileLedgerAdapter(tmp_path)
+    assert reopened.entry_count == 20
+    assert reopened.entry(0) == {"tx_id": "tx-0", "kilowatt_hours": 1.5}
+    assert reopened.entry(13)["tx_id"] == "tx-13"
+    assert [entry["tx_id"] for entry in reopened.iter_entries(17)] == ["tx-17", "tx-18", "tx-19"]
+
+    reopened.append_entry({"tx_id": "tx-20"})
+    assert reopened.entries[-1] == {"tx_id": "tx-20"}
+    reopened.close()
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path)
+    ledger.append_entries([{"tx_id": "tx-1"}, {"tx_id": "tx-2"}])
+    ledger.close()
+
+    segment = next(tmp_path.glob("*.seg"))
+    intact_size = segment.stat().st_size
+    with open(segment, "ab") as handle:
+        handle.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{\"tx_id\"")
+
+    recovered = FileLedgerAdapter(tmp_path)
+    assert [entry["tx_id"] for entry in recovered.iter_entries()] == ["tx-1", "tx-2"]
+    assert segment.stat().st_size == intact_size
+    recovered.close()
+
+
+def test_cli_ledger_persists_between_invocations(tmp_path, capsys):
+    ledger_path = str(tmp_path / "ledger")
+    main(
+        [
+            "--ledger-path",
+            ledger_path,
+            "request",
+            "--tx-id",
+            "tx-cli-persist",
+            "--kilowatt-hours",
+            "12.5",
+            "--price-usd",
+            "3.10",
+            "--desired-start",
+            "2025-06-01T10:00:00",
+        ]
+    )
+    capsys.readouterr()
+
+    main(["--ledger-path", ledger_path, "ledger"])
+    output = capsys.readouterr().out
+    assert "tx-cli-persist" in output
+    assert "AEP-Columbus -> Duke-Cincinnati -> EVHub-Cleveland" in output
+
+
+def test_entries_is_a_live_view_without_copies(tmp_path):
+    for ledger in (LedgerAdapter(), FileLedgerAdapter(tmp_path)):
+        entries = ledger.entries
+        ledger.append_entries([{"tx_id": "tx-1"}, {"tx_id": "tx-2"}, {"tx_id": "tx-3"}])
+        assert len(entries) == 3
+        assert entries == [{"tx_id": "tx-1"}, {"tx_id": "tx-2"}, {"tx_id": "tx-3"}]
+        assert entries[-1] == {"tx_id": "tx-3"} and entries[1:] == [{"tx_id": "tx-2"}, {"tx_id": "tx-3"}]
+        assert [entry["tx_id"] for entry in entries] == ["tx-1", "tx-2", "tx-3"]
+        ledger.close()
+    assert LedgerAdapter().entries == []
+
+
+def test_interval_sync_happens_without_further_appends(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path, fsync_every=1000, fsync_interval=0.2)
+    ledger.log.sync()
+    ledger.append_entry({"tx_id": "tx-1"})
+    assert ledger.log._unsynced == 1
+    deadline = time.monotonic() + 5
+    while ledger.log._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ledger.log._unsynced == 0
+    flusher = ledger.log._flusher
+    ledger.close()
+    assert not flusher.is_alive()
+
+
+def test_reads_between_appends_survive_segment_rollover(tmp_path):
+    log = SegmentLog(tmp_path, segment_bytes=200)
+    records = [bytes([65 + index]) * 60 for index in range(8)]
+    log.append(records[0])
+    assert log.read(0) == records[0]
+    assert [record for _, record in log.iter_records()] == records[:1]
+    log.append_many(records[1:4])
+    assert [log.read(index) for index in range(4)] == records[:4]
+    iterator = log.iter_records()
+    assert next(iterator) == (0, records[0])
+    log.append_many(records[4:])
+    assert [record for _, record in iterator] == records[1:]
+    assert [log.read(index) for index in range(8)] == records
+    log.close()
+
+
+def test_non_finite_floats_round_trip_like_the_json_module():
+    entry = {"tx_id": "tx-1", "ev_session_id": None, "readings": [1.5, float("inf")], "price_usd": float("nan")}
+    decoded = decode_entry(encode_entry(entry))
+    assert decoded["readings"] == [1.5, float("inf")] and decoded["price_usd"] != decoded["price_usd"]
+    assert decoded["ev_session_id"] is None
+    assert encode_entry({"tx_id": "tx-2", "ev_session_id": None}) == b'{"tx_id":"tx-2","ev_session_id":null}'
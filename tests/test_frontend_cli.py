@@ -1,10 +1,12 @@
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import sys
+import time
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.frontend.cli import GridShareCLI
+from src.frontend.cli import GridShareCLI, main
 
 
 def test_cli_bootstrap_and_request_flow():
@@ -35,3 +37,20 @@ def test_cli_bootstrap_and_request_flow():
     assert payload["route"] == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
     assert "cli-001" in rendered
     assert "150.5" in rendered
+
+
+def test_settle_defaults_to_the_current_utc_time(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("TZ", "Etc/GMT+12")  # local clock 12 hours behind UTC
+    time.tzset()
+    try:
+        common = ["--ledger-path", str(tmp_path / "ledger")]
+        started = (datetime.now(timezone.utc) - timedelta(hours=3)).replace(minute=0, second=0, microsecond=0)
+        main(common + ["bootstrap"])
+        request = ["request", "--tx-id", "tx-1", "--kilowatt-hours", "5", "--price-usd", "1"]
+        main(common + request + ["--desired-start", started.isoformat()])
+        capsys.readouterr()
+        main(common + ["settle"])
+        assert "Emitted 1 settlement batch(es)." in capsys.readouterr().out
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.frontend.cli import main
+from src.frontend.importers import import_participants, import_requests, iter_rows
+from src.mobile.app import P2PConnectApp
+
+
+def test_import_participants_and_requests_in_chunks(tmp_path):
+    participants = tmp_path / "participants.csv"
+    participants.write_text(
+        "participant_id,role,capacity_kw,node,resource\n"
+        "solar-1,producer,500,AEP-Columbus,solar farm\n"
+        "ev-1,consumer,150,EVHub-Cleveland,\n"
+        "bad-role,prosumer,10,AEP-Columbus,\n"
+        "solar-1,producer,500,AEP-Columbus,\n"
+        "no-node,consumer,10,,\n"
+    )
+    requests = tmp_path / "requests.jsonl"
+    rows = [
+        {"tx_id": f"tx-{index}", "kilowatt_hours": 10, "price_usd": 2.5, "desired_start": "2025-06-01T10:00:00",
+         "producer_id": "solar-1", "consumer_id": "ev-1", "station_id": "EVHub-Cleveland"}
+        for index in range(8)
+    ]
+    rows[3]["consumer_id"] = "ghost"
+    rows[5]["tx_id"] = "tx-1"
+    rows[6]["kilowatt_hours"] = 0
+    del rows[7]["station_id"]
+    lines = [json.dumps(row) for row in rows] + ["{not json", json.dumps({"tx_id": "tx-9", "price_usd": 1})]
+    requests.write_text("\n".join(lines) + "\n")
+
+    app = P2PConnectApp()
+    report = import_participants(app, iter_rows(participants), chunk_size=2)
+    assert (report.rows, report.imported) == (5, 2)
+    assert [line for line, _ in report.rejected] == [4, 5, 6]
+    assert app.registry.get("solar-1").metadata == {"resource": "solar farm", "node": "AEP-Columbus"}
+
+    report = import_requests(app, iter_rows(requests), chunk_size=3)
+    assert (report.rows, report.imported) == (10, 4)
+    assert report.rejected == [
+        (4, "Participant ghost is not registered"),
+        (6, "tx_id tx-1 already logged"),
+        (7, "kilowatt_hours must be positive"),
+        (8, "missing station_id"),
+        (9, "invalid JSON: Expecting property name enclosed in double quotes"),
+        (10, "missing desired_start, station_id"),
+    ]
+    assert [entry["tx_id"] for entry in app.ledger_snapshot()] == ["tx-0", "tx-1", "tx-2", "tx-4"]
+    assert app.ledger_snapshot()[0]["ev_station_id"] == "EVHub-Cleveland"
+    assert "rows/s" in report.summary()
+
+
+def test_cli_imports_against_persistent_stores(tmp_path, capsys):
+    participants = tmp_path / "participants.jsonl"
+    participants.write_text(
+        json.dumps({"participant_id": "solar-1", "role": "producer", "capacity_kw": 500, "node": "AEP-Columbus"})
+        + "\n"
+        + json.dumps({"participant_id": "ev-1", "role": "consumer", "capacity_kw": 150, "node": "EVHub-Cleveland"})
+        + "\n"
+    )
+    requests = tmp_path / "requests.csv"
+    requests.write_text(
+        "tx_id,kilowatt_hours,price_usd,desired_start,producer_id,consumer_id,station_id,priority\n"
+        "tx-1,12.5,3.1,2025-06-01T10:00:00,solar-1,ev-1,EVHub-Cleveland,fast-track\n"
+    )
+    stores = ["--ledger-path", str(tmp_path / "ledger"), "--registry-path", str(tmp_path / "registry")]
+
+    main(stores + ["import-participants", str(participants)])
+    assert capsys.readouterr().out.startswith("Imported 2 of 2 rows")
+    main(stores + ["import-requests", str(requests)])
+    assert capsys.readouterr().out.startswith("Imported 1 of 1 rows")
+    main(stores + ["import-requests", str(requests)])
+    assert "line 2: tx_id tx-1 already logged" in capsys.readouterr().out
+    main(stores + ["ledger"])
+    assert "Transaction tx-1: 12.5 kWh" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+from datetime import datetime
+import io
+import json
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.frontend.cli import main
+from src.ledger.export import filter_entries, read_columnar, write_columnar, write_jsonl
+from src.ledger.file_adapter import FileLedgerAdapter
+
+
+def _entries(count):
+    for index in range(count):
+        yield {
+            "tx_id": f"tx-{index}",
+            "producer_id": "solar-1",
+            "consumer_id": "ev-1",
+            "kilowatt_hours": float(index),
+            "price_usd": index * 0.25,
+            "timestamp": datetime(2025, 6, 1, index % 24),
+            "energy_source": "solar",
+            "ev_session_id": None if index % 2 else "EVHub-Cleveland",
+            "route": ["AEP-Columbus", "EVHub-Cleveland"],
+            "sdnc": "optimal-routing",
+        }
+
+
+def test_jsonl_and_columnar_round_trip_with_filters():
+    since = datetime(2025, 6, 1, 20)
+    stream = io.BytesIO()
+    assert write_jsonl(filter_entries(_entries(30), since=since), stream) == 4
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["tx_id"] for line in lines] == ["tx-20", "tx-21", "tx-22", "tx-23"]
+    assert lines[0]["timestamp"] == "2025-06-01 20:00:00"
+
+    stream = io.BytesIO()
+    assert write_columnar(filter_entries(_entries(30), limit=10), stream, chunk_rows=4) == 10
+    stream.seek(0)
+    chunks = list(read_columnar(stream))
+    assert [len(chunk["tx_id"]) for chunk in chunks] == [4, 4, 2]
+    first = chunks[0]
+    assert first["tx_id"] == ["tx-0", "tx-1", "tx-2", "tx-3"]
+    assert first["kilowatt_hours"] == [0.0, 1.0, 2.0, 3.0]
+    assert first["ev_session_id"] == ["EVHub-Cleveland", None, "EVHub-Cleveland", None]
+    assert first["route"][0].split("\x1f") == ["AEP-Columbus", "EVHub-Cleveland"]
+    assert json.loads(first["extra"][0]) == {"sdnc": "optimal-routing"}
+    assert first["timestamp"][1] - first["timestamp"][0] == 3600
+
+
+def test_cli_export_streams_file_ledger(tmp_path, capsysbinary):
+    ledger_path = tmp_path / "ledger"
+    ledger = FileLedgerAdapter(ledger_path)
+    ledger.append_entries(_entries(50))
+    ledger.close()
+
+    main(["--ledger-path", str(ledger_path), "export", "--since", "2025-06-01T10:00:00", "--limit", "3"])
+    exported = [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+    assert [entry["tx_id"] for entry in exported] == ["tx-10", "tx-11", "tx-12"]
+
+    output = tmp_path / "ledger.gslc"
+    main(["--ledger-path", str(ledger_path), "export", "--format", "columnar", "--output", str(output)])
+    with open(output, "rb") as stream:
+        assert sum(len(chunk["tx_id"]) for chunk in read_columnar(stream)) == 50
+
+    main(["--ledger-path", str(ledger_path), "ledger", "--as-json"])
+    assert len(json.loads(capsysbinary.readouterr().out)) == 50
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ledger.adapter import LedgerAdapter
+from src.ledger.index import LedgerIndex
+from src.mobile.app import EVChargeOrder, EVChargeRequest, P2PConnectApp
+
+
+def _entry(tx_id, station, when, producer="p1", consumer="c1"):
+    return {
+        "tx_id": tx_id,
+        "producer_id": producer,
+        "consumer_id": consumer,
+        "ev_station_id": station,
+        "timestamp": when.isoformat(),
+    }
+
+
+def test_station_and_time_range_queries_return_sorted_matches():
+    ledger = LedgerAdapter()
+    start = datetime(2025, 5, 1)
+    ledger.append_entry(_entry("tx-old", "EVHub-Cleveland", start - timedelta(days=3)))
+    index = LedgerIndex().attach(ledger)
+    ledger.append_entries(
+        [
+            _entry("tx-b", "EVHub-Cleveland", start + timedelta(days=2)),
+            _entry("tx-a", "EVHub-Cleveland", start + timedelta(days=1)),
+            _entry("tx-dayton", "EVHub-Dayton", start + timedelta(days=1)),
+            _entry("tx-late", "EVHub-Cleveland", start + timedelta(days=7)),
+            _entry("tx-p2", "EVHub-Cleveland", start + timedelta(days=3), producer="p2"),
+        ]
+    )
+
+    last_week = index.query(station_id="EVHub-Cleveland", since=start, until=start + timedelta(days=7))
+    assert [entry["tx_id"] for entry in last_week] == ["tx-a", "tx-b", "tx-p2"]
+    assert [entry["tx_id"] for entry in index.query(producer_id="p2")] == ["tx-p2"]
+    assert [entry["tx_id"] for entry in index.query(producer_id="p1", station_id="EVHub-Dayton")] == ["tx-dayton"]
+    assert list(index.query(station_id="EVHub-Columbus")) == []
+    assert index.get("tx-old")["ev_station_id"] == "EVHub-Cleveland"
+    assert "tx-missing" not in index
+
+
+    ledger.append_entry({"entry_type": "settlement", "settlement_id": "s-1", "timestamp": start.isoformat()})
+    assert [entry["tx_id"] for entry in index.query(since=start, until=start + timedelta(days=2))] == ["tx-a", "tx-dayton"]
+
+
+def test_app_query_ledger_follows_new_transactions():
+    app = P2PConnectApp()
+    app.register_user(participant_id="solar-001", role="producer", capacity_kw=750, node="AEP-Columbus")
+    app.register_user(participant_id="ev-station-9", role="consumer", capacity_kw=200, node="EVHub-Cleveland")
+    request = EVChargeRequest("EVHub-Cleveland", 10.0, 2.0, datetime(2025, 5, 10, 8))
+
+    assert list(app.query_ledger(station_id="EVHub-Cleveland")) == []
+    app.request_ev_energy_batch(
+        [EVChargeOrder(f"tx-{index}", request, "solar-001", "ev-station-9") for index in range(3)]
+    )
+
+    assert [entry["tx_id"] for entry in app.query_ledger(consumer_id="ev-station-9")] == ["tx-0", "tx-1", "tx-2"]
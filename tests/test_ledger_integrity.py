@@ -0,0 +1,124 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.registration import Participant
+from src.backend.transactions import EnergyTransaction, TransactionLogger
+from src.ledger.adapter import LedgerAdapter
+from src.ledger.file_adapter import FileLedgerAdapter
+from src.ledger.integrity import HashChain, IntegrityError, LedgerVerifier
+
+
+def _entries(count, start=0):
+    return [{"tx_id": f"tx-{index}", "kilowatt_hours": float(index)} for index in range(start, start + count)]
+
+
+def test_log_transaction_with_proof_returns_verifiable_receipt():
+    ledger = LedgerAdapter()
+    logger = TransactionLogger(OHIO_INTERCONNECT, ledger)
+    producer = Participant(participant_id="p1", role="producer", capacity_kw=500, metadata={"node": "AEP-Columbus"})
+    consumer = Participant(participant_id="c1", role="consumer", capacity_kw=250, metadata={"node": "EVHub-Cleveland"})
+    ledger.append_entries(_entries(5))
+
+    tx = EnergyTransaction(
+        tx_id="tx-proof",
+        producer_id="p1",
+        consumer_id="c1",
+        kilowatt_hours=12.0,
+        price_usd=3.0,
+        timestamp=datetime(2025, 1, 1, 12, 0, 0),
+    )
+    payload, proof = logger.log_transaction_with_proof(tx, producer, consumer)
+
+    assert proof.position == 5
+    assert proof.leaf_count == 6
+    assert not proof.sealed
+    assert proof.verify(payload)
+    assert not proof.verify(dict(payload, kilowatt_hours=13.0))
+
+
+    # A listener that appends in reaction to the trade must not shift the proof off it.
+    def audit(position, entry):
+        if entry.get("tx_id") == "tx-audited":
+            ledger.append_entry({"audit": position})
+
+    ledger.add_listener(audit)
+    payload, proof = logger.log_transaction_with_proof(
+        EnergyTransaction(
+            tx_id="tx-audited",
+            producer_id="p1",
+            consumer_id="c1",
+            kilowatt_hours=1.0,
+            price_usd=0.5,
+            timestamp=datetime(2025, 1, 1, 13, 0, 0),
+        ),
+        producer,
+        consumer,
+    )
+    assert ledger.entry_count == 8
+    assert proof.position == 6 and proof.verify(payload)
+
+
+def test_sealed_block_proofs_match_headers():
+    ledger = LedgerAdapter()
+    chain = HashChain(block_size=4).attach(ledger)
+    ledger.append_entries(_entries(11))
+
+    assert len(chain.headers) == 2
+    proof = chain.proof(6)
+    assert proof.sealed
+    assert proof.root == chain.headers[1].merkle_root
+    assert proof.verify(ledger.entries[6])
+    assert chain.headers[1].previous_block_hash == chain.headers[0].block_hash
+
+
+def test_verifier_checks_only_new_blocks_and_detects_tampering():
+    ledger = LedgerAdapter()
+    chain = HashChain(block_size=4).attach(ledger)
+    ledger.append_entries(_entries(8))
+
+    checkpoint = LedgerVerifier(ledger, chain.headers).verify()
+    assert checkpoint.next_block == 2
+
+    ledger.append_entries(_entries(4, start=8))
+    ledger._entries[1]["kilowatt_hours"] = 999.0
+    checkpoint = LedgerVerifier(ledger, chain.headers).verify(checkpoint)
+    assert checkpoint.next_block == 3
+
+    with pytest.raises(IntegrityError, match="block 0"):
+        LedgerVerifier(ledger, chain.headers).verify()
+
+
+def test_persisted_headers_resume_without_rehashing_sealed_blocks(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path / "ledger")
+    chain = HashChain(block_size=4, header_path=tmp_path / "headers").attach(ledger)
+    ledger.append_entries(_entries(10))
+    head = chain.head
+    chain.close()
+    ledger.close()
+
+    ledger = FileLedgerAdapter(tmp_path / "ledger")
+    resumed = HashChain(block_size=4, header_path=tmp_path / "headers").attach(ledger)
+    assert resumed.head == head
+    assert len(resumed.headers) == 2
+    ledger.append_entries(_entries(2, start=10))
+    assert len(resumed.headers) == 3
+    assert LedgerVerifier(ledger, resumed.headers).verify().next_block == 3
+
+
+def test_ledger_is_synced_before_each_header_is_persisted(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path / "ledger", fsync_every=1000, fsync_interval=3600)
+    chain = HashChain(block_size=4, header_path=tmp_path / "headers").attach(ledger)
+    ledger.append_entries(_entries(3))
+    assert ledger.log._unsynced == 3
+    ledger.append_entry(_entries(1, start=3)[0])
+    assert len(chain.headers) == 1
+    assert ledger.log._unsynced == 0
+    chain.close()
+    ledger.close()
@@ -0,0 +1,93 @@
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.matching import MatchingEngine, fill_tx_id
+from src.mobile.app import EVChargeRequest, P2PConnectApp
+
+
+def _market(with_logger=True, interconnect=None):
+    app = P2PConnectApp(interconnect=interconnect)
+    app.register_user("solar-columbus", "producer", 750, "AEP-Columbus")
+    app.register_user("wind-akron", "producer", 500, "FirstEnergy-Akron")
+    app.register_user("solar-dayton", "producer", 300, "EVHub-Dayton")
+    app.register_user("ev-cleveland", "consumer", 250, "EVHub-Cleveland")
+    app.register_user("ev-columbus", "consumer", 250, "AEP-Columbus")
+    engine = MatchingEngine(app.registry, app.router, app.transactions if with_logger else None)
+    return app, engine
+
+
+def _request(kilowatt_hours, price_usd, station="EVHub-Cleveland"):
+    return EVChargeRequest(station, kilowatt_hours, price_usd, datetime(2025, 6, 1, 9, 0, 0), priority="fast-track")
+
+
+def test_bids_take_cheapest_reachable_asks_in_price_time_order():
+    app, engine = _market()
+    engine.submit_ask("ask-columbus", "solar-columbus", 0.20, 100)
+    engine.submit_ask("ask-akron-1", "wind-akron", 0.15, 40)
+    engine.submit_ask("ask-akron-2", "wind-akron", 0.15, 40)
+    engine.submit_ask("ask-dayton", "solar-dayton", 0.30, 100)
+
+    fills = engine.submit_bid("bid-1", "ev-cleveland", _request(120, 120 * 0.25))
+
+    assert [(fill.ask_id, fill.kilowatt_hours, fill.price_per_kwh) for fill in fills] == [
+        ("ask-akron-1", 40, 0.15),
+        ("ask-akron-2", 40, 0.15),
+        ("ask-columbus", 40, 0.20),
+    ]
+    assert fills[2].route == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+    assert engine.best_ask("AEP-Columbus") == 0.20
+    assert engine.orders["ask-columbus"].remaining_kwh == 60
+
+    entries = app.ledger_snapshot()
+    assert len(entries) == 3
+    assert entries[0]["bid_id"] == "bid-1"
+    assert [entry["tx_id"] for entry in entries] == [fill_tx_id(fill) for fill in fills]
+    assert entries[0]["tx_id"] == "fill-bid-1-ask-akron-1"
+    assert entries[0]["price_usd"] == 6.0
+    assert entries[0]["priority"] == "fast-track"
+
+
+def test_unreachable_or_overpriced_bids_rest_and_match_later_asks():
+    _, engine = _market(with_logger=False)
+    engine.submit_ask("ask-akron", "wind-akron", 0.10, 50)
+
+    assert engine.submit_bid("bid-columbus", "ev-columbus", _request(20, 4.0, station="AEP-Columbus")) == []
+    assert engine.submit_bid("bid-cheap", "ev-cleveland", _request(20, 1.0)) == []
+    assert engine.best_bid("EVHub-Cleveland") == 0.05
+
+    fills = engine.submit_ask("ask-columbus", "solar-columbus", 0.04, 100)
+    assert [(fill.bid_id, fill.kilowatt_hours, fill.price_per_kwh) for fill in fills] == [
+        ("bid-columbus", 20, 0.2),
+        ("bid-cheap", 20, 0.05),
+    ]
+    assert engine.cancel("ask-columbus")
+    assert engine.best_ask("AEP-Columbus") is None
+
+    # Filled or cancelled ids cannot come back, or their fills would reuse a tx_id.
+    for order_id in ("bid-columbus", "ask-columbus"):
+        with pytest.raises(ValueError, match="already used"):
+            engine.submit_ask(order_id, "solar-columbus", 0.04, 10)
+
+
+def test_topology_changes_reach_resting_orders():
+    config = deepcopy(OHIO_INTERCONNECT)
+    _, engine = _market(with_logger=False, interconnect=config)
+    engine.submit_ask("ask-columbus", "solar-columbus", 0.10, 100)
+    assert len(engine.submit_bid("bid-1", "ev-cleveland", _request(10, 2.0))) == 1
+
+    for source in ("Duke-Cincinnati", "FirstEnergy-Akron", "EVHub-Dayton"):
+        config.remove_edge(source, "EVHub-Cleveland")
+    assert engine.submit_bid("bid-2", "ev-cleveland", _request(10, 2.0)) == []
+    assert engine.best_bid("EVHub-Cleveland") == 0.2
+
+    config.add_edge("FirstEnergy-Akron", "EVHub-Cleveland")
+    fills = engine.submit_ask("ask-akron", "wind-akron", 0.12, 10)
+    assert [(fill.bid_id, fill.route) for fill in fills] == [("bid-2", ["FirstEnergy-Akron", "EVHub-Cleveland"])]
@@ -0,0 +1,84 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.frontend.cli import main
+from src.observability import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_histogram_buckets_stay_within_relative_error():
+    histogram = metrics.MetricRegistry().histogram("latency", "test", "seconds")
+    for value in range(1, 100_001):
+        histogram.record(value)
+        lowest, highest = metrics.bucket_bounds(metrics.bucket_index(value))
+        assert lowest <= value <= highest
+        assert highest - lowest <= max(lowest // 16, 0)
+
+    assert histogram.count == 100_000
+    assert histogram.min == 1 and histogram.max == 100_000
+    assert 50_000 <= histogram.percentile(0.5) <= 50_000 * 1.0625
+    assert 99_000 <= histogram.percentile(0.99) <= 99_000 * 1.0625
+    assert histogram.percentile(1.0) == 100_000
+    assert len(histogram.counts) < 250
+    assert histogram.snapshot()["p50"] == pytest.approx(histogram.percentile(0.5) * 1e-9)
+
+
+def test_disabled_metrics_record_nothing(tmp_path):
+    main(["--ledger-path", str(tmp_path / "ledger"), "bootstrap"])
+
+    assert all(
+        metric.count == 0 if isinstance(metric, metrics.Histogram) else metric.value == 0
+        for metric in metrics.REGISTRY.metrics.values()
+    )
+
+
+def test_cli_writes_prometheus_textfile(tmp_path):
+    prom = tmp_path / "gridshare.prom"
+    common = [
+        "--ledger-path",
+        str(tmp_path / "ledger"),
+        "--registry-path",
+        str(tmp_path / "registry"),
+        "--metrics-file",
+        str(prom),
+    ]
+    main(common + ["bootstrap"])
+    main(
+        common
+        + [
+            "request",
+            "--tx-id",
+            "tx-metrics",
+            "--kilowatt-hours",
+            "12",
+            "--price-usd",
+            "3",
+            "--desired-start",
+            "2025-06-01T10:00:00",
+        ]
+    )
+
+    snapshot = metrics.REGISTRY.snapshot()
+    assert snapshot["gridshare_registry_participants_registered_total"]["value"] == 2
+    assert snapshot["gridshare_transactions_logged_total"]["value"] == 1
+    assert snapshot["gridshare_ledger_entries_appended_total"]["value"] == 1
+    assert snapshot["gridshare_route_hops"]["count"] == 1
+    assert snapshot["gridshare_route_compute_seconds"]["count"] == 1
+
+    text = prom.read_text()
+    assert "# TYPE gridshare_route_compute_seconds histogram" in text
+    assert 'gridshare_transaction_log_seconds_bucket{le="+Inf"} 1' in text
+    assert "gridshare_transactions_logged_total 1" in text
+    assert not list(tmp_path.glob(".metrics-*"))
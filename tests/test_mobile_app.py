@@ -5,7 +5,7 @@ import sys
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.mobile.app import EVChargeRequest, P2PConnectApp
+from src.mobile.app import EVChargeOrder, EVChargeRequest, P2PConnectApp
 
 
 def test_vcpn_ev_charge_flow_records_route_and_metadata():
@@ -59,3 +59,41 @@ def test_hybrid_registration_is_supported():
     assert participant.participant_id == "prosumer-77"
     assert participant.role == "hybrid"
     assert app.registry.get("prosumer-77").metadata["node"] == "AEP-Prospect"
+
+
+def test_batch_requests_share_routes_and_reject_invalid_orders():
+    app = P2PConnectApp()
+    app.register_user(participant_id="solar-001", role="producer", capacity_kw=750, node="AEP-Columbus")
+    app.register_user(participant_id="ev-station-9", role="consumer", capacity_kw=200, node="EVHub-Cleveland")
+    app.register_user(participant_id="ev-depot-2", role="consumer", capacity_kw=200, node="AEP-Columbus")
+    request = EVChargeRequest(
+        station_id="EVHub-Cleveland",
+        kilowatt_hours=40.0,
+        price_usd=6.5,
+        desired_start=datetime(2025, 5, 10, 22, 0, 0),
+    )
+
+    route_calls = []
+    compute_route = app.router.compute_route
+
+    def counting_compute_route(producer, consumer):
+        route_calls.append((producer.participant_id, consumer.participant_id))
+        return compute_route(producer, consumer)
+
+    app.router.compute_route = counting_compute_route
+    orders = [EVChargeOrder(f"tx-{index}", request, "solar-001", "ev-station-9") for index in range(50)]
+    orders.append(EVChargeOrder("tx-3", request, "solar-001", "ev-station-9"))
+    orders.append(EVChargeOrder("tx-unknown", request, "solar-001", "ev-missing"))
+    orders.append(EVChargeOrder("tx-upstream", request, "ev-station-9", "ev-depot-2"))
+
+    result = app.request_ev_energy_batch(orders)
+
+    assert len(result.payloads) == 50
+    assert len(app.ledger_snapshot()) == 50
+    assert route_calls == [("solar-001", "ev-station-9"), ("ev-station-9", "ev-depot-2")]
+    assert result.payloads[0]["route"] == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+    result.payloads[0]["route"].append("tampered")
+    assert result.payloads[1]["route"] == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+    assert [tx_id for tx_id, _ in result.rejected] == ["tx-3", "tx-unknown", "tx-upstream"]
+    assert "not registered" in result.rejected[1][1]
+    assert "No available route" in result.rejected[2][1]
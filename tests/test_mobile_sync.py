@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.registration import Participant, Registry
+from src.backend.sync import SyncService, encode_batch
+from src.backend.transactions import TransactionLogger
+from src.ledger.adapter import LedgerAdapter
+from src.mobile.client import MobileClient
+from src.mobile.offline import OfflineQueue
+
+
+def _server():
+    registry = Registry(OHIO_INTERCONNECT)
+    registry.register(Participant("solar-1", "producer", 500, {"node": "AEP-Columbus"}))
+    registry.register(Participant("ev-1", "consumer", 150, {"node": "EVHub-Cleveland"}))
+    transactions = TransactionLogger(OHIO_INTERCONNECT, LedgerAdapter())
+    return registry, transactions, SyncService(registry, transactions)
+
+
+def _trade(index, consumer_id="ev-1"):
+    return {
+        "tx_id": f"tx-{index}",
+        "producer_id": "solar-1",
+        "consumer_id": consumer_id,
+        "kilowatt_hours": 10.0,
+        "price_usd": 1.5,
+        "timestamp": datetime(2025, 5, 1) + timedelta(minutes=index),
+        "ev_session_id": "EVHub-Cleveland",
+    }
+
+
+class _Flaky:
+    """Endpoint that is offline, or applies a batch and then loses the reply."""
+
+    def __init__(self, service, offline=False, lose_replies=0):
+        self.service = service
+        self.offline = offline
+        self.lose_replies = lose_replies
+
+    def handshake(self, device_id, epoch):
+        if self.offline:
+            raise ConnectionError("no signal")
+        return self.service.handshake(device_id, epoch)
+
+    def receive(self, data):
+        if self.offline:
+            raise ConnectionError("no signal")
+        reply = self.service.receive(data)
+        if self.lose_replies:
+            self.lose_replies -= 1
+            raise ConnectionError("reply lost")
+        return reply
+
+
+def test_offline_queue_survives_restart_and_syncs_in_compressed_batches(tmp_path):
+    registry, transactions, service = _server()
+    client = MobileClient(registry, transactions, OfflineQueue(tmp_path, "phone-7"))
+    for index in range(250):
+        assert client.queue_transaction(_trade(index), route=["AEP-Columbus", "EVHub-Cleveland"]) == index + 1
+    assert client.sync(_Flaky(service, offline=True)).offline
+    client.queue.close()
+    with open(tmp_path / "queue.jsonl", "a") as handle:
+        handle.write('{"seq": 251, "transa')  # killed mid-write
+
+    client = MobileClient(registry, transactions, OfflineQueue(tmp_path, "phone-7"))
+    assert client.queue.pending == 250 and client.queue.next_seq == 251
+    uncompressed = len(json.dumps(client.queue.peek(250), default=str))
+    result = client.sync(service, max_batch=100)
+
+    assert (result.batches, result.applied, result.pending) == (3, 250, 0)
+    assert transactions.ledger.entry_count == 250
+    assert service.high_water_mark("phone-7", client.queue.epoch) == 250
+    assert result.bytes_sent * 5 < uncompressed
+    assert (tmp_path / "queue.jsonl").read_text() == ""
+    entry = transactions.ledger.entry(249)
+    assert (entry["device_id"], entry["device_seq"], entry["route"]) == ("phone-7", 250, ["AEP-Columbus", "EVHub-Cleveland"])
+
+
+def test_lost_replies_and_server_restarts_apply_each_transaction_once(tmp_path):
+    registry, transactions, service = _server()
+    client = MobileClient(registry, transactions, OfflineQueue(tmp_path, "phone-7"))
+    for index in range(30):
+        client.queue_transaction(_trade(index, consumer_id="ev-404" if index == 29 else "ev-1"))
+
+    first = client.sync(_Flaky(service, lose_replies=1), max_batch=10)
+    assert first.offline and first.pending == 30
+    restarted = SyncService(registry, transactions)  # marks rebuilt from the ledger
+    assert restarted.handshake("phone-7", client.queue.epoch) == 10
+
+    second = client.sync(restarted, max_batch=10)
+    assert (second.applied, second.duplicates, second.pending) == (19, 0, 0)
+    assert second.rejected == [(30, "tx-29", "Participant ev-404 is not registered")]
+
+    # After another restart the mark falls back to 29, behind the rejected seq 30 the device dropped.
+    again = SyncService(registry, transactions)
+    assert again.handshake("phone-7", client.queue.epoch) == 29
+    client.queue_transaction(_trade(30))
+    assert client.sync(again).applied == 1
+    assert [entry["tx_id"] for entry in transactions.ledger.iter_entries()] == [
+        f"tx-{index}" for index in range(31) if index != 29
+    ]
+
+    with pytest.raises(ValueError, match="sequences must increase"):
+        again.receive(encode_batch("phone-7", client.queue.epoch, [{"seq": 40}, {"seq": 40}]))
+
+
+def test_wiped_device_starts_a_new_epoch_and_malformed_items_are_rejected(tmp_path):
+    registry, transactions, service = _server()
+    client = MobileClient(registry, transactions, OfflineQueue(tmp_path / "old", "phone-7"))
+    client.queue_transaction(_trade(0))
+    client.queue_transaction(_trade(1))
+    client.sync(service)
+
+    fresh = MobileClient(registry, transactions, OfflineQueue(tmp_path / "new", "phone-7"))
+    assert fresh.queue.epoch != client.queue.epoch
+    fresh.queue_transaction(_trade(1))  # resent from a backup: deduplicated on tx_id
+    fresh.queue_transaction(_trade(2))
+    fresh.queue.append({"tx_id": "tx-bad", "producer_id": "solar-1"})
+    fresh.queue.append(None)
+    result = fresh.sync(service)
+
+    assert (result.applied, result.duplicates, result.pending) == (1, 1, 0)
+    assert [row[:2] for row in result.rejected] == [(3, "tx-bad"), (4, None)]
+    assert [entry["tx_id"] for entry in transactions.ledger.iter_entries()] == ["tx-0", "tx-1", "tx-2"]
+    assert transactions.ledger.entry(2)["device_seq"] == 2
+
+
+def test_device_metadata_cannot_overwrite_trade_fields(tmp_path):
+    registry, transactions, service = _server()
+    client = MobileClient(registry, transactions, OfflineQueue(tmp_path, "phone-7"))
+    client.queue_transaction(_trade(0), additional_metadata={"producer_id": "victim", "price_usd": 0})
+    client.queue_transaction(_trade(1), additional_metadata={"device_seq": 99})
+    client.queue_transaction(_trade(2), additional_metadata={"app_version": "2.1"})
+    result = client.sync(service)
+
+    assert result.applied == 1
+    assert [(seq, tx_id) for seq, tx_id, _ in result.rejected] == [(1, "tx-0"), (2, "tx-1")]
+    assert result.rejected[0][2].endswith("metadata may not set price_usd, producer_id")
+    entry = transactions.ledger.entry(0)
+    assert (entry["tx_id"], entry["producer_id"], entry["price_usd"], entry["app_version"]) == ("tx-2", "solar-1", 1.5, "2.1")
+    assert [transaction.tx_id for transaction in transactions.transactions] == ["tx-2"]
@@ -0,0 +1,92 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import GridLine, InterconnectConfig
+from src.backend.power_flow import DCPowerFlow, FlowState
+
+
+def _triangle(capacity_mw=100.0):
+    return InterconnectConfig(
+        name="Triangle",
+        transmission_operator="Test",
+        compliance_rules=[],
+        utility_partners=[],
+        ev_charging_partners=[],
+        grid_nodes={"A": ["B", "C"], "B": ["A", "C"], "C": ["A", "B"], "D": ["E"], "E": []},
+        lines={"A": {"B": GridLine(capacity_mw=capacity_mw)}},
+    )
+
+
+def test_ptdf_splits_flow_over_parallel_paths_and_checks_batches():
+    model = DCPowerFlow(_triangle())
+    assert len(model.branches) == 4  # A-B, A-C, B-C, D-E
+    flows = dict(zip(model.branches, model.transfer("A", "B") * 90))
+    assert flows[("A", "B")] == pytest.approx(60.0)
+    assert flows[("A", "C")] == pytest.approx(30.0)
+    assert flows[("B", "C")] == pytest.approx(-30.0)
+
+    batch = np.column_stack(
+        [model.injections([("A", "B", 90)]), model.injections([("A", "B", 90), ("C", "B", 150)])]
+    )
+    loadings = model.loadings(batch)
+    assert loadings.shape == (4, 2)
+    assert loadings[model.branches.index(("A", "B")), 0] == pytest.approx(0.6)
+    assert list(model.feasible(batch)) == [True, False]
+
+    with pytest.raises(ValueError):
+        model.transfer("A", "D")
+
+
+def test_flow_state_updates_incrementally_and_after_topology_changes():
+    config = _triangle()
+    state = FlowState(DCPowerFlow(config))
+    state.add("t1", "A", "B", 90)
+    state.add("t2", "C", "A", 45)
+    expected = state.model.flows(state.model.injections(state.trades.values()))
+    assert np.allclose(state.flows, expected)
+
+    with pytest.raises(ValueError, match="A-B"):
+        state.add("t3", "C", "B", 200)
+    assert "t3" not in state.trades
+    assert list(state.check([[("C", "B", 200)], [("B", "A", 50)]])) == [False, True]
+
+    state.remove("t2")
+    assert np.allclose(state.flows, state.model.transfer("A", "B") * 90)
+
+    config.remove_edge("A", "C")
+    config.remove_edge("C", "A")
+    assert state.loadings()[state.model.branches.index(("A", "B"))] == pytest.approx(0.9)
+
+    state.add("t4", "C", "B", 30)
+    config.add_edge("A", "C")
+    state.remove("t4")  # first call after the topology change
+    assert np.allclose(state.flows, state.model.transfer("A", "B") * 90)
+
+
+def test_islanded_trades_keep_the_old_state_until_removed():
+    config = _triangle()
+    state = FlowState(DCPowerFlow(config))
+    state.add("t1", "A", "B", 30)
+    state.add("t2", "A", "C", 20)
+    for source, target in (("A", "C"), ("C", "A"), ("B", "C"), ("C", "B")):
+        if target in config.grid_nodes.get(source, []):
+            config.remove_edge(source, target)
+
+    assert state.islanded() == ["t2"]
+    for call in (state.loadings, lambda: state.check([[("A", "B", 1)]]), lambda: state.add("t3", "A", "B", 1)):
+        with pytest.raises(ValueError, match="t2"):
+            call()
+    assert set(state.trades) == {"t1", "t2"}
+
+    state.remove("t2")
+    assert set(state.trades) == {"t1"}
+    assert state.flows.shape == (len(state.model.branches),)
+    assert np.allclose(state.flows, state.model.transfer("A", "B") * 30)
+    assert list(state.check([[("A", "B", 1)]])) == [True]
@@ -0,0 +1,76 @@
+from copy import deepcopy
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import GridLine, OHIO_INTERCONNECT
+from src.backend.producer_locator import ProducerLocator
+from src.backend.registration import Participant, Registry
+from src.backend.registry_store import PersistentRegistry
+from src.mobile.app import P2PConnectApp
+
+
+def _register(registry, participant_id, node, role="producer", capacity_kw=100):
+    registry.register(Participant(participant_id, role, capacity_kw, {"node": node}))
+
+
+def test_nearest_and_cheapest_producers_for_a_node():
+    config = deepcopy(OHIO_INTERCONNECT)
+    config.lines = {"Duke-Cincinnati": {"EVHub-Cleveland": GridLine(loss_factor=0.1)}}
+    registry = Registry(config)
+    _register(registry, "duke-solar", "Duke-Cincinnati")
+    _register(registry, "aep-wind", "AEP-Columbus", capacity_kw=900)
+    _register(registry, "aep-hydro", "AEP-Columbus", role="hybrid", capacity_kw=300)
+    _register(registry, "akron-fleet", "FirstEnergy-Akron", role="consumer")
+    _register(registry, "akron-solar", "FirstEnergy-Akron")
+    locator = ProducerLocator(registry)
+
+    nearest = locator.nearest_producers("EVHub-Dayton", limit=3)
+    assert [(m.participant.participant_id, m.hops) for m in nearest] == [
+        ("duke-solar", 1),
+        ("aep-wind", 2),
+        ("aep-hydro", 2),
+    ]
+    assert [m.participant.participant_id for m in locator.nearest_producers("EVHub-Dayton", max_hops=1)] == [
+        "duke-solar"
+    ]
+    # FirstEnergy-Akron cannot reach Dayton at all.
+    assert "akron-solar" not in {m.participant.participant_id for m in locator.nearest_producers("EVHub-Dayton")}
+
+    cheapest = locator.nearest_producers("EVHub-Cleveland", limit=2, rank="cost")
+    assert [m.participant.participant_id for m in cheapest] == ["akron-solar", "duke-solar"]
+    assert cheapest[0].cost < cheapest[1].cost
+
+    with pytest.raises(ValueError):
+        locator.nearest_producers("EVHub-Dayton", rank="closest")
+
+
+def test_locator_follows_registrations_and_topology_changes():
+    app = P2PConnectApp(interconnect=deepcopy(OHIO_INTERCONNECT))
+    assert app.find_producers("EVHub-Dayton") == []
+
+    app.register_user("akron-solar", "producer", 200, "FirstEnergy-Akron")
+    assert app.find_producers("EVHub-Dayton") == []
+
+    app.interconnect.grid_nodes["FirstEnergy-Akron"].append("EVHub-Dayton")
+    matches = app.find_producers("EVHub-Dayton")
+    assert [(m.participant.participant_id, m.hops) for m in matches] == [("akron-solar", 1)]
+
+
+def test_persistent_registry_streams_only_producers(tmp_path, monkeypatch):
+    registry = PersistentRegistry(OHIO_INTERCONNECT, tmp_path / "registry", shards=4)
+    _register(registry, "prospect-wind", "AEP-Prospect", capacity_kw=300)
+    _register(registry, "columbus-hybrid", "AEP-Columbus", role="hybrid")
+    for index in range(20):
+        _register(registry, f"ev-{index}", "EVHub-Dayton", role="consumer")
+    monkeypatch.setattr(PersistentRegistry, "participants", property(lambda self: pytest.fail("loaded every participant")))
+
+    locator = ProducerLocator(registry)
+    assert {p.participant_id for p in registry.iter_participants(["consumer"])} == {f"ev-{i}" for i in range(20)}
+    matches = locator.nearest_producers("EVHub-Cleveland")
+    assert [(m.participant.participant_id, m.hops) for m in matches] == [("columbus-hybrid", 2), ("prospect-wind", 2)]
+    registry.close()
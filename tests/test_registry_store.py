@@ -0,0 +1,61 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.registration import Participant
+from src.backend.registry_store import PersistentRegistry
+from src.mobile.app import P2PConnectApp
+
+
+def _participant(participant_id, role="producer", node="AEP-Prospect"):
+    return Participant(participant_id=participant_id, role=role, capacity_kw=100, metadata={"node": node})
+
+
+def test_participants_persist_across_reopen_and_are_indexed_by_node(tmp_path):
+    registry = PersistentRegistry(OHIO_INTERCONNECT, tmp_path, shards=4)
+    registry.register_many(
+        [_participant(f"meter-{index}", role="consumer" if index % 3 else "producer") for index in range(30)]
+    )
+    registry.register(_participant("ev-1", role="consumer", node="EVHub-Cleveland"))
+    registry.close()
+
+    reopened = PersistentRegistry(OHIO_INTERCONNECT, tmp_path, shards=16)
+    assert reopened.shard_count == 4
+    assert len(reopened.entries) == 31
+    assert reopened.contains("meter-7") and not reopened.contains("meter-99")
+    assert reopened.get("ev-1").metadata == {"node": "EVHub-Cleveland"}
+    assert sorted(reopened.get_many(["meter-0", "meter-99", "ev-1"])) == ["ev-1", "meter-0"]
+    producers = reopened.by_node("AEP-Prospect", role="producer")
+    assert sorted(p.participant_id for p in producers) == sorted(f"meter-{index}" for index in range(0, 30, 3))
+    with pytest.raises(KeyError):
+        reopened.get("meter-99")
+    reopened.close()
+
+
+def test_register_many_is_atomic(tmp_path):
+    registry = PersistentRegistry(OHIO_INTERCONNECT, tmp_path)
+    registry.register(_participant("taken"))
+
+    with pytest.raises(ValueError):
+        registry.register_many([_participant("fresh"), _participant("taken")])
+    with pytest.raises(ValueError):
+        registry.register_many([_participant("fresh"), _participant("bad", role="prosumer")])
+
+    assert not registry.contains("fresh")
+    assert list(registry.entries) == ["taken"]
+    registry.close()
+
+
+def test_app_runs_on_persistent_registry(tmp_path):
+    app = P2PConnectApp(registry=PersistentRegistry(OHIO_INTERCONNECT, tmp_path))
+    app.register_user("solar-1", "producer", 500, "AEP-Columbus")
+    app.register_user("ev-1", "consumer", 150, "EVHub-Cleveland")
+
+    assert [p.participant_id for p in app.registry.by_node("AEP-Columbus")] == ["solar-1"]
+    assert app.registry.participants.keys() == {"solar-1", "ev-1"}
+    app.registry.close()
@@ -0,0 +1,112 @@
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ledger.integrity import HashChain
+from src.ledger.remote import (
+    LedgerConflict,
+    LedgerSubmissionError,
+    LedgerUnavailable,
+    LocalLedgerNode,
+    RemoteLedgerAdapter,
+    idempotency_key,
+)
+
+
+def _entries(count, prefix="tx"):
+    return [{"tx_id": f"{prefix}-{index}", "kilowatt_hours": 1.0} for index in range(count)]
+
+
+def test_pipelined_batches_hide_round_trip_latency():
+    node = LocalLedgerNode(latency=0.02)
+    ledger = RemoteLedgerAdapter(node, pool_size=4, max_batch=32)
+    chain = HashChain().attach(ledger)
+    started = time.perf_counter()
+    futures = [ledger.submit(entry) for entry in _entries(400)]
+    ledger.append_entries(_entries(100, prefix="batch"))
+    ledger.flush(timeout=10)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0  # one entry per 20 ms round trip would take 10 s
+    assert node.calls < 60
+    assert len({future.result() for future in futures}) == 400
+    assert len(node.entries) == 500
+    assert ledger.entry_count == 500 and chain.entry_count == 500
+    assert ledger.submit(_entries(1)[0]).result(timeout=1) == futures[0].result()
+    assert len(node.entries) == 500  # the node stored tx-0 once
+    ledger.close()
+
+
+def test_retries_are_idempotent_and_exhaustion_is_reported():
+    node = LocalLedgerNode(failure_rate=0.4, seed=7)
+    ledger = RemoteLedgerAdapter(node, pool_size=3, max_batch=8, retries=20, backoff=0.0)
+    futures = [ledger.submit(entry) for entry in _entries(200)]
+    ledger.flush(timeout=10)
+    assert all(future.exception() is None for future in futures)
+    assert sorted(entry["tx_id"] for entry in node.entries) == sorted(f"tx-{index}" for index in range(200))
+    ledger.close()
+
+    node = LocalLedgerNode(failure_rate=1.0, seed=1)
+    broken = RemoteLedgerAdapter(node, pool_size=1, retries=2, backoff=0.0)
+    future = broken.submit({"tx_id": "tx-lost"})
+    broken.submit({"tx_id": "tx-later"})
+    with pytest.raises(LedgerSubmissionError) as excinfo:
+        broken.flush(timeout=5)
+    assert sorted(excinfo.value.failed) == ["tx-later", "tx-lost"]
+    assert isinstance(future.exception(), LedgerUnavailable)
+    assert broken.entry_count == 2  # still readable locally
+
+    node.failure_rate = 0.0
+    resent = broken.submit({"tx_id": "tx-lost"})
+    assert resent.result(timeout=5) == 0
+    assert [future.result(timeout=5) for future in broken.retry_failed()] == [1]
+    broken.flush(timeout=5)
+    assert broken.entry_count == 2 and len(node.entries) == 2  # resending never re-appends locally
+    assert broken.submit({"tx_id": "tx-lost"}).result(timeout=1) == 0
+    broken.close()
+
+
+def test_reusing_a_key_for_a_different_payload_is_a_conflict():
+    node = LocalLedgerNode()
+    ledger = RemoteLedgerAdapter(node, pool_size=1)
+    ledger.submit({"tx_id": "fill-1", "kilowatt_hours": 5.0}).result(timeout=5)
+    with pytest.raises(LedgerConflict):
+        ledger.submit({"tx_id": "fill-1", "kilowatt_hours": 7.0})
+    with pytest.raises(LedgerConflict):
+        ledger.append_entries([{"tx_id": "fill-2", "kilowatt_hours": 1.0}, {"tx_id": "fill-2", "kilowatt_hours": 2.0}])
+    assert ledger.entry_count == 1
+
+    other = RemoteLedgerAdapter(node, pool_size=1)  # a second writer with its own fill counter
+    clash = other.submit({"tx_id": "fill-1", "kilowatt_hours": 9.0})
+    fine = other.submit({"tx_id": "fill-9", "kilowatt_hours": 9.0})
+    with pytest.raises(LedgerSubmissionError) as excinfo:
+        other.flush(timeout=5)
+    assert excinfo.value.conflicts == ["fill-1"] and isinstance(clash.exception(), LedgerConflict)
+    assert fine.result() == 1
+    assert [entry["kilowatt_hours"] for entry in node.entries] == [5.0, 9.0]
+    ledger.close()
+    other.close()
+
+
+def test_reappending_a_keyed_entry_does_not_duplicate_it_locally():
+    node = LocalLedgerNode()
+    ledger = RemoteLedgerAdapter(node, pool_size=2)
+    entry = {"tx_id": "tx-1", "kilowatt_hours": 1.0}
+    ledger.append_entry(entry)
+    ledger.append_entry(dict(entry))
+    ledger.append_entries([dict(entry), {"tx_id": "tx-2"}, {"tx_id": "tx-2"}, {"note": "unkeyed"}])
+    ledger.flush(timeout=5)
+    ledger.append_entries([dict(entry)])
+    ledger.flush(timeout=5)
+    assert [item.get("tx_id") for item in ledger.iter_entries()] == ["tx-1", "tx-2", None]
+    assert len(node.entries) == 3
+    ledger.close()
+
+    moved = {"entry_type": "reservation", "action": "moved", "reservation_id": "tx-1", "sequence": 1}
+    assert idempotency_key(moved) == "reservation:tx-1:1"
+    assert idempotency_key({**moved, "sequence": 2}) != idempotency_key(moved)
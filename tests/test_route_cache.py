@@ -0,0 +1,105 @@
+from copy import deepcopy
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import GridLine, OHIO_INTERCONNECT
+from src.backend.routing import Router
+
+
+def _warm(router):
+    pairs = [
+        ("AEP-Columbus", "EVHub-Cleveland"),
+        ("AEP-Prospect", "EVHub-Cleveland"),
+        ("Duke-Cincinnati", "EVHub-Dayton"),
+        ("FirstEnergy-Akron", "EVHub-Dayton"),
+    ]
+    return {pair: router.route_between(*pair) for pair in pairs}
+
+
+@pytest.mark.parametrize("mode", ["bfs", "table", "weighted"])
+def test_edge_removal_only_evicts_routes_using_the_edge(mode):
+    config = deepcopy(OHIO_INTERCONNECT)
+    router = Router(config, mode=mode)
+    routes = _warm(router)
+    assert routes[("AEP-Columbus", "EVHub-Cleveland")] == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+    assert routes[("FirstEnergy-Akron", "EVHub-Dayton")] == []
+
+    config.remove_edge("Duke-Cincinnati", "EVHub-Cleveland")
+    assert router.route_between("Duke-Cincinnati", "EVHub-Dayton") == ["Duke-Cincinnati", "EVHub-Dayton"]
+    assert router.cached_routes == 3
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland") in (
+        ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Dayton", "EVHub-Cleveland"],
+        ["AEP-Columbus", "Duke-Cincinnati", "FirstEnergy-Akron", "EVHub-Cleveland"],
+        ["AEP-Columbus", "AEP-Prospect", "FirstEnergy-Akron", "EVHub-Cleveland"],
+    )
+
+    # A new edge evicts only the routes it can shorten.
+    config.add_edge("FirstEnergy-Akron", "EVHub-Dayton")
+    assert router.route_between("AEP-Prospect", "EVHub-Cleveland") == [
+        "AEP-Prospect",
+        "FirstEnergy-Akron",
+        "EVHub-Cleveland",
+    ]
+    assert router.cached_routes == 3
+    assert router.route_between("FirstEnergy-Akron", "EVHub-Dayton") == ["FirstEnergy-Akron", "EVHub-Dayton"]
+
+
+def test_node_outage_and_restore():
+    config = deepcopy(OHIO_INTERCONNECT)
+    router = Router(config)
+    _warm(router)
+
+    config.set_node_in_service("Duke-Cincinnati", False)
+    assert router.route_between("Duke-Cincinnati", "EVHub-Dayton") == []
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland") == [
+        "AEP-Columbus",
+        "AEP-Prospect",
+        "FirstEnergy-Akron",
+        "EVHub-Cleveland",
+    ]
+    assert router.route_between("AEP-Prospect", "EVHub-Cleveland") == [
+        "AEP-Prospect",
+        "FirstEnergy-Akron",
+        "EVHub-Cleveland",
+    ]
+
+    config.set_node_in_service("Duke-Cincinnati", True)
+    assert {node: sorted(neighbors) for node, neighbors in config.grid_nodes.items()} == {
+        node: sorted(neighbors) for node, neighbors in OHIO_INTERCONNECT.grid_nodes.items()
+    }
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland") == [
+        "AEP-Columbus",
+        "Duke-Cincinnati",
+        "EVHub-Cleveland",
+    ]
+    assert router.route_between("Duke-Cincinnati", "EVHub-Dayton") == ["Duke-Cincinnati", "EVHub-Dayton"]
+
+
+def test_curtailment_and_direct_edits():
+    config = deepcopy(OHIO_INTERCONNECT)
+    router = Router(config, mode="weighted")
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland", demand_mw=50) == [
+        "AEP-Columbus",
+        "Duke-Cincinnati",
+        "EVHub-Cleveland",
+    ]
+
+    config.set_line("Duke-Cincinnati", "EVHub-Cleveland", GridLine(capacity_mw=10))
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland", demand_mw=50) == [
+        "AEP-Columbus",
+        "AEP-Prospect",
+        "FirstEnergy-Akron",
+        "EVHub-Cleveland",
+    ]
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland", demand_mw=5)[1] == "Duke-Cincinnati"
+
+    # Edits outside the topology API drop the whole cache.
+    config.grid_nodes["AEP-Columbus"] = ["AEP-Prospect"]
+    assert router.route_between("AEP-Columbus", "EVHub-Cleveland", demand_mw=5)[1] == "AEP-Prospect"
+    with pytest.raises(KeyError):
+        config.remove_edge("AEP-Columbus", "Duke-Cincinnati")
@@ -0,0 +1,57 @@
+from copy import deepcopy
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import OHIO_INTERCONNECT
+from src.backend.registration import Participant
+from src.backend.route_table import RouteTable
+from src.backend.routing import Router
+
+
+def _participants(producer_node="AEP-Columbus", consumer_node="EVHub-Cleveland"):
+    producer = Participant(participant_id="p1", role="producer", capacity_kw=500, metadata={"node": producer_node})
+    consumer = Participant(participant_id="c1", role="consumer", capacity_kw=250, metadata={"node": consumer_node})
+    return producer, consumer
+
+
+def test_table_mode_matches_bfs_for_every_pair():
+    bfs = Router(OHIO_INTERCONNECT)
+    table = RouteTable(OHIO_INTERCONNECT)
+    table.build_all()
+    graph = OHIO_INTERCONNECT.grid_nodes
+    for start in graph:
+        for goal in graph:
+            assert table.lookup(start, goal) == bfs._shortest_path(graph, start, goal)
+
+    assert table.next_hop("AEP-Columbus", "EVHub-Cleveland") == "Duke-Cincinnati"
+
+
+def test_table_rebuilds_when_grid_nodes_change():
+    config = deepcopy(OHIO_INTERCONNECT)
+    router = Router(config, mode="table")
+    producer, consumer = _participants()
+    assert router.compute_route(producer, consumer) == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+
+    config.grid_nodes["Duke-Cincinnati"].remove("EVHub-Cleveland")
+    assert router.compute_route(producer, consumer) == [
+        "AEP-Columbus",
+        "Duke-Cincinnati",
+        "FirstEnergy-Akron",
+        "EVHub-Cleveland",
+    ]
+
+    config.grid_nodes = {"AEP-Columbus": ["EVHub-Cleveland"], "EVHub-Cleveland": []}
+    assert router.compute_route(producer, consumer) == ["AEP-Columbus", "EVHub-Cleveland"]
+
+
+def test_table_mode_reports_unreachable_consumers():
+    router = Router(OHIO_INTERCONNECT, mode="table")
+    producer, consumer = _participants(producer_node="EVHub-Cleveland", consumer_node="AEP-Columbus")
+
+    with pytest.raises(ValueError, match="No available route"):
+        router.compute_route(producer, consumer)
@@ -0,0 +1,106 @@
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.scheduling import CapacityError
+from src.mobile.app import EVChargeOrder, EVChargeRequest, P2PConnectApp
+
+START = datetime(2025, 6, 1, 10, 0, 0)
+
+
+def _app():
+    app = P2PConnectApp(enforce_capacity=True)
+    app.register_user("solar-farm", "producer", 750, "AEP-Columbus")
+    for index in range(4):
+        app.register_user(f"ev-hub-{index}", "consumer", 300, "EVHub-Cleveland")
+    return app
+
+
+def _request(kilowatt_hours=150.0, priority="standard", start=START):
+    return EVChargeRequest("EVHub-Cleveland", kilowatt_hours, 30.0, start, priority=priority)
+
+
+def test_producer_capacity_cannot_be_oversold():
+    app = _app()
+    first = app.request_ev_energy("tx-1", _request(), "solar-farm", "ev-hub-0")
+    app.request_ev_energy("tx-2", _request(), "solar-farm", "ev-hub-1")
+
+    assert first["reserved_from"] == "2025-06-01T10:00:00"
+    assert first["reserved_until"] == "2025-06-01T10:30:00"
+    assert app.scheduler.committed_kw("solar-farm", START) == 600
+
+    with pytest.raises(CapacityError):
+        app.request_ev_energy("tx-3", _request(), "solar-farm", "ev-hub-2")
+    assert app.ledger.entry_count == 2
+
+    result = app.request_ev_energy_batch(
+        [
+            EVChargeOrder("tx-4", _request(), "solar-farm", "ev-hub-2"),
+            EVChargeOrder("tx-5", _request(start=datetime(2025, 6, 1, 11)), "solar-farm", "ev-hub-2"),
+        ]
+    )
+    assert [tx_id for tx_id, _ in result.rejected] == ["tx-4"]
+    assert [payload["tx_id"] for payload in result.payloads] == ["tx-5"]
+
+
+def test_fast_track_displaces_standard_reservations():
+    app = _app()
+    app.request_ev_energy("tx-std-1", _request(), "solar-farm", "ev-hub-0")
+    app.request_ev_energy("tx-std-2", _request(), "solar-farm", "ev-hub-1")
+
+    app.request_ev_energy("tx-fast", _request(priority="fast-track"), "solar-farm", "ev-hub-2")
+
+    reservations = app.scheduler.reservations
+    assert reservations["tx-fast"].start_slot == app.scheduler.slot_of(START)
+    assert reservations["tx-std-1"].start_slot == app.scheduler.slot_of(START)
+    assert app.scheduler.slot_start(reservations["tx-std-2"].start_slot) == datetime(2025, 6, 1, 10, 30)
+    assert [entry.get("tx_id") for entry in app.ledger.iter_entries()] == ["tx-std-1", "tx-std-2", "tx-fast", None]
+    assert app.ledger.entry(3) == {
+        "entry_type": "reservation",
+        "action": "moved",
+        "reservation_id": "tx-std-2",
+        "sequence": 1,
+        "previous_from": "2025-06-01T10:00:00",
+        "reserved_from": "2025-06-01T10:30:00",
+        "reserved_until": "2025-06-01T11:00:00",
+        "reserved_kw": 300,
+    }
+
+    # Within one batch, a displaced trade is logged with its final reservation instead.
+    batch = _app().request_ev_energy_batch(
+        [
+            EVChargeOrder("tx-a", _request(), "solar-farm", "ev-hub-0"),
+            EVChargeOrder("tx-b", _request(), "solar-farm", "ev-hub-1"),
+            EVChargeOrder("tx-c", _request(priority="fast-track"), "solar-farm", "ev-hub-2"),
+        ]
+    )
+    assert [payload["reserved_from"] for payload in batch.payloads] == [
+        "2025-06-01T10:00:00",
+        "2025-06-01T10:30:00",
+        "2025-06-01T10:00:00",
+    ]
+
+
+def test_curtailment_rebalances_standard_before_fast_track():
+    app = _app()
+    app.request_ev_energy("tx-fast", _request(priority="fast-track"), "solar-farm", "ev-hub-0")
+    app.request_ev_energy("tx-std", _request(), "solar-farm", "ev-hub-1")
+
+    report = app.scheduler.set_capacity("solar-farm", 400)
+
+    assert [moved[0] for moved in report.moved] == ["tx-std"]
+    assert report.dropped == []
+    assert app.ledger.entry(2)["action"] == "moved" and app.ledger.entry(2)["reserved_from"] == "2025-06-01T10:30:00"
+    assert app.scheduler.committed_kw("solar-farm", START) == 300
+    assert app.scheduler.committed_kw("solar-farm", datetime(2025, 6, 1, 10, 30)) == 300
+
+    app.scheduler.max_shift_slots = 0
+    report = app.scheduler.set_capacity("solar-farm", 100)
+    assert sorted(report.dropped) == ["tx-fast", "tx-std"]
+    dropped = [entry["reservation_id"] for entry in app.ledger.iter_entries(3) if entry["action"] == "dropped"]
+    assert sorted(dropped) == ["tx-fast", "tx-std"]
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.settlement import SettlementEngine
+from src.frontend.cli import GridShareCLI
+from src.ledger.adapter import LedgerAdapter
+from src.ledger.file_adapter import FileLedgerAdapter
+
+
+def _trade(tx_id, producer_id, consumer_id, kilowatt_hours, price_usd, timestamp):
+    return {
+        "tx_id": tx_id,
+        "producer_id": producer_id,
+        "consumer_id": consumer_id,
+        "kilowatt_hours": kilowatt_hours,
+        "price_usd": price_usd,
+        "timestamp": timestamp,
+    }
+
+
+def test_balances_update_incrementally_and_windows_net_positions():
+    ledger = LedgerAdapter()
+    engine = SettlementEngine("hourly").attach(ledger)
+    ledger.append_entries(
+        [
+            _trade("tx-1", "solar-1", "ev-1", 10.0, 2.0, "2025-06-01T10:05:00"),
+            _trade("tx-2", "solar-1", "ev-2", 5.0, 1.5, "2025-06-01T10:40:00"),
+            _trade("tx-3", "hybrid-1", "solar-1", 4.0, 0.5, "2025-06-01T11:15:00"),
+        ]
+    )
+
+    assert engine.balance("solar-1").kwh_delivered == 15.0
+    assert engine.balance("solar-1").kwh_received == 4.0
+    assert engine.balance("solar-1").net_usd == pytest.approx(3.0)
+    assert engine.balance("nobody").trades == 0
+    assert engine.open_windows == [datetime(2025, 6, 1, 10), datetime(2025, 6, 1, 11)]
+
+    batches = engine.settle(until=datetime(2025, 6, 1, 11, 30))
+    assert [batch["settlement_id"] for batch in batches] == ["settle-hourly-2025-06-01T10:00:00"]
+    batch = batches[0]
+    assert batch["entry_type"] == "settlement"
+    assert batch["trade_count"] == 2
+    assert (batch["first_position"], batch["last_position"]) == (0, 1)
+    positions = {position["participant_id"]: position for position in batch["positions"]}
+    assert positions["solar-1"]["net_usd"] == 3.5
+    assert positions["ev-1"]["usd_owed"] == 2.0
+    assert sum(position["net_usd"] for position in batch["positions"]) == pytest.approx(0.0)
+    assert ledger.entry(ledger.entry_count - 1) is batch
+    assert engine.open_windows == [datetime(2025, 6, 1, 11)]
+    # the engine ignores its own batches when updating balances
+    assert engine.balance("solar-1").trades == 3
+
+    ledger.append_entry(_trade("tx-4", "solar-1", "ev-1", 1.0, 0.25, "2025-06-01T10:59:00"))
+    late = engine.settle()
+    assert [batch["settlement_id"] for batch in late] == [
+        "settle-hourly-2025-06-01T10:00:00-1",
+        "settle-hourly-2025-06-01T11:00:00",
+    ]
+    assert engine.open_windows == []
+
+    with pytest.raises(ValueError):
+        SettlementEngine("weekly")
+
+
+def test_replay_skips_settled_windows_and_renders(tmp_path):
+    ledger = FileLedgerAdapter(tmp_path / "ledger")
+    engine = SettlementEngine("daily").attach(ledger)
+    ledger.append_entry(_trade("tx-1", "solar-1", "ev-1", 10.0, 2.0, "2025-06-01T10:05:00"))
+    ledger.append_entry(_trade("tx-2", "solar-1", "ev-1", 3.0, 1.0, "2025-06-02T09:00:00"))
+    assert len(engine.settle(until=datetime(2025, 6, 2))) == 1
+    ledger.close()
+
+    reopened = FileLedgerAdapter(tmp_path / "ledger")
+    replayed = SettlementEngine("daily").attach(reopened)
+    assert replayed.balance("ev-1").kwh_received == 13.0
+    assert replayed.open_windows == [datetime(2025, 6, 2)]
+    assert [batch["window_start"] for batch in replayed.settle()] == ["2025-06-02T00:00:00"]
+
+    lines = GridShareCLI().render_ledger(reopened.iter_entries()).splitlines()
+    assert lines[-2].startswith("- Settlement settle-daily-2025-06-02T00:00:00: ")
+    assert lines[-1] == "  Net USD: ev-1 -1.00 | solar-1 +1.00"
+    reopened.close()
+
+
+def test_aware_timestamps_net_into_utc_windows():
+    ledger = LedgerAdapter()
+    engine = SettlementEngine("hourly").attach(ledger)
+    eastern = timezone(timedelta(hours=-4))
+    ledger.append_entries(
+        [
+            _trade("tx-1", "solar-1", "ev-1", 10.0, 2.0, "2025-06-01T14:10:00"),
+            _trade("tx-2", "solar-1", "ev-1", 5.0, 1.0, datetime(2025, 6, 1, 10, 20, tzinfo=eastern).isoformat()),
+            _trade("tx-3", "solar-1", "ev-1", 1.0, 0.5, "2025-06-01T14:50:00+00:00"),
+        ]
+    )
+
+    assert engine.open_windows == [datetime(2025, 6, 1, 14)]
+    assert engine.settle(until=datetime(2025, 6, 1, 11, tzinfo=eastern))[0]["trade_count"] == 3
+
+
+def test_state_round_trip_resumes_from_its_position():
+    ledger = LedgerAdapter()
+    engine = SettlementEngine("hourly").attach(ledger)
+    ledger.append_entry(_trade("tx-1", "solar-1", "ev-1", 10.0, 2.0, "2025-06-01T10:05:00"))
+    engine.settle(until=datetime(2025, 6, 1, 11))
+    ledger.append_entry(_trade("tx-2", "solar-1", "ev-1", 4.0, 1.0, "2025-06-01T10:30:00"))
+    state = engine.state()
+    ledger.append_entry(_trade("tx-3", "solar-1", "ev-1", 2.0, 0.5, "2025-06-01T11:30:00"))
+
+    restored = SettlementEngine.from_state(state).attach(ledger)
+    assert restored.balance("ev-1").kwh_received == 16.0
+    assert restored.open_windows == engine.open_windows
+    assert [batch["settlement_id"] for batch in restored.settle()] == [
+        "settle-hourly-2025-06-01T10:00:00-1",
+        "settle-hourly-2025-06-01T11:00:00",
+    ]
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.snapshots import SnapshotStore, decode_snapshot
+from src.frontend.cli import main
+from src.ledger.file_adapter import FileLedgerAdapter
+from src.mobile.app import EVChargeRequest, P2PConnectApp
+
+
+def _app(tmp_path, every=3):
+    app = P2PConnectApp(ledger=FileLedgerAdapter(tmp_path / "ledger"))
+    return app, app.enable_snapshots(str(tmp_path / "snapshots"), every=every)
+
+
+def _charge(app, tx_id, hour, tzinfo=None):
+    request = EVChargeRequest("EVHub-Cleveland", 10.0, 2.5, datetime(2025, 6, 1, hour, tzinfo=tzinfo))
+    app.request_ev_energy(tx_id, request, "solar-1", "ev-1")
+
+
+def test_recovery_loads_snapshot_then_replays_only_the_tail(tmp_path):
+    app, snapshotter = _app(tmp_path)
+    app.register_user("solar-1", "producer", 500, "AEP-Columbus", {"resource": "solar farm"})
+    app.register_user("ev-1", "consumer", 150, "EVHub-Cleveland")
+    for index in range(4):
+        _charge(app, f"tx-{index}", 8 + index, timezone.utc if index == 1 else None)
+    store = snapshotter.store
+    assert [path.name for path in store.paths()] == ["snapshot-000000000003.gss"]
+    assert store.journal_path.read_bytes() == b""
+    app.register_user("hybrid-1", "hybrid", 50, "AEP-Prospect")
+    snapshotter.close()
+    app.ledger.close()
+
+    restored, _ = _app(tmp_path)
+    assert restored.registry.get("solar-1").metadata == {"node": "AEP-Columbus", "resource": "solar farm"}
+    assert restored.registry.contains("hybrid-1")  # registered after the snapshot, kept by the journal
+    assert [transaction.tx_id for transaction in restored.transactions.transactions] == [
+        "tx-0",
+        "tx-1",
+        "tx-2",
+        "tx-3",
+    ]
+    assert restored.transactions.store[1].timestamp == datetime(2025, 6, 1, 9, tzinfo=timezone.utc)
+    assert restored.transactions.store.total_kwh_by_producer() == {"solar-1": 40.0}
+    restored.ledger.close()
+
+
+def test_corrupt_snapshot_falls_back_to_older_one(tmp_path):
+    app, snapshotter = _app(tmp_path, every=0)
+    app.register_user("solar-1", "producer", 500, "AEP-Columbus")
+    app.register_user("ev-1", "consumer", 150, "EVHub-Cleveland")
+    _charge(app, "tx-0", 8)
+    snapshotter.snapshot()
+    _charge(app, "tx-1", 9)
+    newest = snapshotter.snapshot()
+    newest.write_bytes(newest.read_bytes()[:-1] + b"\x00")
+    snapshotter.close()
+    app.ledger.close()
+
+    with pytest.raises(ValueError, match="checksum"):
+        decode_snapshot(newest.read_bytes())
+    assert SnapshotStore(tmp_path / "snapshots").latest().position == 1
+    restored, _ = _app(tmp_path)
+    assert len(restored.transactions.store) == 2
+    restored.ledger.close()
+
+
+def test_snapshot_ahead_of_a_crashed_ledger_is_skipped(tmp_path):
+    app, snapshotter = _app(tmp_path, every=0)
+    app.register_user("solar-1", "producer", 500, "AEP-Columbus")
+    app.register_user("ev-1", "consumer", 150, "EVHub-Cleveland")
+    _charge(app, "tx-0", 8)
+    snapshotter.snapshot()
+    _charge(app, "tx-1", 9)
+    snapshotter.snapshot()
+    snapshotter.close()
+    app.ledger.close()
+
+    # A ledger that lost its last entry, as after a power cut before the group fsync.
+    original = FileLedgerAdapter(tmp_path / "ledger")
+    survivor = FileLedgerAdapter(tmp_path / "survivor")
+    survivor.append_entry(original.entry(0))
+    original.close()
+    restored = P2PConnectApp(ledger=survivor)
+    restored.enable_snapshots(str(tmp_path / "snapshots"))
+    assert [transaction.tx_id for transaction in restored.transactions.transactions] == ["tx-0"]
+    assert restored.registry.contains("solar-1")
+    survivor.close()
+
+
+def test_cli_registrations_survive_restarts_with_snapshots(tmp_path):
+    common = ["--ledger-path", str(tmp_path / "ledger"), "--snapshot-path", str(tmp_path / "snapshots")]
+    main(common + ["bootstrap", "--producer-id", "solar-x"])
+    request = ["request", "--tx-id", "tx-1", "--producer-id", "solar-x", "--kilowatt-hours", "5", "--price-usd", "1"]
+    main(common + request + ["--desired-start", "2025-06-01T10:00:00"])
+    snapshot = SnapshotStore(tmp_path / "snapshots").latest()
+    assert snapshot.position == 1
+    assert sorted(participant.participant_id for participant in snapshot.participants) == [
+        "ev-station-demo",
+        "solar-x",
+    ]
+
+
+def test_cli_settle_restores_engine_from_snapshot(tmp_path, monkeypatch, capsys):
+    common = ["--ledger-path", str(tmp_path / "ledger"), "--snapshot-path", str(tmp_path / "snapshots")]
+    main(common + ["bootstrap", "--producer-id", "solar-x"])
+    request = ["request", "--producer-id", "solar-x", "--kilowatt-hours", "5", "--price-usd", "1"]
+    main(common + request + ["--tx-id", "tx-1", "--desired-start", "2025-06-01T10:00:00"])
+    main(common + ["settle", "--until", "2025-06-01T11:00:00"])
+    main(common + request + ["--tx-id", "tx-2", "--desired-start", "2025-06-01T11:00:00"])
+    snapshot = SnapshotStore(tmp_path / "snapshots").latest()
+    assert [(state["window"], state["position"]) for state in snapshot.settlements] == [("hourly", 3)]
+
+    replayed = []
+    original = FileLedgerAdapter.iter_entries
+
+    def iter_entries(self, start=0):
+        replayed.append(start)
+        return original(self, start)
+
+    monkeypatch.setattr(FileLedgerAdapter, "iter_entries", iter_entries)
+    capsys.readouterr()
+    main(common + ["settle", "--until", "2025-06-01T12:00:00+00:00"])
+    assert 0 not in replayed
+    output = capsys.readouterr().out
+    assert "settle-hourly-2025-06-01T11:00:00" in output
+    assert "solar-x: delivered 10.00 kWh, received 0.00 kWh, net $+2.00 over 2 trades" in output
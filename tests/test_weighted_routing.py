@@ -0,0 +1,81 @@
+from copy import deepcopy
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.backend.config import GridLine, OHIO_INTERCONNECT
+from src.backend.registration import Participant
+from src.backend.routing import Router
+from src.backend.weighted_routing import WeightedRoutingEngine, preferred_owner
+
+
+def _participants():
+    producer = Participant(participant_id="p1", role="producer", capacity_kw=50_000, metadata={"node": "AEP-Columbus"})
+    consumer = Participant(participant_id="c1", role="consumer", capacity_kw=50_000, metadata={"node": "EVHub-Cleveland"})
+    return producer, consumer
+
+
+def test_weighted_mode_defaults_to_the_bfs_route():
+    router = Router(OHIO_INTERCONNECT, mode="weighted")
+    producer, consumer = _participants()
+
+    assert preferred_owner(OHIO_INTERCONNECT) == "AEP"
+    assert router.compute_route(producer, consumer) == ["AEP-Columbus", "Duke-Cincinnati", "EVHub-Cleveland"]
+
+
+def test_weighted_mode_avoids_congested_and_lossy_lines():
+    config = deepcopy(OHIO_INTERCONNECT)
+    config.lines = {
+        "AEP-Prospect": {"FirstEnergy-Akron": GridLine(loss_factor=0.08)},
+        "Duke-Cincinnati": {
+            "EVHub-Cleveland": GridLine(capacity_mw=10),
+            "FirstEnergy-Akron": GridLine(loss_factor=0.08),
+        },
+    }
+    router = Router(config, mode="weighted")
+    producer, consumer = _participants()
+
+    assert router.compute_route(producer, consumer) == [
+        "AEP-Columbus",
+        "Duke-Cincinnati",
+        "EVHub-Dayton",
+        "EVHub-Cleveland",
+    ]
+    assert router.compute_route(producer, consumer, demand_mw=5) == [
+        "AEP-Columbus",
+        "Duke-Cincinnati",
+        "EVHub-Cleveland",
+    ]
+
+
+def test_ownership_preference_breaks_cost_ties():
+    config = deepcopy(OHIO_INTERCONNECT)
+    config.grid_nodes["AEP-Columbus"] = ["Duke-Cincinnati", "AEP-Prospect"]
+    config.grid_nodes["AEP-Prospect"] = ["EVHub-Cleveland"]
+    engine = WeightedRoutingEngine(config)
+
+    path, cost = engine.shortest_path("AEP-Columbus", "EVHub-Cleveland")
+    assert path == ["AEP-Columbus", "AEP-Prospect", "EVHub-Cleveland"]
+    assert cost == 2.5
+
+
+def test_landmark_search_matches_dijkstra_costs():
+    size = 12
+    grid = {}
+    for row in range(size):
+        for col in range(size):
+            neighbors = []
+            for d_row, d_col in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+                if 0 <= row + d_row < size and 0 <= col + d_col < size:
+                    neighbors.append(f"N-{row + d_row}-{col + d_col}")
+            grid[f"N-{row}-{col}"] = neighbors
+    config = deepcopy(OHIO_INTERCONNECT)
+    config.grid_nodes = grid
+    config.lines = {"N-3-3": {"N-3-4": GridLine(wheeling_cost_usd_per_mwh=9.0)}}
+    dijkstra = WeightedRoutingEngine(config, landmarks=0)
+    alt = WeightedRoutingEngine(config, landmarks=4)
+
+    for start, goal in (("N-0-0", "N-11-11"), ("N-3-3", "N-3-5"), ("N-11-0", "N-0-11"), ("N-5-5", "N-5-5")):
+        assert alt.shortest_path(start, goal)[1] == dijkstra.shortest_path(start, goal)[1]
@@ -2,6 +2,8 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
@@ -37,6 +39,34 @@ def test_registration_and_transaction_logging():
     assert ledger.entries[0]["kilowatt_hours"] == 120.5
 
 
+
+def test_store_is_rolled_back_when_the_ledger_rejects_a_write():
+    class RejectingLedger(LedgerAdapter):
+        def append_entry(self, entry):
+            raise RuntimeError("ledger unavailable")
+
+        def append_entries(self, entries):
+            raise RuntimeError("ledger unavailable")
+
+    logger = TransactionLogger(OHIO_INTERCONNECT, RejectingLedger())
+    producer = Participant(participant_id="p1", role="producer", capacity_kw=500, metadata={"node": "AEP-Columbus"})
+    consumer = Participant(participant_id="c1", role="consumer", capacity_kw=250, metadata={"node": "EVHub-Cleveland"})
+    tx = EnergyTransaction(
+        tx_id="tx-001",
+        producer_id="p1",
+        consumer_id="c1",
+        kilowatt_hours=1.0,
+        price_usd=0.2,
+        timestamp=datetime(2025, 1, 1, 12, 0, 0),
+    )
+
+    with pytest.raises(RuntimeError):
+        logger.log_transaction(tx, producer, consumer)
+    with pytest.raises(RuntimeError):
+        logger.log_transactions([(tx, producer, consumer, None, None)] * 3)
+    assert len(logger.store) == 0 and logger.transactions == []
+    assert all(len(column) == 0 for column in (logger.store.kilowatt_hours, logger.store.utc_flags))
+
 def test_routing_path_finds_shortest_route():
     registry = Registry(OHIO_INTERCONNECT)
     router = Router(OHIO_INTERCONNECT)